@@ -1,19 +1,21 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.schemas import UserRegister, UserLogin, UserLoginBypass, Token, UserProfile
 from app.services.auth_service import auth_service, get_current_user
-from app.core.database import get_db
+from app.services.response_cache import response_cache
+from app.core.database import get_async_db
 from app.models.database import User, UserPermissions
 from datetime import timedelta
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=Token)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     try:
         # Create user
-        user = auth_service.create_user(
+        user = await auth_service.create_user(
             db=db,
             email=user_data.email,
             password=user_data.password,
@@ -33,7 +35,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
             intervention_analytics=True
         )
         db.add(permissions)
-        db.commit()
+        await db.commit()
         
         # Create access token
         access_token_expires = timedelta(minutes=30)
@@ -57,9 +59,9 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
-    user = auth_service.authenticate_user(
+    user = await auth_service.authenticate_user(
         db, user_credentials.email, user_credentials.password
     )
     
@@ -83,9 +85,9 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     )
 
 @router.post("/login-bypass", response_model=Token)
-async def login_bypass(user_data: UserLoginBypass, db: Session = Depends(get_db)):
+async def login_bypass(user_data: UserLoginBypass, db: AsyncSession = Depends(get_async_db)):
     """Login user without password (DEV ONLY)"""
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await db.scalar(select(User).where(User.email == user_data.email).limit(1))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -110,7 +112,7 @@ async def get_profile(current_user: User = Depends(get_current_user)):
 async def update_profile(
     profile_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user profile"""
     # Update allowed fields
@@ -123,6 +125,7 @@ async def update_profile(
         if field in allowed_fields and hasattr(current_user, field):
             setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    await response_cache.invalidate_user(current_user.id)
     return current_user
\ No newline at end of file
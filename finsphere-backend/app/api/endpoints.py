@@ -1,46 +1,104 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from app.models.schemas import (
-    BiometricData, StressAssessment, 
+    BiometricData, StressAssessment, BiometricBatchResult,
     MessageInput, SentimentResult,
-    TransactionInput,
+    TransactionInput, TransactionBatchResult,
     InterventionRequest, InterventionResponse,
     InterventionLog, InterventionListResponse,
-    DashboardStats,
+    DashboardStats, RecentActivityResponse,
+    HistoricalBiometricsResponse, HistoricalEmailsResponse, RealtimeDashboardSummary,
     TherapyMessage, TherapyResponse
 )
 from app.services.vector_db import vector_service
 from app.services.analyzer import analyzer
+from app.services.stress_baseline import stress_baseline_store
+from app.services.sentiment_engine import sentiment_engine
+from app.services.ingest_queue import ingest_queue, QueueFullError
 from app.services.rag_service import rag_service
 from app.services.postgresql_user_service import postgresql_user_service
+from app.services.budget_service import budget_service
+from app.services.response_cache import response_cache
+from app.services.decision_state import decision_state
+from app.services.site_classifier import site_classifier
 from app.services.fake_data_stream import fake_data_generator
-from app.core.database import get_db
+from app.services.stream_hub import stream_hub
+from app.services.change_feed import change_feed, ACTIVITY_TOPIC
+from app.services.realtime_state import realtime_state, message_entry
+from app.services.market_data import market_data_cache
+from app.core.database import get_async_db
 from app.core.config import settings
+from app.core.query_metrics import query_metrics
+from app.core.traffic_recorder import traffic_recorder
+from app.core import wire_format
 from app.models.database import User, BiometricReading, Transaction, Intervention
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, AsyncGenerator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, or_, select
+from typing import List, AsyncGenerator, Optional, Type, TypeVar
 from datetime import datetime
+import base64
 import uuid
 import json
 import asyncio
+import orjson
 
 router = APIRouter()
 
+T = TypeVar("T")
 
-@router.post("/ingest/biometrics", response_model=StressAssessment)
+
+async def _parse_batch(request: Request, model: Type[T]) -> List[T]:
+    """
+    Parse a batch upload body: a JSON array, NDJSON (one object per line) or
+    MessagePack, chosen by content type (see app/core/wire_format.py).
+    """
+    items = wire_format.decode_items(request, await request.body())
+    if len(items) > settings.INGEST_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(items)} items (max {settings.INGEST_MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        return TypeAdapter(List[model]).validate_python(items)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+
+
+def _check_queue_capacity(count: int = 1):
+    """Reject the request before any DB writes when the ingest queue is full."""
+    try:
+        ingest_queue.check_capacity(count)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(settings.INGEST_QUEUE_RETRY_AFTER_SECONDS)}
+        )
+
+
+async def _queue_vector_events(events: List[dict]):
+    """Durably queue vector DB upserts for the ingest workers."""
+    _check_queue_capacity(len(events))
+    await ingest_queue.enqueue_many("vector_upsert", events)
+
+
+@router.post("/ingest/biometrics", response_model=StressAssessment,
+             openapi_extra=wire_format.body_openapi(BiometricData))
 async def ingest_biometrics(
-    data: BiometricData, 
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    request: Request,
+    data: BiometricData = Depends(wire_format.request_body(BiometricData)),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Ingest wearable data and return immediate stress assessment.
+    JSON or MessagePack in and out (Content-Type / Accept).
     """
-    is_stressed, score = analyzer.assess_stress(data.heart_rate, data.hrv_ms)
+    _check_queue_capacity()
     
     # Get first user from database (for dev)
-    user = db.query(User).first()
+    user = await postgresql_user_service.get_first_user(db)
     if not user:
         user_id = 1
         user_email = "demo@finsphere.com"
@@ -48,55 +106,140 @@ async def ingest_biometrics(
         user_id = user.id
         user_email = user.email
     
+    # Score against the user's own HR/HRV baseline
+    is_stressed, score = analyzer.assess_stress(data.heart_rate, data.hrv_ms, user_id=user_id)
+    
     # Store in PostgreSQL
-    reading = postgresql_user_service.add_biometric_reading(
-        db, user_id, data.heart_rate, data.hrv_ms, "API ingestion"
+    reading = await postgresql_user_service.add_biometric_reading(
+        db, user_id, data.heart_rate, data.hrv_ms, "API ingestion", stress_score=score
     )
+    await response_cache.invalidate_user(user_id)
     
     # Async: Store in Vector DB for long-term pattern matching
     event_id = str(uuid.uuid4())
     desc = f"Biometric reading: HR {data.heart_rate} bpm, HRV {data.hrv_ms} ms. Stress Score: {score:.2f}"
     
-    background_tasks.add_task(
-        vector_service.upsert_event,
-        event_id=event_id,
-        text_description=desc,
-        metadata={
+    await _queue_vector_events([{
+        "event_id": event_id,
+        "text_description": desc,
+        "metadata": {
             "user_id": user_email,
             "type": "biometric",
             "timestamp": data.timestamp.isoformat(),
             "score": score,
             "is_stressed": is_stressed
         }
-    )
+    }])
         
-    return StressAssessment(
+    return wire_format.negotiate(request, StressAssessment(
         user_id=user_email,
         timestamp=data.timestamp,
         is_stressed=is_stressed,
         stress_score=score,
         trigger_event="Physiological Stress Detected" if is_stressed else None
+    ))
+
+@router.post("/ingest/biometrics/batch", response_model=BiometricBatchResult,
+             openapi_extra=wire_format.batch_openapi(BiometricData))
+async def ingest_biometrics_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ingest a wearable sync upload (JSON array, NDJSON or MessagePack of BiometricData).
+    Scores the whole batch at once, inserts it in one transaction and
+    queues a single vector upsert.
+    """
+    samples = await _parse_batch(request, BiometricData)
+    if not samples:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    _check_queue_capacity(len(samples))
+    
+    # Get first user from database (for dev)
+    user = await postgresql_user_service.get_first_user(db)
+    if not user:
+        user_id = 1
+        user_email = "demo@finsphere.com"
+    else:
+        user_id = user.id
+        user_email = user.email
+    
+    is_stressed, scores = analyzer.assess_stress_batch(
+        [s.heart_rate for s in samples], [s.hrv_ms for s in samples], user_id=user_id
     )
+    
+    # Store in PostgreSQL
+    await postgresql_user_service.add_biometric_readings(
+        db, user_id,
+        [
+            {
+                "timestamp": sample.timestamp,
+                "heart_rate": sample.heart_rate,
+                "hrv_ms": sample.hrv_ms,
+                "stress_score": float(score)
+            }
+            for sample, score in zip(samples, scores)
+        ],
+        "API batch ingestion"
+    )
+    await response_cache.invalidate_user(user_id)
+    
+    # Async: Store in Vector DB for long-term pattern matching
+    await _queue_vector_events(
+        [
+            {
+                "event_id": str(uuid.uuid4()),
+                "text_description": f"Biometric reading: HR {sample.heart_rate} bpm, HRV {sample.hrv_ms} ms. Stress Score: {score:.2f}",
+                "metadata": {
+                    "user_id": user_email,
+                    "type": "biometric",
+                    "timestamp": sample.timestamp.isoformat(),
+                    "score": float(score),
+                    "is_stressed": bool(stressed)
+                }
+            }
+            for sample, score, stressed in zip(samples, scores, is_stressed)
+        ]
+    )
+    
+    return wire_format.negotiate(request, BiometricBatchResult(
+        user_id=user_email,
+        accepted=len(samples),
+        stressed_count=int(is_stressed.sum()),
+        mean_stress_score=float(scores.mean()),
+        max_stress_score=float(scores.max())
+    ))
 
-@router.post("/ingest/message", response_model=SentimentResult)
-async def ingest_message(msg: MessageInput, background_tasks: BackgroundTasks):
+def _message_user_id(msg: MessageInput) -> int:
+    """Numeric user ids map to users; anything else goes to the first user (dev)"""
+    return int(msg.user_id) if msg.user_id.isdigit() else (decision_state.default_user_id or 1)
+
+@router.post("/ingest/message", response_model=SentimentResult,
+             openapi_extra=wire_format.body_openapi(MessageInput))
+async def ingest_message(
+    request: Request,
+    msg: MessageInput = Depends(wire_format.request_body(MessageInput))
+):
     """
     Ingest communication to detect sentiment triggers.
+    JSON or MessagePack in and out (Content-Type / Accept).
     """
-    score, label = analyzer.analyze_sentiment(msg.content)
+    score, label = await sentiment_engine.analyze(msg.content)
     
     # Risk logic: Negative sentiment is a risk factor
     risk_flag = label == "negative" or score < -0.3
+    realtime_state.record_emails(_message_user_id(msg), [
+        message_entry(msg.timestamp, msg.sender, msg.channel, msg.content, score, risk_flag)
+    ])
     
     # Async: Store in Vector DB
     event_id = str(uuid.uuid4())
     desc = f"Message on {msg.channel}: {msg.content}. Sentiment: {label} ({score:.2f})"
     
-    background_tasks.add_task(
-        vector_service.upsert_event,
-        event_id=event_id,
-        text_description=desc,
-        metadata={
+    await _queue_vector_events([{
+        "event_id": event_id,
+        "text_description": desc,
+        "metadata": {
             "user_id": msg.user_id,
             "type": "message",
             "timestamp": msg.timestamp.isoformat(),
@@ -104,21 +247,61 @@ async def ingest_message(msg: MessageInput, background_tasks: BackgroundTasks):
             "channel": msg.channel,
             "risk_flag": risk_flag
         }
-    )
+    }])
         
-    return SentimentResult(score=score, label=label, risk_flag=risk_flag)
+    return wire_format.negotiate(request, SentimentResult(score=score, label=label, risk_flag=risk_flag))
 
-@router.post("/ingest/transaction")
+@router.post("/ingest/messages/batch", response_model=List[SentimentResult],
+             openapi_extra=wire_format.batch_openapi(MessageInput))
+async def ingest_messages_batch(request: Request):
+    """
+    Ingest an email/chat burst (JSON array, NDJSON or MessagePack of MessageInput).
+    Messages are scored in parallel and stored with a single vector upsert.
+    """
+    messages = await _parse_batch(request, MessageInput)
+    scored = await sentiment_engine.analyze_batch([msg.content for msg in messages])
+    
+    results = []
+    events = []
+    for msg, (score, label) in zip(messages, scored):
+        # Risk logic: Negative sentiment is a risk factor
+        risk_flag = label == "negative" or score < -0.3
+        results.append(SentimentResult(score=score, label=label, risk_flag=risk_flag))
+        events.append({
+            "event_id": str(uuid.uuid4()),
+            "text_description": f"Message on {msg.channel}: {msg.content}. Sentiment: {label} ({score:.2f})",
+            "metadata": {
+                "user_id": msg.user_id,
+                "type": "message",
+                "timestamp": msg.timestamp.isoformat(),
+                "score": score,
+                "channel": msg.channel,
+                "risk_flag": risk_flag
+            }
+        })
+    
+    await _queue_vector_events(events)
+    for msg, result in zip(messages, results):
+        realtime_state.record_emails(_message_user_id(msg), [
+            message_entry(msg.timestamp, msg.sender, msg.channel, msg.content, result.score, result.risk_flag)
+        ])
+    
+    return wire_format.negotiate(request, results)
+
+@router.post("/ingest/transaction", openapi_extra=wire_format.body_openapi(TransactionInput))
 async def ingest_transaction(
-    txn: TransactionInput, 
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    request: Request,
+    txn: TransactionInput = Depends(wire_format.request_body(TransactionInput)),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Ingest financial transaction for pattern matching.
+    JSON or MessagePack in and out (Content-Type / Accept).
     """
+    _check_queue_capacity()
+    
     # Get first user from database (for dev)
-    user = db.query(User).first()
+    user = await postgresql_user_service.get_first_user(db)
     if not user:
         user_id = 1
         user_email = "demo@finsphere.com"
@@ -127,46 +310,91 @@ async def ingest_transaction(
         user_email = user.email
     
     # Store in PostgreSQL
-    transaction = postgresql_user_service.add_transaction(
-        db, user_id, txn.amount, txn.merchant, txn.category
+    transaction, budget_alerts = await postgresql_user_service.add_transaction(
+        db, user_id, txn.amount, txn.merchant, txn.category, txn.budget_category
     )
+    await response_cache.invalidate_user(user_id)
     
     event_id = str(uuid.uuid4())
     desc = f"Transaction: Spent {txn.amount} {txn.currency} at {txn.merchant} ({txn.category})"
     
-    background_tasks.add_task(
-        vector_service.upsert_event,
-        event_id=event_id,
-        text_description=desc,
-        metadata={
+    await _queue_vector_events([{
+        "event_id": event_id,
+        "text_description": desc,
+        "metadata": {
             "user_id": user_email,
             "type": "transaction",
             "timestamp": txn.timestamp.isoformat(),
             "amount": txn.amount,
-            "merchant": txn.merchant
+            "merchant": txn.merchant,
+            "stress_at_time": transaction.stress_at_time
         }
-    )
+    }])
     
-    return {"status": "recorded", "id": event_id, "transaction_id": transaction.id}
+    return wire_format.negotiate(request, {
+        "status": "recorded",
+        "id": event_id,
+        "transaction_id": transaction.id,
+        "budget_alerts": budget_alerts
+    })
 
-@router.post("/intervention/check", response_model=InterventionResponse)
-async def check_intervention(
-    req: InterventionRequest, 
-    db: Session = Depends(get_db)
+@router.post("/ingest/transactions/batch", response_model=TransactionBatchResult,
+             openapi_extra=wire_format.batch_openapi(TransactionInput))
+async def ingest_transactions_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Called by Chrome Extension to check if we should intervene.
-    Uses real PostgreSQL user data and smart intervention logic.
+    Ingest many transactions at once (JSON array, NDJSON or MessagePack of TransactionInput).
     """
+    txns = await _parse_batch(request, TransactionInput)
+    if not txns:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    _check_queue_capacity(len(txns))
+    
     # Get first user from database (for dev)
-    user = db.query(User).first()
+    user = await postgresql_user_service.get_first_user(db)
     if not user:
         user_id = 1
+        user_email = "demo@finsphere.com"
     else:
         user_id = user.id
+        user_email = user.email
     
-    # Use PostgreSQL user data service for intervention decision
-    decision = postgresql_user_service.should_intervene(db, user_id, req.context_url or "")
+    # Store in PostgreSQL
+    transaction_ids, stress_at_time, budget_alerts = await postgresql_user_service.add_transactions(
+        db, user_id, [txn.model_dump() for txn in txns]
+    )
+    await response_cache.invalidate_user(user_id)
+    
+    await _queue_vector_events(
+        [
+            {
+                "event_id": str(uuid.uuid4()),
+                "text_description": f"Transaction: Spent {txn.amount} {txn.currency} at {txn.merchant} ({txn.category})",
+                "metadata": {
+                    "user_id": user_email,
+                    "type": "transaction",
+                    "timestamp": txn.timestamp.isoformat(),
+                    "amount": txn.amount,
+                    "merchant": txn.merchant,
+                    "stress_at_time": stress_at_time
+                }
+            }
+            for txn in txns
+        ]
+    )
+    
+    return wire_format.negotiate(request, TransactionBatchResult(
+        status="recorded",
+        accepted=len(txns),
+        transaction_ids=transaction_ids,
+        budget_alerts=budget_alerts
+    ))
+
+def intervention_decision(user_id: int, context_url: Optional[str]) -> InterventionResponse:
+    """Intervention check from the in-memory decision state (HTTP and WebSocket)."""
+    decision = decision_state.should_intervene(user_id, context_url or "")
     
     return InterventionResponse(
         should_intervene=decision.get("should_intervene", False),
@@ -175,30 +403,68 @@ async def check_intervention(
         delay_minutes=decision.get("delay_minutes", 0)
     )
 
+@router.post("/intervention/check", response_model=InterventionResponse)
+async def check_intervention(req: InterventionRequest):
+    """
+    Called by Chrome Extension to check if we should intervene.
+    Answered from the in-memory decision state (rebuilt from PostgreSQL at
+    startup and kept current by the ingest endpoints), without a DB round trip.
+    """
+    # First user in the database (for dev), cached by the decision state
+    user_id = decision_state.default_user_id or 1
+    
+    return intervention_decision(user_id, req.context_url)
+
 @router.get("/users", response_model=List[dict])
 async def get_users_list(
-    db: Session = Depends(get_db)
+    limit: int = Query(5, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get list of all users with their data statistics for user selection.
+    Get list of users with their data statistics for user selection,
+    richest data first. Defaults to the top 5; use limit/offset to page.
     """
     try:
-        users = db.query(User).all()
-        user_stats = []
+        # Per-user counts and spend, aggregated once per table and joined to users
+        biometrics = select(
+            BiometricReading.user_id, func.count().label("count")
+        ).group_by(BiometricReading.user_id).subquery()
+        transactions = select(
+            Transaction.user_id,
+            func.count().label("count"),
+            func.coalesce(
+                func.sum(Transaction.amount).filter(Transaction.user_proceeded == True), 0
+            ).label("spending")
+        ).group_by(Transaction.user_id).subquery()
+        interventions = select(
+            Intervention.user_id, func.count().label("count")
+        ).group_by(Intervention.user_id).subquery()
         
-        for user in users:
-            # Get data counts for each user
-            biometric_count = db.query(BiometricReading).filter(BiometricReading.user_id == user.id).count()
-            transaction_count = db.query(Transaction).filter(Transaction.user_id == user.id).count()
-            intervention_count = db.query(Intervention).filter(Intervention.user_id == user.id).count()
-            
-            # Calculate total spending
-            total_spending = db.query(Transaction).filter(
-                Transaction.user_id == user.id,
-                Transaction.user_proceeded == True
-            ).with_entities(func.coalesce(func.sum(Transaction.amount), 0)).scalar() or 0
-            
-            user_stats.append({
+        biometric_count = func.coalesce(biometrics.c.count, 0)
+        transaction_count = func.coalesce(transactions.c.count, 0)
+        intervention_count = func.coalesce(interventions.c.count, 0)
+        data_richness = biometric_count + transaction_count + intervention_count
+        
+        rows = (await db.execute(
+            select(
+                User,
+                biometric_count,
+                transaction_count,
+                intervention_count,
+                func.coalesce(transactions.c.spending, 0),
+                data_richness
+            )
+            .outerjoin(biometrics, biometrics.c.user_id == User.id)
+            .outerjoin(transactions, transactions.c.user_id == User.id)
+            .outerjoin(interventions, interventions.c.user_id == User.id)
+            .order_by(data_richness.desc(), User.id)
+            .limit(limit)
+            .offset(offset)
+        )).all()
+        
+        return [
+            {
                 "id": user.id,
                 "email": user.email,
                 "full_name": user.full_name,
@@ -209,18 +475,15 @@ async def get_users_list(
                 "savings_current": user.savings_current,
                 "stress_baseline": user.stress_baseline,
                 "data_stats": {
-                    "biometric_readings": biometric_count,
-                    "transactions": transaction_count,
-                    "interventions": intervention_count,
+                    "biometric_readings": biometric_total,
+                    "transactions": transaction_total,
+                    "interventions": intervention_total,
                     "total_spending": round(total_spending, 2),
-                    "data_richness": biometric_count + transaction_count + intervention_count
+                    "data_richness": richness
                 }
-            })
-        
-        # Sort by data richness (users with more data first)
-        user_stats.sort(key=lambda x: x["data_stats"]["data_richness"], reverse=True)
-        
-        return user_stats[:5]  # Return top 5 users with most data
+            }
+            for user, biometric_total, transaction_total, intervention_total, total_spending, richness in rows
+        ]
         
     except Exception as e:
         print(f"Users list error: {e}")
@@ -229,21 +492,24 @@ async def get_users_list(
 @router.get("/dashboard/{user_id}", response_model=DashboardStats)
 async def get_dashboard_stats(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Aggregate data for the frontend dashboard using PostgreSQL data for specific user.
     Fetches REAL data from the database.
     """
-    try:
-        user = db.query(User).filter(User.id == user_id).first()
+    async def compute():
+        user = await postgresql_user_service.get_user_by_id(db, user_id)
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Use PostgreSQL user data service to get REAL data
-        return postgresql_user_service.get_dashboard_stats(db, user.id)
-        
+        return await postgresql_user_service.get_dashboard_stats(db, user.id)
+    
+    try:
+        return await response_cache.serve(request, "dashboard", user_id, compute)
     except Exception as e:
         print(f"Dashboard error: {e}")
         # Return mock data on error
@@ -258,20 +524,24 @@ async def get_dashboard_stats(
 
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_default_dashboard_stats(
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get dashboard stats for the first user (fallback for compatibility).
     """
     try:
         # Get first user from database (for dev)
-        user = db.query(User).first()
+        user = await postgresql_user_service.get_first_user(db)
         
         if not user:
             raise HTTPException(status_code=404, detail="No users found")
         
-        # Use PostgreSQL user data service to get REAL data
-        return postgresql_user_service.get_dashboard_stats(db, user.id)
+        # Shares the per-user dashboard cache entry
+        return await response_cache.serve(
+            request, "dashboard", user.id,
+            lambda: postgresql_user_service.get_dashboard_stats(db, user.id)
+        )
         
     except Exception as e:
         print(f"Dashboard error: {e}")
@@ -294,21 +564,16 @@ async def therapy_chat(msg: TherapyMessage):
     response_text = await rag_service.generate_therapy_response(msg.user_id, msg.message)
     return TherapyResponse(response_text=response_text)
 
-@router.post("/intervention/log")
-async def log_intervention(intervention: InterventionLog, background_tasks: BackgroundTasks):
-    """
-    Log intervention events for analytics and pattern tracking.
-    Called by the Chrome Extension after performing an intervention.
-    """
+async def record_intervention(intervention: InterventionLog) -> dict:
+    """Queue an intervention event for pattern analysis (HTTP and WebSocket)."""
     event_id = str(uuid.uuid4())
     desc = f"Intervention: {intervention.reason} on {intervention.url}"
     
     # Store in Vector DB for future pattern analysis
-    background_tasks.add_task(
-        vector_service.upsert_event,
-        event_id=event_id,
-        text_description=desc,
-        metadata={
+    await _queue_vector_events([{
+        "event_id": event_id,
+        "text_description": desc,
+        "metadata": {
             "user_id": intervention.user_id,
             "type": "intervention",
             "timestamp": intervention.timestamp.isoformat(),
@@ -316,7 +581,7 @@ async def log_intervention(intervention: InterventionLog, background_tasks: Back
             "reason": intervention.reason,
             "severity": intervention.severity
         }
-    )
+    }])
     
     return {
         "status": "logged",
@@ -324,23 +589,26 @@ async def log_intervention(intervention: InterventionLog, background_tasks: Back
         "timestamp": intervention.timestamp
     }
 
-@router.post("/intervention/response")
-async def log_intervention_response(data: dict, background_tasks: BackgroundTasks):
+@router.post("/intervention/log")
+async def log_intervention(intervention: InterventionLog):
     """
-    Log user's response to an intervention (accepted/snooze/proceed).
-    Called by the Chrome Extension when user interacts with the intervention overlay.
+    Log intervention events for analytics and pattern tracking.
+    Called by the Chrome Extension after performing an intervention.
     """
+    return await record_intervention(intervention)
+
+async def record_intervention_response(data: dict) -> dict:
+    """Queue the user's response to an intervention (HTTP and WebSocket)."""
     event_id = str(uuid.uuid4())
     action = data.get('intervention_action', 'unknown')
     accepted = data.get('accepted', False)
     
     desc = f"User {action} intervention: {'Accepted' if accepted else 'Declined'} on {data.get('url', 'unknown')}"
     
-    background_tasks.add_task(
-        vector_service.upsert_event,
-        event_id=event_id,
-        text_description=desc,
-        metadata={
+    await _queue_vector_events([{
+        "event_id": event_id,
+        "text_description": desc,
+        "metadata": {
             "user_id": data.get('user_id'),
             "type": "intervention_response",
             "timestamp": data.get('timestamp'),
@@ -348,7 +616,7 @@ async def log_intervention_response(data: dict, background_tasks: BackgroundTask
             "accepted": accepted,
             "url": data.get('url')
         }
-    )
+    }])
     
     return {
         "status": "response_logged",
@@ -357,17 +625,33 @@ async def log_intervention_response(data: dict, background_tasks: BackgroundTask
         "accepted": accepted
     }
 
+@router.post("/intervention/response")
+async def log_intervention_response(data: dict):
+    """
+    Log user's response to an intervention (accepted/snooze/proceed).
+    Called by the Chrome Extension when user interacts with the intervention overlay.
+    """
+    return await record_intervention_response(data)
+
+@router.get("/user/{user_id}/stress-baseline")
+async def get_user_stress_baseline(user_id: int):
+    """
+    Get the user's personal HR/HRV baseline used for stress scoring.
+    """
+    return {"user_id": user_id, **stress_baseline_store.summary(user_id)}
+
 @router.get("/user/{user_id}/financial-goals")
 async def get_user_financial_goals(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's financial goals and progress.
     """
-    try:
+    async def compute():
         from app.models.database import FinancialGoal
-        goals = db.query(FinancialGoal).filter(FinancialGoal.user_id == user_id).all()
+        goals = (await db.scalars(select(FinancialGoal).where(FinancialGoal.user_id == user_id))).all()
         
         goal_data = []
         for goal in goals:
@@ -391,7 +675,9 @@ async def get_user_financial_goals(
             })
         
         return {"goals": goal_data, "total_goals": len(goal_data)}
-        
+    
+    try:
+        return await response_cache.serve(request, "financial-goals", user_id, compute)
     except Exception as e:
         print(f"Financial goals error: {e}")
         return {"goals": [], "total_goals": 0}
@@ -399,42 +685,19 @@ async def get_user_financial_goals(
 @router.get("/user/{user_id}/budget-categories")
 async def get_user_budget_categories(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get user's budget categories and spending.
+    Get user's budget categories and this month's spending
+    (running totals maintained at transaction ingest).
     """
-    try:
-        from app.models.database import BudgetCategory
-        budgets = db.query(BudgetCategory).filter(BudgetCategory.user_id == user_id).all()
-        
-        # Calculate actual spending per category
-        budget_data = []
-        for budget in budgets:
-            # Get actual spending for this category
-            actual_spending = db.query(Transaction).filter(
-                Transaction.user_id == user_id,
-                Transaction.budget_category == budget.category_name,
-                Transaction.user_proceeded == True
-            ).with_entities(func.coalesce(func.sum(Transaction.amount), 0)).scalar() or 0
-            
-            utilization = (actual_spending / budget.monthly_limit) * 100 if budget.monthly_limit > 0 else 0
-            status = "over_budget" if utilization > 100 else "warning" if utilization > budget.alert_threshold * 100 else "good"
-            
-            budget_data.append({
-                "id": budget.id,
-                "category_name": budget.category_name,
-                "monthly_limit": budget.monthly_limit,
-                "actual_spending": round(actual_spending, 2),
-                "remaining": max(0, budget.monthly_limit - actual_spending),
-                "utilization_percentage": round(utilization, 1),
-                "category_type": budget.category_type,
-                "alert_threshold": budget.alert_threshold,
-                "status": status
-            })
-        
+    async def compute():
+        budget_data = await budget_service.get_month_summary(db, user_id)
         return {"budget_categories": budget_data, "total_categories": len(budget_data)}
-        
+    
+    try:
+        return await response_cache.serve(request, "budget-categories", user_id, compute)
     except Exception as e:
         print(f"Budget categories error: {e}")
         return {"budget_categories": [], "total_categories": 0}
@@ -442,16 +705,17 @@ async def get_user_budget_categories(
 @router.get("/user/{user_id}/behavioral-insights")
 async def get_user_behavioral_insights(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's behavioral patterns and spending insights.
     """
-    try:
+    async def compute():
         from app.models.database import UserBehaviorPattern, SpendingInsight
         
         # Get behavioral patterns
-        patterns = db.query(UserBehaviorPattern).filter(UserBehaviorPattern.user_id == user_id).all()
+        patterns = (await db.scalars(select(UserBehaviorPattern).where(UserBehaviorPattern.user_id == user_id))).all()
         pattern_data = []
         for pattern in patterns:
             pattern_data.append({
@@ -467,7 +731,7 @@ async def get_user_behavioral_insights(
             })
         
         # Get spending insights
-        insights = db.query(SpendingInsight).filter(SpendingInsight.user_id == user_id).all()
+        insights = (await db.scalars(select(SpendingInsight).where(SpendingInsight.user_id == user_id))).all()
         insight_data = []
         for insight in insights:
             insight_data.append({
@@ -487,7 +751,9 @@ async def get_user_behavioral_insights(
             "total_patterns": len(pattern_data),
             "total_insights": len(insight_data)
         }
-        
+    
+    try:
+        return await response_cache.serve(request, "behavioral-insights", user_id, compute)
     except Exception as e:
         print(f"Behavioral insights error: {e}")
         return {
@@ -497,75 +763,172 @@ async def get_user_behavioral_insights(
             "total_insights": 0
         }
 
-@router.get("/user/{user_id}/recent-activity")
+# Columns returned by the activity feed; JSON blobs and unused fields are never loaded
+TRANSACTION_FEED_COLUMNS = (
+    Transaction.id, Transaction.timestamp, Transaction.amount, Transaction.merchant,
+    Transaction.category, Transaction.subcategory, Transaction.necessity_level,
+    Transaction.purchase_trigger, Transaction.stress_at_time, Transaction.emotional_state,
+    Transaction.intervention_shown, Transaction.user_proceeded,
+    Transaction.satisfaction_score, Transaction.regret_score
+)
+INTERVENTION_FEED_COLUMNS = (
+    Intervention.id, Intervention.timestamp, Intervention.url, Intervention.website_category,
+    Intervention.estimated_amount, Intervention.reason, Intervention.severity,
+    Intervention.user_stress_level, Intervention.user_action, Intervention.final_outcome,
+    Intervention.effectiveness
+)
+
+FEED_END = "end"
+
+
+def _encode_cursor(positions: dict) -> str:
+    """Opaque cursor: per feed a (timestamp, id) position or FEED_END."""
+    payload = {
+        feed: position if position == FEED_END else [position[0].isoformat(), position[1]]
+        for feed, position in positions.items()
+        if position is not None
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> dict:
+    if not cursor:
+        return {}
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {
+            feed: position if position == FEED_END else (datetime.fromisoformat(position[0]), int(position[1]))
+            for feed, position in payload.items()
+        }
+    except (ValueError, TypeError, IndexError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+async def _keyset_page(db: AsyncSession, model, columns, user_id: int, limit: int,
+                       before=None, after=None, oldest_first: bool = False):
+    """
+    One page of a user's rows newest-first on (timestamp, id), strictly older
+    than `before` and newer than `after`. Written as a timestamp range plus
+    tie-breaker so the (user_id, timestamp DESC) index bounds the scan.
+    With `oldest_first` the page is the oldest `limit` rows of the range
+    (still returned newest-first). Returns (rows, has_more).
+    """
+    query = select(*columns).where(model.user_id == user_id)
+    if before is not None:
+        ts, row_id = before
+        query = query.where(model.timestamp <= ts, or_(model.timestamp < ts, model.id < row_id))
+    if after is not None:
+        ts, row_id = after
+        query = query.where(model.timestamp >= ts, or_(model.timestamp > ts, model.id > row_id))
+    if oldest_first:
+        order = (model.timestamp.asc(), model.id.asc())
+    else:
+        order = (model.timestamp.desc(), model.id.desc())
+    rows = (await db.execute(query.order_by(*order).limit(limit + 1))).mappings().all()
+    page = rows[:limit]
+    return (page[::-1] if oldest_first else page), len(rows) > limit
+
+
+async def recent_activity_page(db: AsyncSession, user_id: int, limit: int,
+                               before: dict, after: Optional[dict]) -> dict:
+    """
+    One page of the user's recent transactions and interventions (decoded
+    `cursor` / `since` positions as `before` / `after`; `after` is None
+    without `since`). Shared by GET /user/{user_id}/recent-activity and the
+    WebSocket.
+    
+    Polling contract: a `since` query returns, per feed, the *oldest* `limit`
+    items newer than the since position (listed newest first), and its
+    `since_cursor` points at the newest item returned. When `has_more` is
+    set, more new items are waiting; poll again with the new `since_cursor`
+    right away. Following `since_cursor` this way never skips an item, however
+    many arrive between polls. `next_cursor` pages older items and is only
+    returned for non-`since` queries.
+    """
+    polling = after is not None and not before  # A since cursor of empty feeds decodes to {}
+    after = after or {}
+    feeds = {}
+    for feed, model, columns in (
+        ("transactions", Transaction, TRANSACTION_FEED_COLUMNS),
+        ("interventions", Intervention, INTERVENTION_FEED_COLUMNS),
+    ):
+        if before.get(feed) == FEED_END:
+            feeds[feed] = ([], False)
+            continue
+        after_position = after.get(feed)
+        feeds[feed] = await _keyset_page(
+            db, model, columns, user_id, limit,
+            before=before.get(feed),
+            after=after_position if after_position != FEED_END else None,
+            oldest_first=polling
+        )
+    
+    transaction_rows, more_transactions = feeds["transactions"]
+    intervention_rows, more_interventions = feeds["interventions"]
+    transaction_data = [{**row, "timestamp": row["timestamp"].isoformat()} for row in transaction_rows]
+    intervention_data = [{**row, "timestamp": row["timestamp"].isoformat()} for row in intervention_rows]
+    
+    has_more = more_transactions or more_interventions
+    next_cursor = None
+    if has_more and not polling:
+        next_cursor = _encode_cursor({
+            feed: (rows[-1]["timestamp"], rows[-1]["id"]) if more else FEED_END
+            for feed, (rows, more) in feeds.items()
+        })
+    
+    # Newest position per feed, for polling with `since` (first pages only)
+    since_cursor = None
+    if not before:
+        since_cursor = _encode_cursor({
+            feed: (rows[0]["timestamp"], rows[0]["id"]) if rows else (
+                after.get(feed) if after.get(feed) != FEED_END else None
+            )
+            for feed, (rows, _) in feeds.items()
+        })
+    
+    return {
+        "recent_transactions": transaction_data,
+        "recent_interventions": intervention_data,
+        "total_transactions": len(transaction_data),
+        "total_interventions": len(intervention_data),
+        "next_cursor": next_cursor,
+        "since_cursor": since_cursor,
+        "has_more": has_more
+    }
+
+
+@router.get("/user/{user_id}/recent-activity", response_model=RecentActivityResponse)
 async def get_user_recent_activity(
     user_id: int,
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    request: Request,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    since: Optional[str] = Query(None, description="since_cursor of an earlier response: only newer items"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get user's recent transactions and interventions.
+    Get user's recent transactions and interventions, newest first.
+    Pages with keyset cursors on (timestamp, id): pass `next_cursor` as
+    `cursor` for older items, or `since_cursor` as `since` to poll for items
+    added after it. Polls return the oldest new items first; while
+    `has_more` is set, poll again with the returned `since_cursor`.
     """
+    before, after = decode_cursor(cursor), decode_cursor(since) if since is not None else None
+    
+    async def compute():
+        return await recent_activity_page(db, user_id, limit, before, after)
+    
     try:
-        # Get recent transactions
-        recent_transactions = db.query(Transaction).filter(
-            Transaction.user_id == user_id
-        ).order_by(Transaction.timestamp.desc()).limit(limit).all()
-        
-        transaction_data = []
-        for txn in recent_transactions:
-            transaction_data.append({
-                "id": txn.id,
-                "timestamp": txn.timestamp.isoformat(),
-                "amount": txn.amount,
-                "merchant": txn.merchant,
-                "category": txn.category,
-                "subcategory": txn.subcategory,
-                "necessity_level": txn.necessity_level,
-                "purchase_trigger": txn.purchase_trigger,
-                "stress_at_time": txn.stress_at_time,
-                "emotional_state": txn.emotional_state,
-                "intervention_shown": txn.intervention_shown,
-                "user_proceeded": txn.user_proceeded,
-                "satisfaction_score": txn.satisfaction_score,
-                "regret_score": txn.regret_score
-            })
-        
-        # Get recent interventions
-        recent_interventions = db.query(Intervention).filter(
-            Intervention.user_id == user_id
-        ).order_by(Intervention.timestamp.desc()).limit(limit).all()
-        
-        intervention_data = []
-        for intervention in recent_interventions:
-            intervention_data.append({
-                "id": intervention.id,
-                "timestamp": intervention.timestamp.isoformat(),
-                "url": intervention.url,
-                "website_category": intervention.website_category,
-                "estimated_amount": intervention.estimated_amount,
-                "reason": intervention.reason,
-                "severity": intervention.severity,
-                "user_stress_level": intervention.user_stress_level,
-                "user_action": intervention.user_action,
-                "final_outcome": intervention.final_outcome,
-                "effectiveness": intervention.effectiveness
-            })
-        
-        return {
-            "recent_transactions": transaction_data,
-            "recent_interventions": intervention_data,
-            "total_transactions": len(transaction_data),
-            "total_interventions": len(intervention_data)
-        }
-        
+        return await response_cache.serve(request, "recent-activity", user_id, compute)
     except Exception as e:
         print(f"Recent activity error: {e}")
         return {
             "recent_transactions": [],
             "recent_interventions": [],
             "total_transactions": 0,
-            "total_interventions": 0
+            "total_interventions": 0,
+            "next_cursor": None,
+            "since_cursor": None
         }
 
 @router.get("/interventions/{user_id}", response_model=InterventionListResponse)
@@ -683,27 +1046,58 @@ async def system_status():
                 "info": qdrant_info
             },
             "analyzer": {
-                "sentiment": "TextBlob",
-                "stress_algorithm": "HR/HRV heuristic"
-            }
+                "sentiment": "TextBlob pattern lexicon (batched, process pool)",
+                "sentiment_engine": sentiment_engine.get_stats(),
+                "stress_algorithm": "Per-user HR/HRV baseline deviation (population heuristic during warm-up)"
+            },
+            "ingest_queue": await ingest_queue.get_metrics(),
+            "response_cache": response_cache.get_stats(),
+            "decision_state": decision_state.get_stats(),
+            "realtime_state": realtime_state.get_stats(),
+            "market_data": market_data_cache.get_stats(),
+            "traffic_recorder": traffic_recorder.get_stats(),
+            "site_classifier": site_classifier.get_stats(),
+            "streams": stream_hub.get_stats(),
+            "change_feed": change_feed.get_stats(),
+            "websocket": _websocket_stats(),
+            "database": query_metrics.get_metrics()
         }
     }
 
+def _websocket_stats() -> dict:
+    from app.api.websocket import ws_metrics  # websocket imports this module
+
+    return dict(ws_metrics)
+
+@router.get("/ingest/queue/metrics")
+async def ingest_queue_metrics():
+    """
+    Durable ingest queue depth, throughput counters and dead-letter count.
+    """
+    return await ingest_queue.get_metrics()
+
+@router.get("/metrics/db")
+async def db_query_metrics():
+    """
+    Per-route statement counts, DB time, slowest statements and N+1 suspects.
+    """
+    return query_metrics.get_metrics()
+
 # === REAL-TIME DATA STREAMING ENDPOINTS ===
 
-@router.get("/stream/biometrics/{user_id}")
-async def stream_biometric_data(user_id: int):
-    """Stream real-time biometric data for a user"""
+def _stream_response(kind: str, user_id: int, request: Request) -> StreamingResponse:
+    """Subscribe a connection to a stream hub topic (SSE, or MessagePack if Accept prefers it)."""
+    binary = wire_format.wants_msgpack(request)
     
-    async def generate_biometric_stream() -> AsyncGenerator[str, None]:
-        async for biometric_data in fake_data_generator.biometric_stream(user_id, interval_seconds=3):
-            # Format as Server-Sent Events
-            data_json = json.dumps(biometric_data)
-            yield f"data: {data_json}\n\n"
+    async def generate() -> AsyncGenerator[bytes, None]:
+        # Leaving the block on disconnect unsubscribes (and stops the producer if last)
+        async with stream_hub.subscribe(kind, user_id) as subscription:
+            async for event in subscription:
+                yield event.frame(binary) if event is not None else wire_format.heartbeat_frame(binary)
     
     return StreamingResponse(
-        generate_biometric_stream(),
-        media_type="text/event-stream",
+        generate(),
+        media_type=wire_format.stream_media_type(binary),
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
@@ -711,46 +1105,35 @@ async def stream_biometric_data(user_id: int):
         }
     )
 
+@router.get("/stream/biometrics/{user_id}")
+async def stream_biometric_data(user_id: int, request: Request):
+    """
+    Stream real-time biometric data for a user: Server-Sent Events, or a
+    sequence of MessagePack objects with `Accept: application/msgpack`.
+    All connections for a user share one producer (see services/stream_hub.py).
+    """
+    return _stream_response("biometrics", user_id, request)
+
 @router.get("/stream/emails/{user_id}")
-async def stream_email_data(user_id: int):
-    """Stream real-time email sentiment data for a user"""
-    
-    async def generate_email_stream() -> AsyncGenerator[str, None]:
-        async for email_data in fake_data_generator.email_stream(user_id, interval_seconds=15):
-            # Convert dataclass to dict
-            data_dict = {
-                'timestamp': email_data.timestamp,
-                'sender': email_data.sender,
-                'subject': email_data.subject,
-                'content_preview': email_data.content_preview,
-                'sentiment_score': email_data.sentiment_score,
-                'sentiment_label': email_data.sentiment_label,
-                'stress_trigger': email_data.stress_trigger,
-                'priority': email_data.priority,
-                'category': email_data.category,
-                'emotional_impact': email_data.emotional_impact
-            }
-            # Format as Server-Sent Events
-            data_json = json.dumps(data_dict)
-            yield f"data: {data_json}\n\n"
-    
-    return StreamingResponse(
-        generate_email_stream(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-        }
-    )
+async def stream_email_data(user_id: int, request: Request):
+    """
+    Stream real-time email sentiment data for a user: Server-Sent Events, or
+    a sequence of MessagePack objects with `Accept: application/msgpack`.
+    """
+    return _stream_response("emails", user_id, request)
 
-@router.get("/historical/biometrics/{user_id}")
-async def get_historical_biometrics(
-    user_id: int,
-    hours: int = Query(24, description="Hours of historical data"),
-    count: int = Query(100, description="Number of data points")
-):
-    """Get historical biometric data for a user"""
+@router.get("/stream/activity/{user_id}")
+async def stream_user_activity(user_id: int, request: Request):
+    """
+    Stream the user's real ingested activity as it is committed: biometric
+    readings, transactions (single or batch summaries) and interventions,
+    delivered through Postgres LISTEN/NOTIFY (see services/change_feed.py).
+    Replaces polling /realtime/dashboard and /user/{id}/recent-activity.
+    """
+    return _stream_response(ACTIVITY_TOPIC, user_id, request)
+
+def historical_biometrics(user_id: int, hours: int, count: int) -> dict:
+    """/historical/biometrics payload (also served over the WebSocket). Blocking for large counts."""
     biometric_data = fake_data_generator.generate_historical_biometrics(user_id, hours, count)
     return {
         "user_id": user_id,
@@ -759,78 +1142,65 @@ async def get_historical_biometrics(
         "biometrics": biometric_data
     }
 
-@router.get("/historical/emails/{user_id}")
-async def get_historical_emails(
+HISTORY_CHUNK_ITEMS = 2000  # Items per encoded chunk of a /historical response
+
+def _history_response(payload: dict, items_key: str) -> StreamingResponse:
+    """
+    Stream a /historical payload as JSON, encoding HISTORY_CHUNK_ITEMS items
+    at a time. The generators already emit the response model's field types,
+    so the items are encoded directly: validating or dumping 100k items in one
+    call holds the GIL (and stalls the event loop) for most of a second. The
+    chunks are produced in the threadpool and compressed one at a time.
+    """
+    items = payload[items_key]
+    head = orjson.dumps({key: value for key, value in payload.items() if key != items_key})
+
+    def chunks():
+        yield head[:-1] + b',"' + items_key.encode() + b'":['
+        for start in range(0, len(items), HISTORY_CHUNK_ITEMS):
+            chunk = orjson.dumps(items[start:start + HISTORY_CHUNK_ITEMS])[1:-1]
+            yield chunk if start == 0 else b"," + chunk
+        yield b"]}"
+
+    return StreamingResponse(chunks(), media_type="application/json")
+
+@router.get("/historical/biometrics/{user_id}", response_model=HistoricalBiometricsResponse)
+def get_historical_biometrics(
+    user_id: int,
+    hours: int = Query(24, ge=1, le=24 * 90, description="Hours of historical data"),
+    count: int = Query(100, ge=1, le=100_000, description="Number of data points")
+):
+    """
+    Get historical biometric data for a user.
+    A plain def, so generating up to 100k points runs in the threadpool;
+    the body is streamed in chunks (see _history_response).
+    """
+    return _history_response(historical_biometrics(user_id, hours, count), "biometrics")
+
+@router.get("/historical/emails/{user_id}", response_model=HistoricalEmailsResponse)
+def get_historical_emails(
     user_id: int,
-    hours: int = Query(24, description="Hours of historical data"),
-    count: int = Query(50, description="Number of emails")
+    hours: int = Query(24, ge=1, le=24 * 90, description="Hours of historical data"),
+    count: int = Query(50, ge=1, le=100_000, description="Number of emails")
 ):
-    """Get historical email sentiment data for a user"""
+    """Get historical email sentiment data for a user (threadpool + chunked body, like /historical/biometrics)"""
     email_data = fake_data_generator.generate_historical_emails(user_id, hours, count)
     
-    # Convert dataclass objects to dicts
-    emails_dict = []
-    for email in email_data:
-        emails_dict.append({
-            'timestamp': email.timestamp,
-            'sender': email.sender,
-            'subject': email.subject,
-            'content_preview': email.content_preview,
-            'sentiment_score': email.sentiment_score,
-            'sentiment_label': email.sentiment_label,
-            'stress_trigger': email.stress_trigger,
-            'priority': email.priority,
-            'category': email.category,
-            'emotional_impact': email.emotional_impact
-        })
+    # Convert dataclass objects to dicts (flat fields, so no deep-copying asdict)
+    emails_dict = [vars(email) for email in email_data]
     
-    return {
+    return _history_response({
         "user_id": user_id,
         "time_range_hours": hours,
         "email_count": len(emails_dict),
         "emails": emails_dict
-    }
+    }, "emails")
 
-@router.get("/realtime/dashboard/{user_id}")
+@router.get("/realtime/dashboard/{user_id}", response_model=RealtimeDashboardSummary)
 async def get_realtime_dashboard_summary(user_id: int):
-    """Get real-time dashboard summary with current biometrics and recent emails"""
-    
-    # Get latest biometric reading
-    current_biometric = fake_data_generator.generate_biometric(user_id)
-    
-    # Get recent emails (last 2 hours)
-    recent_emails = fake_data_generator.generate_historical_emails(user_id, hours=2, count=10)
-    
-    # Calculate stress indicators
-    stress_level = "Low" if current_biometric['stress_level'] < 4 else "Medium" if current_biometric['stress_level'] < 7 else "High"
-    
-    # Count high-stress emails
-    stress_emails = len([e for e in recent_emails if e.stress_trigger])
-    
-    # Calculate spending risk based on email sentiment
-    negative_emails = len([e for e in recent_emails if e.sentiment_score < -0.3])
-    spending_risk = "Critical" if negative_emails > 5 else "Warning" if negative_emails > 2 else "Safe"
-    
-    return {
-        "user_id": user_id,
-        "timestamp": datetime.now().isoformat(),
-        "current_biometric": current_biometric,
-        "stress_level": stress_level,
-        "stress_score": current_biometric['raw_stress_score'],
-        "spending_risk": spending_risk,
-        "cognitive_load": current_biometric['activity_level'].title(),
-        "heart_rate": current_biometric['heart_rate'],
-        "hrv": current_biometric['hrv_ms'],
-        "recovery_score": current_biometric['recovery_score'],
-        "recent_emails_count": len(recent_emails),
-        "stress_trigger_emails": stress_emails,
-        "recent_emails": [{
-            'timestamp': email.timestamp,
-            'sender': email.sender,
-            'subject': email.subject,
-            'sentiment_score': email.sentiment_score,
-            'stress_trigger': email.stress_trigger,
-            'priority': email.priority,
-            'category': email.category
-        } for email in recent_emails[-5:]]  # Last 5 emails
-    }
+    """
+    Get real-time dashboard summary with current biometrics and recent emails.
+    A snapshot of the user's rolling window (live streams + ingest), so
+    consecutive polls agree until new data arrives.
+    """
+    return realtime_state.summary(user_id)
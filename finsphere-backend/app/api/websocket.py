@@ -0,0 +1,296 @@
+"""
+Multiplexed WebSocket (/api/v1/ws)
+One authenticated connection per client carries every live stream and the
+extension's request/response calls, instead of an SSE connection per
+stream plus dashboard polling and one-off POSTs.
+
+Frames are JSON text; a client whose auth frame is binary MessagePack gets
+MessagePack back (see docs/wire-format.md).
+
+    -> {"type": "auth", "token": "<JWT from /auth/login>"}     first frame, within WS_AUTH_TIMEOUT_SECONDS
+    <- {"type": "ready", "user_id": 3, "channels": [...], "methods": [...]}
+    -> {"type": "subscribe", "channel": "biometrics"}          or "unsubscribe"
+    <- {"type": "event", "channel": "biometrics", "data": {...}}
+    -> {"type": "request", "id": 7, "method": "intervention.check", "params": {...}}
+    <- {"type": "response", "id": 7, "result": {...}}           or {"type": "error", "id": 7, "error": "..."}
+    -> {"type": "ping"}                                        <- {"type": "pong"}
+
+Channels are stream hub topics for the authenticated user. "dashboard"
+sends the full DashboardStats first and then only the fields that changed
+("delta": true); it is recomputed once per user on committed activity, not
+per connection.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+import msgpack
+import orjson
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from app.api.endpoints import (
+    decode_cursor, historical_biometrics, intervention_decision, recent_activity_page, record_intervention,
+    record_intervention_response
+)
+from app.core import wire_format
+from app.core.config import settings
+from app.models.database import User
+from app.models.schemas import InterventionLog
+from app.services.auth_service import auth_service
+from app.services.change_feed import ACTIVITY_TOPIC
+from app.services.postgresql_user_service import postgresql_user_service
+from app.services.realtime_state import realtime_state
+from app.services.stream_hub import stream_hub
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DASHBOARD_TOPIC = "dashboard"
+DASHBOARD_DEBOUNCE_SECONDS = 0.5  # Let a burst of ingests settle before recomputing
+MAX_INFLIGHT_REQUESTS = 16        # Per connection
+
+# channel -> (stream hub kind, activity event type filter)
+CHANNELS = {
+    "biometrics": ("biometrics", None),
+    "emails": ("emails", None),
+    "activity": (ACTIVITY_TOPIC, None),
+    "interventions": (ACTIVITY_TOPIC, "intervention"),
+    DASHBOARD_TOPIC: (DASHBOARD_TOPIC, None),
+}
+
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_POLICY = 1008
+
+ws_metrics = {"open": 0, "opened": 0, "auth_failures": 0, "requests": 0, "events_sent": 0}
+
+
+async def dashboard_feed(user_id: int):
+    """Stream hub producer: the user's DashboardStats, recomputed on committed activity."""
+    from app.core.database import AsyncSessionLocal
+
+    loop = asyncio.get_running_loop()
+    async with stream_hub.subscribe(ACTIVITY_TOPIC, user_id) as activity:
+        while True:
+            async with AsyncSessionLocal() as db:
+                stats = await postgresql_user_service.get_dashboard_stats(db, user_id)
+            yield stats.model_dump(mode="json")
+
+            # Next change, or a periodic refresh for time-relative fields (stress freshness)
+            refresh_at = loop.time() + settings.WS_DASHBOARD_REFRESH_SECONDS
+            async for event in activity:
+                if event is not None or loop.time() >= refresh_at:
+                    break
+            await asyncio.sleep(DASHBOARD_DEBOUNCE_SECONDS)
+            while not activity.queue.empty():
+                activity.queue.get_nowait()
+
+
+def _int_param(params: Dict, name: str, default: int, low: int, high: int) -> int:
+    value = params.get(name, default)
+    if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+        raise ValueError(f"{name} must be an integer in [{low}, {high}]")
+    return value
+
+
+class MultiplexedConnection:
+    def __init__(self, websocket: WebSocket, user: User, binary: bool):
+        self.websocket = websocket
+        self.user = user
+        self.binary = binary
+        self.subscriptions: Dict[str, asyncio.Task] = {}
+        self.requests: Set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
+        self._inflight = asyncio.Semaphore(MAX_INFLIGHT_REQUESTS)
+
+    async def send(self, message: Dict):
+        async with self._send_lock:
+            if self.binary:
+                await self.websocket.send_bytes(wire_format.packb(message))
+            else:
+                await self.websocket.send_text(orjson.dumps(message, default=jsonable_encoder).decode())
+
+    # --- Subscriptions ---
+
+    async def _pump(self, channel: str):
+        kind, event_type = CHANNELS[channel]
+        last_dashboard: Optional[Dict] = None
+        async with stream_hub.subscribe(kind, self.user.id) as subscription:
+            async for event in subscription:
+                if event is None:
+                    continue  # Idle; the WebSocket layer pings on its own
+                data = event.data
+                if event_type is not None and data.get("type") != event_type:
+                    continue
+                message = {"type": "event", "channel": channel, "data": data}
+                if channel == DASHBOARD_TOPIC:
+                    if last_dashboard is not None:
+                        changed = {key: value for key, value in data.items() if last_dashboard.get(key) != value}
+                        if not changed:
+                            continue
+                        message = {"type": "event", "channel": channel, "data": changed, "delta": True}
+                    last_dashboard = data
+                await self.send(message)
+                ws_metrics["events_sent"] += 1
+
+    def subscribe(self, channel: str):
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown channel: {channel}")
+        if channel not in self.subscriptions:
+            self.subscriptions[channel] = asyncio.create_task(self._pump(channel))
+
+    def unsubscribe(self, channel: str):
+        task = self.subscriptions.pop(channel, None)
+        if task is not None:
+            task.cancel()
+
+    # --- Requests ---
+
+    async def _call(self, method: str, params: Dict) -> Any:
+        user_id = self.user.id
+        if method == "intervention.check":
+            return intervention_decision(user_id, params.get("context_url") or params.get("url"))
+        if method == "intervention.log":
+            return await record_intervention(InterventionLog.model_validate({**params, "user_id": str(user_id)}))
+        if method == "intervention.response":
+            return await record_intervention_response({**params, "user_id": str(user_id)})
+        if method == "biometrics.history":
+            hours = _int_param(params, "hours", 24, 1, 24 * 90)
+            count = _int_param(params, "count", 100, 1, 100_000)
+            return await asyncio.to_thread(historical_biometrics, user_id, hours, count)
+        if method == "activity.recent":
+            from app.core.database import AsyncSessionLocal
+
+            limit = _int_param(params, "limit", 20, 1, 200)
+            since = params.get("since")
+            before, after = decode_cursor(params.get("cursor")), decode_cursor(since) if since is not None else None
+            async with AsyncSessionLocal() as db:
+                return await recent_activity_page(db, user_id, limit, before, after)
+        if method == "dashboard.get":
+            from app.core.database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as db:
+                return await postgresql_user_service.get_dashboard_stats(db, user_id)
+        if method == "realtime.dashboard":
+            return realtime_state.summary(user_id)
+        raise ValueError(f"Unknown method: {method}")
+
+    async def _handle_request(self, request_id: Any, method: str, params: Dict):
+        async with self._inflight:
+            try:
+                result = await self._call(method, params)
+                await self.send({"type": "response", "id": request_id, "result": result})
+            except HTTPException as e:
+                await self.send({"type": "error", "id": request_id, "error": e.detail})
+            except (ValueError, ValidationError) as e:
+                await self.send({"type": "error", "id": request_id, "error": str(e)})
+            except Exception as e:
+                logger.error(f"WebSocket {method} failed: {e}")
+                await self.send({"type": "error", "id": request_id, "error": "Internal error"})
+
+    def request(self, message: Dict):
+        ws_metrics["requests"] += 1
+        params = message.get("params") or {}
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object")
+        task = asyncio.create_task(self._handle_request(message.get("id"), str(message.get("method")), params))
+        self.requests.add(task)
+        task.add_done_callback(self.requests.discard)
+
+    # --- Dispatch ---
+
+    async def handle(self, message: Dict):
+        kind = message.get("type")
+        try:
+            if kind == "subscribe":
+                self.subscribe(message.get("channel"))
+            elif kind == "unsubscribe":
+                self.unsubscribe(message.get("channel"))
+            elif kind == "request":
+                self.request(message)
+            elif kind == "ping":
+                await self.send({"type": "pong"})
+            else:
+                raise ValueError(f"Unknown message type: {kind}")
+        except ValueError as e:
+            await self.send({"type": "error", "id": message.get("id"), "error": str(e)})
+
+    def close(self):
+        for task in list(self.subscriptions.values()) + list(self.requests):
+            task.cancel()
+        self.subscriptions.clear()
+
+
+def _decode_frame(frame: Dict) -> Optional[Dict]:
+    """A received frame as a dict (JSON text or MessagePack bytes), or None if malformed."""
+    try:
+        if frame.get("bytes") is not None:
+            message = msgpack.unpackb(frame["bytes"], raw=False, timestamp=3)
+        else:
+            message = orjson.loads(frame.get("text") or "")
+    except (ValueError, msgpack.UnpackException):
+        return None
+    return message if isinstance(message, dict) else None
+
+
+async def _authenticate(websocket: WebSocket):
+    """Wait for the auth frame; returns (user, binary) or None."""
+    from app.core.database import AsyncSessionLocal
+
+    try:
+        frame = await asyncio.wait_for(websocket.receive(), settings.WS_AUTH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return None
+    if frame["type"] != "websocket.receive":
+        return None
+    message = _decode_frame(frame)
+    if not message or message.get("type") != "auth":
+        return None
+    payload = auth_service.verify_token(str(message.get("token") or ""))
+    if not payload or payload.get("sub") is None:
+        return None
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, int(payload["sub"]))
+    if user is None:
+        return None
+    return user, frame.get("bytes") is not None
+
+
+@router.websocket("/ws")
+async def multiplexed_socket(websocket: WebSocket):
+    await websocket.accept()
+    authenticated = await _authenticate(websocket)
+    if authenticated is None:
+        ws_metrics["auth_failures"] += 1
+        await websocket.close(code=CLOSE_UNAUTHORIZED, reason="Authentication required")
+        return
+
+    user, binary = authenticated
+    connection = MultiplexedConnection(websocket, user, binary)
+    ws_metrics["open"] += 1
+    ws_metrics["opened"] += 1
+    try:
+        await connection.send({
+            "type": "ready",
+            "user_id": user.id,
+            "channels": list(CHANNELS),
+            "methods": ["intervention.check", "intervention.log", "intervention.response",
+                        "biometrics.history", "activity.recent", "dashboard.get", "realtime.dashboard"],
+        })
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            message = _decode_frame(frame)
+            if message is None:
+                await websocket.close(code=CLOSE_POLICY, reason="Malformed frame")
+                break
+            await connection.handle(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        connection.close()
+        ws_metrics["open"] -= 1
@@ -0,0 +1,141 @@
+"""
+Response compression.
+
+Negotiates brotli (when the optional `brotli` package is installed) or gzip
+from Accept-Encoding and compresses responses of at least
+RESPONSE_COMPRESSION_MIN_BYTES. Unlike Starlette's GZipMiddleware it never
+touches Server-Sent Events or MessagePack event streams, which must reach
+the client unbuffered.
+
+Compressed responses get `Vary: Accept-Encoding`, and a strong ETag is
+downgraded to a weak one since the bytes on the wire differ per encoding
+(the response cache compares ETags weakly).
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli  # Optional dependency
+except ImportError:
+    brotli = None
+
+# Streams that must not be buffered in a compressor (SSE and MessagePack event
+# streams), or are already compressed
+SKIP_CONTENT_TYPES = ("text/event-stream", "application/msgpack", "image/", "audio/", "video/", "application/zip", "application/gzip")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported encoding in an Accept-Encoding header ("br", "gzip" or None)."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[token.strip()] = quality
+
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = None
+    for encoding in candidates:
+        quality = offered.get(encoding, offered.get("*", 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31: gzip container
+            self._zlib = zlib.compressobj(settings.RESPONSE_COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.RESPONSE_COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                # First body chunk: decide whether this response is compressed
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or start["status"] < 200 or start["status"] in (204, 304)
+                    or any(content_type.startswith(skip) for skip in SKIP_CONTENT_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                )
+                if passthrough:
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if more_body:
+                    del headers["content-length"]
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+                else:
+                    payload = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(payload))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": payload})
+                return
+
+            if passthrough or compressor is None:
+                await send(message)
+            elif more_body:
+                await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.compress(body) + compressor.finish()})
+
+        await self.app(scope, receive, send_compressed)
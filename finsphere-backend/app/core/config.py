@@ -18,6 +18,106 @@ class Settings(BaseSettings):
     QDRANT_HOST: str = "localhost"
     QDRANT_PORT: int = 6333
     QDRANT_COLLECTION_NAME: str = "finsphere_context"
+    VECTOR_RERANK_POOL_FACTOR: int = 4  # Candidates fetched per result when re-ranking
+    QDRANT_BATCH_SIZE: int = 100  # Points per upsert request for batched writes
+    
+    # Ingestion
+    INGEST_MAX_BATCH_SIZE: int = 5000  # Max samples per batch ingest request
+    INGEST_QUEUE_PATH: str = "data/ingest_queue.db"  # SQLite file backing the durable job queue
+    INGEST_QUEUE_WORKERS: int = 4          # Async workers draining the queue
+    INGEST_QUEUE_BATCH_SIZE: int = 100     # Jobs handed to a handler per call
+    INGEST_QUEUE_MAX_DEPTH: int = 50000    # Pending jobs before ingest returns 503
+    INGEST_QUEUE_MAX_ATTEMPTS: int = 5     # Attempts before a job is dead-lettered
+    INGEST_QUEUE_BACKOFF_SECONDS: float = 1.0  # Base retry delay, doubled per attempt
+    INGEST_QUEUE_POLL_SECONDS: float = 1.0     # Idle worker poll interval
+    INGEST_QUEUE_LEASE_SECONDS: float = 300.0  # Claimed jobs not completed or failed by then are claimed again
+    INGEST_QUEUE_RETRY_AFTER_SECONDS: int = 5  # Retry-After sent with 503 when full
+    
+    # Sentiment scoring
+    SENTIMENT_WORKERS: int = 2         # Process pool size (0 = default thread pool)
+    SENTIMENT_CACHE_SIZE: int = 4096   # LRU entries for repeated texts
+    SENTIMENT_CHUNK_SIZE: int = 64     # Texts per worker task in batch scoring
+    
+    # Async database pool (asyncpg). Connections are only held while a query
+    # runs, so a small pool serves many concurrent requests.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0      # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800        # Recycle connections older than this (seconds)
+    DB_BUILD_INDEXES_ON_STARTUP: bool = True  # Build missing indexes concurrently in the background
+    
+    # Per-request SQL instrumentation (GET /metrics/db)
+    DB_QUERY_LOG_STATEMENTS: int = 25  # Log requests running more statements than this
+    DB_QUERY_LOG_MS: float = 200.0     # ... or spending more DB time than this
+    DB_SLOW_STATEMENT_MS: float = 100.0
+    DB_N_PLUS_ONE_DETECTION: bool = False  # Dev mode: flag repeated statement shapes per request
+    DB_N_PLUS_ONE_THRESHOLD: int = 5       # Repeats of one shape that count as an N+1 suspect
+    
+    # Monthly range partitions for biometric_readings / transactions
+    PARTITION_MONTHS_AHEAD: int = 3           # Future monthly partitions kept ready
+    PARTITION_RETENTION_MODE: str = "detach"  # "detach" keeps expired months as plain tables, "drop" deletes them
+    BIOMETRIC_RETENTION_MONTHS: int = 13      # Months of biometric readings kept attached (0 = forever)
+    TRANSACTION_RETENTION_MONTHS: int = 0     # Financial history is kept by default
+    PARTITION_MAINTENANCE_HOURS: int = 24     # How often partitions are created/expired
+    
+    # Read-through cache for per-user read endpoints
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"     # "memory" (per process) or "redis"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_TTL_SECONDS: int = 60       # Upper bound on staleness of time-relative fields
+    REDIS_URL: str = "redis://localhost:6379/0"
+    
+    # Response compression (brotli needs the optional `brotli` package, else gzip)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024   # Smaller bodies are sent as-is
+    RESPONSE_COMPRESSION_GZIP_LEVEL: int = 6
+    RESPONSE_COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; mid qualities keep encode time low
+    
+    # In-memory intervention decision state (see services/decision_state.py)
+    DECISION_STATE_REFRESH_SECONDS: int = 300  # Full rebuild from the DB; picks up other workers' writes (0 = startup only)
+    
+    # Merchant / platform domain classification (see services/site_classifier.py)
+    SITE_CATALOGUE_EXTRA_PATH: str = ""        # Extra domain,name,category CSV merged over app/data/site_catalogue.csv
+    SITE_CLASSIFIER_CACHE_SIZE: int = 16384    # Memoized hosts
+    
+    # Live stream fan-out (see services/stream_hub.py)
+    STREAM_SUBSCRIBER_QUEUE_SIZE: int = 32     # Pending events per connection before slow clients lose events
+    STREAM_HEARTBEAT_SECONDS: float = 15.0     # Keep-alive on idle connections (proxies close silent streams)
+    
+    # Postgres LISTEN/NOTIFY change feed for /stream/activity (see services/change_feed.py)
+    CHANGE_FEED_ENABLED: bool = True
+    CHANGE_FEED_CHANNEL: str = "finsphere_changes"
+    
+    # Synthetic biometric/email data (see services/fake_data_stream.py)
+    SYNTHETIC_DATA_SEED: int = 42  # Same seed + user + window -> same historical series
+    
+    # Rolling per-user state behind /realtime/dashboard (see services/realtime_state.py)
+    REALTIME_BIOMETRIC_WINDOW: int = 60  # Recent biometric samples kept per user
+    REALTIME_EMAIL_WINDOW: int = 10      # Recent emails/messages counted for stress triggers and risk
+    REALTIME_MAX_USERS: int = 10000      # Least recently used users are dropped beyond this
+    
+    # Multiplexed WebSocket /ws (see api/websocket.py)
+    WS_AUTH_TIMEOUT_SECONDS: float = 10.0       # Auth frame deadline after connect
+    WS_DASHBOARD_REFRESH_SECONDS: float = 60.0  # Dashboard recompute when no activity arrives
+    
+    # Traffic recording for load tests (see core/traffic_recorder.py, docs/load-testing.md)
+    TRAFFIC_RECORD_PATH: str = ""                     # JSONL file to append requests to ("" = off)
+    TRAFFIC_RECORD_HEADERS: str = "content-type,accept,accept-encoding"  # Headers kept (no Authorization)
+    TRAFFIC_RECORD_EXCLUDE: str = "/api/v1/stream,/api/v1/ws,/docs,/openapi.json,/redoc"
+    TRAFFIC_RECORD_MAX_BODY_BYTES: int = 1_048_576    # Larger bodies are not recorded
+    
+    # Shared market data cache for investment recommendations (see services/market_data.py)
+    MARKET_DATA_PROVIDER: str = "simulated"           # "simulated" or "replay" (CSV ticks, for offline runs)
+    MARKET_DATA_REPLAY_PATH: str = ""                 # Replay CSV ("" = bundled app/data/market_replay_sample.csv)
+    MARKET_DATA_TTLS: str = "indices=60,vix=60,sectors=300,forex=300,commodities=900,bonds=3600"  # feed=seconds
+    MARKET_DATA_DEFAULT_TTL_SECONDS: float = 300.0    # Feeds not listed above
+    MARKET_DATA_MAX_STALE_SECONDS: float = 3600.0     # Served past TTL while refreshing; older data is waited on
+    MARKET_DATA_RETRY_SECONDS: float = 30.0           # Wait after a failed refresh before trying again
+    
+    # Per-user stress baselines
+    BASELINE_MIN_SAMPLES: int = 30     # Readings before personal scoring replaces population thresholds
+    BASELINE_WINDOW: int = 10000       # Effective sample window of the rolling mean/variance
+    BASELINE_EWMA_ALPHA: float = 0.05
+    BASELINE_FLUSH_SECONDS: int = 60   # How often changed baselines are persisted
     
     # Ollama LLM Configuration (Local/Network)
     OLLAMA_HOST: str = "localhost"
@@ -1,7 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.models.database import Base
 from app.core.config import settings
+from app.core.query_metrics import query_metrics
 import os
 
 # Database URL
@@ -31,9 +34,38 @@ except Exception as e:
     # Create a dummy engine that will fail later
     engine = None
 
+# Statement count / DB time per request (see app/core/query_metrics.py)
+query_metrics.instrument(engine)
+
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine else None
 
+# Async engine (asyncpg) for the API. The sync engine above stays in use for
+# scripts, DDL and background writers that run in threads.
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+try:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    ) if engine else None
+except Exception as e:
+    print(f"❌ Async database engine unavailable: {e}")
+    async_engine = None
+
+if async_engine is not None:
+    query_metrics.instrument(async_engine.sync_engine)
+
+# expire_on_commit=False: ORM objects stay readable after commit without lazy IO
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+) if async_engine else None
+
 def create_tables():
     """Create all database tables"""
     try:
@@ -41,6 +73,9 @@ def create_tables():
             print("❌ Cannot create tables: No database connection")
             return
         Base.metadata.create_all(bind=engine)
+        # Partitioned tables need their month/default partitions before any insert
+        from app.core.partitions import maintain
+        maintain(engine)
         print("✅ Database tables created/verified")
     except Exception as e:
         print(f"❌ Error creating tables: {e}")
@@ -58,4 +93,22 @@ def get_db():
         print(f"❌ Database error: {e}")
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Get async database session dependency"""
+    if AsyncSessionLocal is None:
+        raise Exception("Database not connected")
+    
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            print(f"❌ Database error: {e}")
+            raise
+
+async def dispose_async_engine():
+    """Close pooled async connections on shutdown"""
+    if async_engine is not None:
+        await async_engine.dispose()
@@ -0,0 +1,117 @@
+"""
+Index maintenance for the per-user event tables.
+
+create_all() only builds indexes together with new tables. Existing
+databases get the time-ordered indexes declared on the models through
+ensure_indexes(), which uses CREATE INDEX CONCURRENTLY so ingestion keeps
+writing while large tables are indexed. Partitioned tables get their index
+built per partition and attached to the parent.
+
+Run at startup (DB_BUILD_INDEXES_ON_STARTUP) or by hand:
+    python -m app.core.indexes
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import Index, text
+from sqlalchemy.schema import CreateIndex
+
+from app.core.partitions import is_partitioned, list_partitions
+from app.models.database import BiometricReading, Transaction, Intervention, BudgetCategory
+
+logger = logging.getLogger(__name__)
+
+# Tables whose hot queries filter by user_id (and usually a timestamp window)
+INDEXED_MODELS = (BiometricReading, Transaction, Intervention, BudgetCategory)
+
+
+def managed_indexes() -> List[Index]:
+    """Named composite indexes declared in the models' __table_args__."""
+    return [
+        index
+        for model in INDEXED_MODELS
+        for index in model.__table__.indexes
+        if len(index.expressions) > 1
+    ]
+
+
+def _drop_invalid(conn, name: str):
+    """A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep."""
+    relkind = conn.execute(text(
+        "SELECT c.relkind FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).scalar()
+    if relkind:
+        logger.warning(f"Dropping invalid index {name} left by an interrupted build")
+        # Partitioned (parent) indexes cannot be dropped concurrently
+        concurrently = "" if relkind == "I" else "CONCURRENTLY "
+        conn.execute(text(f'DROP INDEX {concurrently}IF EXISTS "{name}"'))
+
+
+def _build_partitioned(conn, index: Index, ddl: str):
+    """
+    CONCURRENTLY is not supported on a partitioned parent: build each
+    partition's index concurrently, then create the parent index ON ONLY
+    and attach them (the parent becomes valid once all are attached).
+    """
+    table = index.table.name
+    prefix = f"CREATE INDEX IF NOT EXISTS {index.name} ON {table} "
+    if not ddl.startswith(prefix):
+        raise ValueError(f"Unexpected index DDL: {ddl}")
+    definition = ddl[len(prefix):]
+
+    children = []
+    for partition in list_partitions(conn, table):
+        child = f"{index.name}_{partition[len(table) + 1:]}"[:63]
+        _drop_invalid(conn, child)
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}"))
+        children.append(child)
+
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index.name} ON ONLY {table} {definition}"))
+    for child in children:
+        conn.execute(text(f"ALTER INDEX {index.name} ATTACH PARTITION {child}"))
+
+
+def ensure_indexes(engine=None) -> List[str]:
+    """
+    Build any missing managed indexes without blocking writes.
+    Returns the names of indexes that were created.
+    """
+    if engine is None:
+        from app.core.database import engine
+    if engine is None or engine.dialect.name != "postgresql":
+        return []
+
+    created = []
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in managed_indexes():
+            _drop_invalid(conn, index.name)
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {"name": index.name}
+            ).scalar()
+            if exists:
+                continue
+
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+            logger.info(f"Building index {index.name}")
+            try:
+                if is_partitioned(conn, index.table.name):
+                    _build_partitioned(conn, index, ddl)
+                else:
+                    conn.execute(text(ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+                created.append(index.name)
+            except Exception as e:
+                logger.error(f"Index build failed for {index.name}: {e}")
+                _drop_invalid(conn, index.name)
+
+        if created:
+            for model in INDEXED_MODELS:
+                conn.execute(text(f"ANALYZE {model.__tablename__}"))
+    return created
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Created indexes: {ensure_indexes() or 'none (all present)'}")
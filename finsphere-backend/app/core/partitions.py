@@ -0,0 +1,245 @@
+"""
+Monthly range partitions for biometric_readings and transactions.
+
+Both tables are declared PARTITION BY RANGE (timestamp) on the models. This
+module keeps them usable and bounded:
+
+- One partition per calendar month (UTC), e.g. biometric_readings_p202610,
+  created PARTITION_MONTHS_AHEAD months in advance.
+- A DEFAULT partition catches backfills and clock-skewed samples outside the
+  prepared months; when a month partition is created later, its rows are
+  moved out of the default partition first.
+- Retention detaches (or drops) whole partitions older than the configured
+  number of months instead of running large DELETEs.
+- migrate_to_partitioned() converts a pre-existing plain table in place.
+
+Maintenance runs from create_tables(), then periodically via
+partition_manager. Manual run:
+    python -m app.core.partitions [--migrate]
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.models.database import Base
+
+logger = logging.getLogger(__name__)
+
+PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def partitioned_tables() -> Dict[str, int]:
+    """Partitioned table name -> retention in months (0 = keep forever)."""
+    return {
+        "biometric_readings": settings.BIOMETRIC_RETENTION_MONTHS,
+        "transactions": settings.TRANSACTION_RETENTION_MONTHS,
+    }
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def is_partitioned(conn, table: str) -> bool:
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn, table: str) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": table}).scalars())
+
+
+def ensure_default_partition(conn, table: str):
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+
+
+def create_month_partition(conn, table: str, month: datetime) -> bool:
+    """Create the partition for `month`; returns False if it already exists."""
+    name = partition_name(table, month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return False
+
+    bounds = {"start": month, "end": _add_months(month, 1)}
+    start, end = bounds["start"].isoformat(), bounds["end"].isoformat()
+    default = f"{table}_default"
+    has_default = conn.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar()
+    stranded = has_default and conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE timestamp >= :start AND timestamp < :end)"
+    ), bounds).scalar()
+
+    if stranded:
+        # Rows for this month landed in the default partition: move them into
+        # a standalone table, then attach it (ATTACH re-checks the default).
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = conn.execute(text(
+            f"WITH moved AS (DELETE FROM {default} WHERE timestamp >= :start AND timestamp < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), bounds).rowcount
+        conn.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        logger.info(f"Created partition {name} with {moved} rows moved from {default}")
+    else:
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        logger.info(f"Created partition {name}")
+    return True
+
+
+def expire_partitions(conn, table: str, retention_months: int, mode: str) -> List[str]:
+    """Detach (or drop) month partitions entirely older than the retention window."""
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months(_month_start(datetime.now(timezone.utc)), -retention_months)
+    expired = []
+    for name in list_partitions(conn, table):
+        match = PARTITION_SUFFIX.search(name)
+        if not match:
+            continue
+        month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+        if month >= cutoff:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if mode == "drop":
+            conn.execute(text(f"DROP TABLE {name}"))
+        expired.append(name)
+        logger.info(f"{'Dropped' if mode == 'drop' else 'Detached'} expired partition {name}")
+    return expired
+
+
+def maintain(engine=None) -> Dict[str, Dict[str, List[str]]]:
+    """Create upcoming partitions and apply retention for every partitioned table."""
+    if engine is None:
+        from app.core.database import engine
+    if engine is None or engine.dialect.name != "postgresql":
+        return {}
+
+    current = _month_start(datetime.now(timezone.utc))
+    report = {}
+    for table, retention in partitioned_tables().items():
+        with engine.begin() as conn:
+            if not is_partitioned(conn, table):
+                logger.warning(f"{table} is not partitioned; run python -m app.core.partitions --migrate")
+                continue
+            ensure_default_partition(conn, table)
+            created = [
+                partition_name(table, _add_months(current, offset))
+                for offset in range(settings.PARTITION_MONTHS_AHEAD + 1)
+                if create_month_partition(conn, table, _add_months(current, offset))
+            ]
+            expired = expire_partitions(conn, table, retention, settings.PARTITION_RETENTION_MODE)
+        report[table] = {"created": created, "expired": expired}
+    return report
+
+
+def migrate_to_partitioned(table: str, engine=None) -> bool:
+    """
+    Convert an existing plain table into the partitioned layout in one
+    transaction: rename it aside, create the partitioned table and the
+    month partitions its data needs, copy rows, carry over the id sequence
+    and drop the old table. Blocks writes to the table while it runs.
+    """
+    if engine is None:
+        from app.core.database import engine
+
+    model_table = Base.metadata.tables[table]
+    legacy = f"{table}_legacy"
+    with engine.begin() as conn:
+        if is_partitioned(conn, table) or not conn.execute(text("SELECT to_regclass(:t)"), {"t": table}).scalar():
+            return False
+
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}).scalar()
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {legacy}_id_seq"))
+        # Index names are schema-wide; free them for the new table
+        for index in conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = :t"), {"t": legacy}
+        ).scalars().all():
+            conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{(index + "_legacy")[:63]}"'))
+
+        model_table.create(conn)
+        ensure_default_partition(conn, table)
+        first, last = conn.execute(text(f"SELECT MIN(timestamp), MAX(timestamp) FROM {legacy}")).one()
+        month = _month_start(first or datetime.now(timezone.utc))
+        end = _add_months(_month_start(datetime.now(timezone.utc)), settings.PARTITION_MONTHS_AHEAD)
+        if last is not None:
+            end = max(end, _month_start(last))
+        while month <= end:
+            create_month_partition(conn, table, month)
+            month = _add_months(month, 1)
+
+        columns = ", ".join(f'"{column.name}"' for column in model_table.columns)
+        copied = conn.execute(text(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}"
+        )).rowcount
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"GREATEST((SELECT MAX(id) FROM {table}), 1))"
+        ))
+        conn.execute(text(f"DROP TABLE {legacy}"))
+    logger.info(f"Migrated {table} to monthly partitions ({copied} rows)")
+    return True
+
+
+class PartitionManager:
+    """Runs partition maintenance periodically in a worker thread."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.last_report: Dict = {}
+
+    async def run_once(self):
+        try:
+            self.last_report = await asyncio.to_thread(maintain)
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+
+    async def _run_periodically(self):
+        while True:
+            await asyncio.sleep(settings.PARTITION_MAINTENANCE_HOURS * 3600)
+            await self.run_once()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Global instance
+partition_manager = PartitionManager()
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    if "--migrate" in sys.argv:
+        for name in partitioned_tables():
+            print(f"{name}: {'migrated' if migrate_to_partitioned(name) else 'already partitioned'}")
+    print(maintain())
@@ -0,0 +1,232 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor-execute events on both engines (the asyncpg engine is instrumented
+through its sync_engine) record every statement into the stats of the
+request being served, found through a contextvar set by
+QueryMetricsMiddleware. For each request this tracks the statement count,
+total DB time and the slowest statement; per route the totals are
+aggregated for GET /metrics/db and /status.
+
+- Requests above DB_QUERY_LOG_STATEMENTS statements or DB_QUERY_LOG_MS of
+  DB time, and statements slower than DB_SLOW_STATEMENT_MS, are logged.
+- With DB_N_PLUS_ONE_DETECTION (dev mode) a statement shape repeated
+  DB_N_PLUS_ONE_THRESHOLD times within one request is logged as an N+1
+  suspect. The shape is the SQL with literals and IN lists collapsed.
+- Responses carry a Server-Timing "db" entry.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_ROUTE = "(background)"
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \([^()]*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES (\([^()]*\)(?:, )?)+", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize SQL so statements differing only in literals/list lengths compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _VALUES_LIST.sub("VALUES (...)", shape)
+
+
+class RequestQueryStats:
+    __slots__ = ("route", "statements", "db_ms", "slowest_ms", "slowest_statement", "shapes")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.statements = 0
+        self.db_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.statements += 1
+        self.db_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms, self.slowest_statement = elapsed_ms, statement
+        if settings.DB_N_PLUS_ONE_DETECTION:
+            self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one_suspects(self) -> Dict[str, int]:
+        threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+class RouteQueryStats:
+    __slots__ = ("requests", "statements", "db_ms", "max_statements", "slowest_ms",
+                 "slowest_statement", "flagged_requests", "n_plus_one_suspects")
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.db_ms = 0.0
+        self.max_statements = 0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.flagged_requests = 0
+        self.n_plus_one_suspects: Counter = Counter()
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "avg_statements": round(self.statements / self.requests, 2) if self.requests else 0.0,
+            "max_statements": self.max_statements,
+            "db_ms": round(self.db_ms, 2),
+            "avg_db_ms": round(self.db_ms / self.requests, 2) if self.requests else 0.0,
+            "slowest_ms": round(self.slowest_ms, 2),
+            "slowest_statement": self.slowest_statement,
+            "flagged_requests": self.flagged_requests,
+            "n_plus_one_suspects": dict(self.n_plus_one_suspects.most_common(5)),
+        }
+
+
+class QueryMetrics:
+    def __init__(self):
+        self.routes: Dict[str, RouteQueryStats] = {}
+        self._current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+        self._background = RequestQueryStats(BACKGROUND_ROUTE)
+        self._instrumented = set()
+
+    # --- Engine hooks ---
+
+    def instrument(self, engine):
+        """Attach cursor-execute listeners to a sync Engine (use async_engine.sync_engine for async)."""
+        if engine is None or id(engine) in self._instrumented:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        self._instrumented.add(id(engine))
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        stats = self._current.get() or self._background
+        stats.record(statement, elapsed_ms)
+        if elapsed_ms >= settings.DB_SLOW_STATEMENT_MS:
+            logger.warning(f"Slow statement ({elapsed_ms:.1f} ms) in {stats.route}: {_WHITESPACE.sub(' ', statement)[:500]}")
+
+    # --- Request scope ---
+
+    def begin(self, route: str) -> RequestQueryStats:
+        stats = RequestQueryStats(route)
+        self._current.set(stats)
+        return stats
+
+    def finish(self, stats: RequestQueryStats, route: Optional[str] = None):
+        """Fold a finished request into the per-route totals and log if over thresholds."""
+        self._current.set(None)
+        stats.route = route or stats.route
+        totals = self.routes.get(stats.route)
+        if totals is None:
+            totals = self.routes[stats.route] = RouteQueryStats()
+        totals.requests += 1
+        totals.statements += stats.statements
+        totals.db_ms += stats.db_ms
+        totals.max_statements = max(totals.max_statements, stats.statements)
+        if stats.slowest_ms > totals.slowest_ms:
+            totals.slowest_ms = stats.slowest_ms
+            totals.slowest_statement = _WHITESPACE.sub(" ", stats.slowest_statement or "")[:500]
+
+        if stats.statements > settings.DB_QUERY_LOG_STATEMENTS or stats.db_ms > settings.DB_QUERY_LOG_MS:
+            totals.flagged_requests += 1
+            logger.warning(
+                f"{stats.route}: {stats.statements} statements, {stats.db_ms:.1f} ms DB time "
+                f"(slowest {stats.slowest_ms:.1f} ms)"
+            )
+
+        suspects = stats.n_plus_one_suspects()
+        for shape, count in suspects.items():
+            totals.n_plus_one_suspects[shape[:300]] += 1
+            logger.warning(f"Possible N+1 in {stats.route}: {count}x {shape[:300]}")
+
+    def get_metrics(self) -> Dict:
+        background = self._background
+        return {
+            "routes": {
+                route: totals.to_dict()
+                for route, totals in sorted(self.routes.items(), key=lambda item: -item[1].db_ms)
+            },
+            "background": {
+                "statements": background.statements,
+                "db_ms": round(background.db_ms, 2),
+                "slowest_ms": round(background.slowest_ms, 2),
+            },
+            "n_plus_one_detection": settings.DB_N_PLUS_ONE_DETECTION,
+        }
+
+
+class RouteNames:
+    """Route templates of a served request, e.g. "GET /api/v1/dashboard/{user_id}" (not the concrete path)."""
+
+    def __init__(self):
+        self._route_paths: Optional[Dict] = None
+
+    def __call__(self, scope) -> str:
+        if self._route_paths is None and "app" in scope:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in getattr(scope["app"], "routes", [])
+                if hasattr(route, "endpoint")
+            }
+        path = (self._route_paths or {}).get(scope.get("endpoint"))
+        return f"{scope['method']} {path or 'unmatched'}"
+
+
+class QueryMetricsMiddleware:
+    """ASGI middleware scoping query stats to each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_name = RouteNames()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_metrics.begin(f"{scope['method']} {scope['path']}")
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.db_ms:.1f};desc="{stats.statements} statements"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_metrics.finish(stats, self._route_name(scope))
+
+
+# Global instance
+query_metrics = QueryMetrics()
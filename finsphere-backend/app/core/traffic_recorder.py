@@ -0,0 +1,151 @@
+"""
+Traffic recording for load tests.
+
+With TRAFFIC_RECORD_PATH set, every HTTP request is appended to that file
+as one JSON line. benchmarks/replay_traffic.py replays the file against the
+app at a chosen speed (see docs/load-testing.md). Each line holds:
+
+    {"t": 12.304, "ts": "2024-05-01T10:00:12.304+00:00",
+     "method": "POST", "path": "/api/v1/ingest/biometrics", "query": "",
+     "route": "POST /api/v1/ingest/biometrics",
+     "headers": {"content-type": "application/json"},
+     "body": "{...}", "status": 200, "duration_ms": 8.41}
+
+- `t` is seconds since recording started, so replay keeps the original
+  spacing of requests (bursts stay bursts).
+- Binary bodies (MessagePack) are stored base64-encoded in `body_b64`.
+  Bodies over TRAFFIC_RECORD_MAX_BODY_BYTES are left out and the line is
+  marked `"truncated": true`.
+- Only the TRAFFIC_RECORD_HEADERS are kept. Authorization is not recorded
+  by default.
+- Paths under TRAFFIC_RECORD_EXCLUDE (long-lived streams, docs) are not
+  recorded.
+
+Recordings contain request bodies, so treat them like production data.
+"""
+
+import base64
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+import orjson
+
+from app.core.config import settings
+from app.core.query_metrics import RouteNames
+
+logger = logging.getLogger(__name__)
+
+
+def _csv(value: str):
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+class TrafficRecorder:
+    def __init__(self):
+        self.path = Path(settings.TRAFFIC_RECORD_PATH) if settings.TRAFFIC_RECORD_PATH else None
+        self.headers = {name.lower().encode() for name in _csv(settings.TRAFFIC_RECORD_HEADERS)}
+        self.exclude = _csv(settings.TRAFFIC_RECORD_EXCLUDE)
+        self.recorded = 0
+        self.truncated = 0
+        self._file = None
+        self._started = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def records(self, path: str) -> bool:
+        return self.enabled and not path.startswith(self.exclude)
+
+    def offset(self, started: float) -> float:
+        """Seconds between the start of the recording and a request."""
+        return round(started - self._started, 4)
+
+    def write(self, entry: Dict):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Unbuffered: one small append per request, readable while recording
+            self._file = open(self.path, "ab", buffering=0)
+            logger.info(f"Recording traffic to {self.path}")
+        self._file.write(orjson.dumps(entry) + b"\n")
+        self.recorded += 1
+        self.truncated += entry.get("truncated", False)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path) if self.path else None,
+            "recorded": self.recorded,
+            "truncated": self.truncated,
+        }
+
+
+class TrafficRecorderMiddleware:
+    """ASGI middleware appending each HTTP request (with its timing and status) to the recording."""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_name = RouteNames()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not traffic_recorder.records(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        entry = {
+            "t": traffic_recorder.offset(started),
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "headers": {
+                name.decode("latin-1"): value.decode("latin-1")
+                for name, value in scope["headers"] if name in traffic_recorder.headers
+            },
+            "status": None,
+        }
+        body = bytearray()
+        limit = settings.TRAFFIC_RECORD_MAX_BODY_BYTES
+
+        async def receive_and_capture():
+            message = await receive()
+            if message["type"] == "http.request" and not entry.get("truncated"):
+                body.extend(message.get("body", b""))
+                if len(body) > limit:
+                    entry["truncated"] = True
+                    body.clear()
+            return message
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                entry["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_capture, send_and_capture)
+        finally:
+            entry["status"] = entry["status"] or 500  # Raised before responding
+            entry["route"] = self._route_name(scope)
+            entry["duration_ms"] = round((time.monotonic() - started) * 1000, 3)
+            if body:
+                try:
+                    entry["body"] = body.decode()
+                except UnicodeDecodeError:
+                    entry["body_b64"] = base64.b64encode(bytes(body)).decode()
+            try:
+                traffic_recorder.write(entry)
+            except OSError as e:
+                logger.error(f"Traffic recording failed: {e}")
+
+
+# Global instance
+traffic_recorder = TrafficRecorder()
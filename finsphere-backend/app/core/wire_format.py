@@ -0,0 +1,216 @@
+"""
+Wire formats for the ingest and stream endpoints: JSON (default), NDJSON
+(batch uploads) and MessagePack, chosen by Content-Type for request bodies
+and Accept for responses. See docs/wire-format.md for the schema.
+
+MessagePack conventions:
+- Events are maps with the same field names as the JSON models.
+- Timestamps may be sent as the MessagePack Timestamp extension (type -1),
+  an ISO 8601 string or epoch seconds; responses use the extension.
+  Extension timestamps decode as aware UTC datetimes, the same as an ISO
+  string with a `Z` suffix.
+- A batch body is one array of maps, or a concatenated sequence of maps
+  (the binary analogue of NDJSON). Streams are a concatenated sequence of
+  maps, one per event, readable with any streaming unpacker; a nil object
+  is a keep-alive.
+"""
+
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Type, TypeVar
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def content_type(request: Request) -> str:
+    return request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+def wants_msgpack(request: Request) -> bool:
+    """True if the Accept header ranks MessagePack above JSON."""
+    msgpack_q = json_q = 0.0
+    for part in request.headers.get("accept", "").lower().split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        media_type = media_type.strip()
+        if media_type in MSGPACK_CONTENT_TYPES:
+            msgpack_q = max(msgpack_q, quality)
+        elif media_type in ("application/json", "text/event-stream"):
+            json_q = max(json_q, quality)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def _msgpack_default(value: Any):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)  # Naive timestamps here are UTC
+        return msgpack.Timestamp.from_datetime(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return jsonable_encoder(value)
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default, datetime=False, use_bin_type=True)
+
+
+def decode_msgpack_items(body: bytes) -> List[Any]:
+    """A MessagePack array, or a concatenated sequence of objects, as a list."""
+    # timestamp=3: Timestamp extension -> datetime; strict_map_key off for int keys
+    unpacker = msgpack.Unpacker(raw=False, timestamp=3, strict_map_key=False)
+    unpacker.feed(body)
+    items, consumed = [], 0
+    for item in unpacker:
+        items.append(item)
+        consumed = unpacker.tell()
+    if consumed != len(body):
+        raise ValueError(f"truncated MessagePack object at byte {consumed}")
+    if len(items) == 1 and isinstance(items[0], list):
+        return items[0]
+    return items
+
+
+def decode_items(request: Request, body: bytes) -> List[Any]:
+    """Batch body as a list of objects: JSON array, NDJSON or MessagePack."""
+    kind = content_type(request)
+    try:
+        if kind in MSGPACK_CONTENT_TYPES:
+            return decode_msgpack_items(body)
+        if kind in NDJSON_CONTENT_TYPES:
+            return [json.loads(line) for line in body.splitlines() if line.strip()]
+        items = json.loads(body or b"[]")
+    except (ValueError, msgpack.UnpackException) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed batch body: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a JSON array, NDJSON or MessagePack")
+    return items
+
+
+def decode_object(request: Request, body: bytes) -> Any:
+    """Single-object body: JSON or MessagePack."""
+    try:
+        if content_type(request) in MSGPACK_CONTENT_TYPES:
+            return msgpack.unpackb(body, raw=False, timestamp=3, strict_map_key=False)
+        return json.loads(body)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed body: {e}")
+
+
+def request_body(model: Type[M]) -> Callable:
+    """
+    Dependency parsing a single `model` from a JSON or MessagePack body, used
+    in place of a plain body parameter (pair it with body_openapi(model)).
+    """
+    async def parse(request: Request) -> M:
+        try:
+            return model.model_validate(decode_object(request, await request.body()))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=json.loads(e.json()))
+
+    return parse
+
+
+def negotiate(request: Request, payload: Any) -> Any:
+    """MessagePack response if the client asked for it, else the payload for FastAPI's JSON path."""
+    if wants_msgpack(request):
+        return Response(content=packb(payload), media_type=MSGPACK_MEDIA_TYPE)
+    return payload
+
+
+# Models documented through body_openapi/batch_openapi. FastAPI only adds the
+# models it parses itself to the OpenAPI components; install_openapi adds these.
+_body_models: Dict[str, Type[BaseModel]] = {}
+
+
+def _schema_ref(model: Type[BaseModel]) -> Dict:
+    _body_models[model.__name__] = model
+    return {"$ref": f"#/components/schemas/{model.__name__}"}
+
+
+def install_openapi(app):
+    """Make app.openapi() include the schemas referenced by body_openapi/batch_openapi."""
+    generate = app.openapi
+
+    def openapi() -> Dict:
+        if app.openapi_schema:
+            return app.openapi_schema
+        schema = generate()
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        for name, model in _body_models.items():
+            model_schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+            for def_name, definition in model_schema.pop("$defs", {}).items():
+                components.setdefault(def_name, definition)
+            components.setdefault(name, model_schema)
+        return schema
+
+    app.openapi = openapi
+
+
+def body_openapi(model) -> Dict:
+    """openapi_extra documenting a request body accepted as JSON or MessagePack."""
+    schema = _schema_ref(model)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                MSGPACK_MEDIA_TYPE: {"schema": schema},
+            },
+        }
+    }
+
+
+def batch_openapi(model) -> Dict:
+    """openapi_extra documenting a batch body (array) in JSON, NDJSON or MessagePack."""
+    item = _schema_ref(model)
+    schema = {"type": "array", "items": item}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                "application/x-ndjson": {"schema": item},
+                MSGPACK_MEDIA_TYPE: {"schema": schema},
+            },
+        }
+    }
+
+
+def stream_frame(event: Any, binary: bool) -> bytes:
+    """One stream event: an SSE `data:` frame, or a bare MessagePack object."""
+    if binary:
+        return packb(event)
+    return b"data: " + orjson.dumps(event, default=jsonable_encoder, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
+
+
+def heartbeat_frame(binary: bool) -> bytes:
+    """Keep-alive for idle streams: an SSE comment, or a MessagePack nil."""
+    return msgpack.packb(None) if binary else b": keep-alive\n\n"
+
+
+def stream_media_type(binary: bool) -> str:
+    return MSGPACK_MEDIA_TYPE if binary else "text/event-stream"
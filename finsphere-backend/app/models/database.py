@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -46,9 +46,11 @@ class User(Base):
 class BiometricReading(Base):
     __tablename__ = "biometric_readings"
     
-    id = Column(Integer, primary_key=True, index=True)
+    # Range-partitioned by month on timestamp (app/core/partitions.py), so the
+    # partition key is part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    timestamp = Column(DateTime(timezone=True), nullable=False)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     heart_rate = Column(Integer, nullable=False)
     hrv_ms = Column(Float, nullable=False)
     stress_score = Column(Float, nullable=False)
@@ -63,13 +65,21 @@ class BiometricReading(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="biometric_data")
+    
+    __table_args__ = (
+        # Latest-reading and time-window lookups per user (index-only for stress_score)
+        Index("ix_biometric_readings_user_ts", user_id, timestamp.desc(),
+              postgresql_include=["stress_score"]),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
 class Transaction(Base):
     __tablename__ = "transactions"
     
-    id = Column(Integer, primary_key=True, index=True)
+    # Range-partitioned by month on timestamp (app/core/partitions.py)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    timestamp = Column(DateTime(timezone=True), nullable=False)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     amount = Column(Float, nullable=False)
     currency = Column(String, default="INR")
     merchant = Column(String, nullable=False)
@@ -95,6 +105,14 @@ class Transaction(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="transactions")
+    
+    __table_args__ = (
+        Index("ix_transactions_user_ts", user_id, timestamp.desc()),
+        # Small partial index for the "recent high-stress purchases" risk check
+        Index("ix_transactions_user_ts_high_stress", user_id, timestamp.desc(),
+              postgresql_where=stress_at_time > 0.6),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
 class Intervention(Base):
     __tablename__ = "interventions"
@@ -126,6 +144,22 @@ class Intervention(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="interventions")
+    
+    __table_args__ = (
+        # Recent interventions per user; effectiveness stats are index-only
+        Index("ix_interventions_user_ts", user_id, timestamp.desc(),
+              postgresql_include=["effectiveness", "user_action"]),
+    )
+
+class UserStressBaseline(Base):
+    __tablename__ = "user_stress_baselines"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    sample_count = Column(Integer, default=0)
+    hr_mean = Column(Float)                   # EWMA heart rate (bpm)
+    hrv_mean = Column(Float)                  # EWMA HRV (ms)
+    state = Column(JSON, nullable=False)      # Welford stats, EWMA and percentile sketches
+    updated_at = Column(DateTime(timezone=True))
 
 class GigWork(Base):
     __tablename__ = "gig_work"
@@ -195,6 +229,21 @@ class BudgetCategory(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     user = relationship("User")
+    
+    __table_args__ = (
+        # Budget lookup by name when transactions are ingested
+        Index("ix_budget_categories_user_name", user_id, category_name),
+    )
+
+class BudgetMonthlySpend(Base):
+    __tablename__ = "budget_monthly_spend"
+    
+    # Running spend per budget category and calendar month (UTC), updated at ingest
+    budget_id = Column(Integer, ForeignKey("budget_categories.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)                # First day of the month
+    spent = Column(Float, nullable=False, default=0.0)
+    carried_over = Column(Float, nullable=False, default=0.0)  # Unused budget rolled over from the previous month
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 class SpendingInsight(Base):
     __tablename__ = "spending_insights"
@@ -18,6 +18,13 @@ class StressAssessment(BaseModel):
     stress_score: float  # 0.0 to 1.0
     trigger_event: Optional[str] = None
 
+class BiometricBatchResult(BaseModel):
+    user_id: str
+    accepted: int
+    stressed_count: int
+    mean_stress_score: float
+    max_stress_score: float
+
 # --- Communication ---
 class MessageInput(BaseModel):
     user_id: str
@@ -39,6 +46,20 @@ class TransactionInput(BaseModel):
     currency: str = "INR"
     merchant: str
     category: Optional[str] = None
+    budget_category: Optional[str] = None  # Defaults to the budget named like `category`
+
+class BudgetAlert(BaseModel):
+    category_name: str
+    status: str  # warning, over_budget
+    spent: float
+    budget: float  # Monthly limit plus rolled-over amount
+    utilization_percentage: float
+
+class TransactionBatchResult(BaseModel):
+    status: str
+    accepted: int
+    transaction_ids: List[int]
+    budget_alerts: List[BudgetAlert] = []
 
 # --- Intervention ---
 class InterventionRequest(BaseModel):
@@ -61,6 +82,105 @@ class DashboardStats(BaseModel):
     savings_runway: str
     recent_interventions: List[Dict[str, Any]]
 
+class ActivityTransaction(BaseModel):
+    id: int
+    timestamp: str
+    amount: float
+    merchant: str
+    category: Optional[str] = None
+    subcategory: Optional[str] = None
+    necessity_level: Optional[str] = None
+    purchase_trigger: Optional[str] = None
+    stress_at_time: Optional[float] = None
+    emotional_state: Optional[str] = None
+    intervention_shown: Optional[bool] = None
+    user_proceeded: Optional[bool] = None
+    satisfaction_score: Optional[float] = None
+    regret_score: Optional[float] = None
+
+class ActivityIntervention(BaseModel):
+    id: int
+    timestamp: str
+    url: str
+    website_category: Optional[str] = None
+    estimated_amount: Optional[float] = None
+    reason: str
+    severity: str
+    user_stress_level: Optional[float] = None
+    user_action: Optional[str] = None
+    final_outcome: Optional[str] = None
+    effectiveness: Optional[str] = None
+
+class RecentActivityResponse(BaseModel):
+    recent_transactions: List[ActivityTransaction]
+    recent_interventions: List[ActivityIntervention]
+    total_transactions: int
+    total_interventions: int
+    next_cursor: Optional[str] = None   # Pass as `cursor` for older items
+    since_cursor: Optional[str] = None  # Pass as `since` to poll for newer items
+    has_more: bool = False              # More items: follow next_cursor, or poll again with since_cursor
+
+# --- Simulated Wearable / Email Streams ---
+class BiometricPoint(BaseModel):
+    user_id: str
+    timestamp: str
+    heart_rate: float
+    hrv_ms: float
+    stress_level: float  # 0-10
+    activity_level: str  # low, moderate, high
+    recovery_score: float
+    sleep_quality: float
+    source: str
+    raw_stress_score: float  # 0.0 to 1.0
+
+class EmailSentiment(BaseModel):
+    timestamp: str
+    sender: str
+    subject: str
+    content_preview: str
+    sentiment_score: float  # -1 to 1
+    sentiment_label: str
+    stress_trigger: bool
+    priority: str
+    category: str
+    emotional_impact: float  # 0 to 10
+
+class EmailSummary(BaseModel):
+    timestamp: str
+    sender: str
+    subject: str
+    sentiment_score: float
+    stress_trigger: bool
+    priority: str
+    category: str
+
+class HistoricalBiometricsResponse(BaseModel):
+    user_id: int
+    time_range_hours: int
+    data_points: int
+    biometrics: List[BiometricPoint]
+
+class HistoricalEmailsResponse(BaseModel):
+    user_id: int
+    time_range_hours: int
+    email_count: int
+    emails: List[EmailSentiment]
+
+class RealtimeDashboardSummary(BaseModel):
+    user_id: int
+    timestamp: str
+    current_biometric: BiometricPoint
+    stress_level: str
+    stress_score: float
+    spending_risk: str
+    cognitive_load: str
+    heart_rate: float
+    hrv: float
+    recovery_score: float
+    recent_emails_count: int
+    stress_trigger_emails: int
+    recent_emails: List[EmailSummary]
+
 # --- Therapy ---
 class TherapyMessage(BaseModel):
     user_id: str
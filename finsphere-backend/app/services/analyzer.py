@@ -1,50 +1,44 @@
-from textblob import TextBlob
-from typing import Tuple
+from typing import Optional, Tuple, Sequence
+import numpy as np
+from app.services.stress_scoring import stress_score, stress_scores
+from app.services.stress_baseline import stress_baseline_store
+from app.services.sentiment_engine import sentiment_engine
 
 class AnalyzerService:
     
     @staticmethod
     def analyze_sentiment(text: str) -> Tuple[float, str]:
         """
-        Analyze text sentiment using TextBlob.
+        Analyze text sentiment using the TextBlob pattern lexicon (cached).
+        Blocks the calling thread; async code should use sentiment_engine.analyze.
         Returns (polarity_score, label)
         """
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity # -1.0 to 1.0
-        
-        if polarity > 0.1:
-            return polarity, "positive"
-        elif polarity < -0.1:
-            return polarity, "negative"
-        else:
-            return polarity, "neutral"
+        return sentiment_engine.score(text)
 
     @staticmethod
-    def assess_stress(hr: int, hrv: float) -> Tuple[bool, float]:
+    def assess_stress(hr: int, hrv: float, user_id: Optional[int] = None) -> Tuple[bool, float]:
         """
-        Rule-based stress assessment.
+        Stress assessment.
+        With a user_id the reading is scored against that user's own HR/HRV
+        baseline (and folded into it); otherwise, or while the baseline is
+        still warming up, the population heuristic is used:
+        High HR (>90) + Low HRV (<35ms) = High Stress.
         Returns (is_stressed, stress_score)
         """
-        # Simple heuristic: High HR (>90) + Low HRV (<30ms) = High Stress
-        # This is a simplification. Real models would use baselines.
-        
-        score = 0.0
-        is_stressed = False
-        
-        # Normalize HR (assuming 60-100 resting range for simplicity)
-        hr_score = max(0, min(1, (hr - 60) / 40))
-        
-        # Normalize HRV (assuming 20-100 range, lower is worse)
-        # Invert so high score = bad
-        hrv_score = max(0, min(1, (100 - hrv) / 80))
-        
-        # Combined stress score
-        score = (hr_score * 0.4) + (hrv_score * 0.6)
-        
-        if hr > 90 and hrv < 35:
-            is_stressed = True
-            score = max(score, 0.8) # Force high score
-            
-        return is_stressed, score
+        if user_id is not None:
+            return stress_baseline_store.assess(user_id, hr, hrv)
+        return stress_score(hr, hrv)
+
+    @staticmethod
+    def assess_stress_batch(
+        hr: Sequence[float], hrv: Sequence[float], user_id: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of assess_stress for batch ingestion.
+        Returns (is_stressed, stress_score) arrays.
+        """
+        if user_id is not None:
+            return stress_baseline_store.assess_batch(user_id, hr, hrv)
+        return stress_scores(hr, hrv)
 
 analyzer = AnalyzerService()
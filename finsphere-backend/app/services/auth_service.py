@@ -4,9 +4,11 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.database import User
-from app.core.database import get_db
+from app.core.database import get_async_db
+import asyncio
 import os
 
 # Configuration
@@ -60,27 +62,28 @@ class AuthService:
             return None
     
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).where(User.email == email).limit(1))
         if not user:
             return None
-        if not AuthService.verify_password(password, user.hashed_password):
+        # bcrypt is deliberately slow; keep it off the event loop
+        if not await asyncio.to_thread(AuthService.verify_password, password, user.hashed_password):
             return None
         return user
     
     @staticmethod
-    def create_user(db: Session, email: str, password: str, full_name: str, **kwargs) -> User:
+    async def create_user(db: AsyncSession, email: str, password: str, full_name: str, **kwargs) -> User:
         """Create a new user"""
         # Check if user already exists
-        if db.query(User).filter(User.email == email).first():
+        if await db.scalar(select(User.id).where(User.email == email).limit(1)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
         # Create user
-        hashed_password = AuthService.get_password_hash(password)
+        hashed_password = await asyncio.to_thread(AuthService.get_password_hash, password)
         user = User(
             email=email,
             hashed_password=hashed_password,
@@ -89,14 +92,14 @@ class AuthService:
         )
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
 # Dependency to get current user
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -114,7 +117,7 @@ def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, int(user_id))
     if user is None:
         raise credentials_exception
     
@@ -0,0 +1,247 @@
+"""
+Budget Tracking
+Per-category, per-month running spend totals maintained at transaction ingest.
+
+- Transactions are matched to a BudgetCategory by name (explicit
+  `budget_category`, else the transaction category, case-insensitive).
+- Each (budget, month) row is bumped atomically with
+  INSERT ... ON CONFLICT DO UPDATE SET spent = spent + excluded.spent.
+- A month is "opened" for all of a user's budgets by the first spend
+  recorded in it (reads never write); budgets with rollover_enabled carry
+  their unused amount from the previous month (the full limit if the budget
+  existed but has no row for that month). Spend recorded for a month
+  re-derives the carry-over of later months already opened, so backdated
+  transactions roll forward.
+- Alerts are raised when a batch pushes a category across its alert
+  threshold or over budget.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.database import BudgetCategory, BudgetMonthlySpend
+
+
+def month_start(value: Optional[datetime] = None) -> date:
+    value = value or datetime.now(timezone.utc)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def previous_month(month: date) -> date:
+    return date(month.year - 1, 12, 1) if month.month == 1 else date(month.year, month.month - 1, 1)
+
+
+def _carry_over(previous, month: date):
+    """
+    SQL for the amount a budget carries into `month`, given its
+    previous-month row outer-joined as `previous`. A budget that existed
+    last month without a row there (no spend, no reads) spent nothing.
+    """
+    rollover = BudgetCategory.rollover_enabled == True
+    return case(
+        (
+            and_(rollover, previous.budget_id.isnot(None)),
+            func.greatest(BudgetCategory.monthly_limit + previous.carried_over - previous.spent, 0.0)
+        ),
+        (
+            and_(rollover, BudgetCategory.created_at < month),
+            func.greatest(BudgetCategory.monthly_limit, 0.0)
+        ),
+        else_=0.0
+    )
+
+
+def _join_previous(query, previous, month: date):
+    return query.outerjoin(
+        previous,
+        and_(previous.budget_id == BudgetCategory.id, previous.month == previous_month(month))
+    )
+
+
+class BudgetService:
+    async def match_budgets(self, db: AsyncSession, user_id: int, names: Iterable[Optional[str]]) -> Dict[str, BudgetCategory]:
+        """User budgets keyed by lower-cased name, limited to the given names."""
+        wanted = {name.lower() for name in names if name}
+        if not wanted:
+            return {}
+        budgets = await db.scalars(
+            select(BudgetCategory).where(
+                BudgetCategory.user_id == user_id,
+                func.lower(BudgetCategory.category_name).in_(wanted)
+            )
+        )
+        return {budget.category_name.lower(): budget for budget in budgets}
+
+    async def open_month(self, db: AsyncSession, user_id: int, month: date):
+        """
+        Create this month's spend rows for all of the user's budgets (idempotent).
+        Rollover budgets start with last month's unused amount.
+        """
+        previous = aliased(BudgetMonthlySpend)
+        rows = _join_previous(
+            select(BudgetCategory.id, literal(month), literal(0.0), _carry_over(previous, month)),
+            previous, month
+        ).where(BudgetCategory.user_id == user_id)
+        await db.execute(
+            insert(BudgetMonthlySpend)
+            .from_select(["budget_id", "month", "spent", "carried_over"], rows)
+            .on_conflict_do_nothing(index_elements=["budget_id", "month"])
+        )
+
+    async def refresh_carry_over(self, db: AsyncSession, budget_ids: List[int],
+                                 after: date) -> Dict[Tuple[int, date], float]:
+        """
+        Re-derive carried_over for the budgets' months after `after` that are
+        already open, oldest first so each month sees its predecessor's new
+        value. Returns the new carried_over by (budget_id, month).
+        """
+        months = (await db.scalars(
+            select(BudgetMonthlySpend.month).distinct()
+            .where(BudgetMonthlySpend.budget_id.in_(budget_ids), BudgetMonthlySpend.month > after)
+            .order_by(BudgetMonthlySpend.month)
+        )).all()
+
+        carried: Dict[Tuple[int, date], float] = {}
+        for month in months:
+            previous = aliased(BudgetMonthlySpend)
+            carry = _join_previous(select(_carry_over(previous, month)), previous, month).where(
+                BudgetCategory.id == BudgetMonthlySpend.budget_id
+            ).scalar_subquery()
+            result = await db.execute(
+                update(BudgetMonthlySpend)
+                .where(BudgetMonthlySpend.budget_id.in_(budget_ids), BudgetMonthlySpend.month == month)
+                .values(carried_over=carry)
+                .returning(BudgetMonthlySpend.budget_id, BudgetMonthlySpend.carried_over)
+            )
+            carried.update({(budget_id, month): value for budget_id, value in result.all()})
+        return carried
+
+    async def record_spend(self, db: AsyncSession, user_id: int,
+                           items: List[Tuple[BudgetCategory, datetime, float]]) -> List[Dict]:
+        """
+        Add (budget, timestamp, amount) items to the monthly totals in the
+        caller's transaction. Returns alerts for thresholds crossed.
+        """
+        if not items:
+            return []
+
+        added: Dict[Tuple[int, date], float] = defaultdict(float)
+        budgets = {}
+        for budget, timestamp, amount in items:
+            added[(budget.id, month_start(timestamp))] += amount
+            budgets[budget.id] = budget
+
+        for month in {month for _, month in added}:
+            await self.open_month(db, user_id, month)
+
+        stmt = insert(BudgetMonthlySpend).values([
+            {"budget_id": budget_id, "month": month, "spent": amount}
+            for (budget_id, month), amount in added.items()
+        ])
+        totals = (await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["budget_id", "month"],
+                set_={"spent": BudgetMonthlySpend.spent + stmt.excluded.spent, "updated_at": func.now()}
+            ).returning(BudgetMonthlySpend.budget_id, BudgetMonthlySpend.month,
+                        BudgetMonthlySpend.spent, BudgetMonthlySpend.carried_over)
+        )).all()
+
+        # Later months already opened carried over the old totals
+        rollover_ids = [budget_id for budget_id, budget in budgets.items() if budget.rollover_enabled]
+        carried = await self.refresh_carry_over(db, rollover_ids, min(month for _, month in added)) \
+            if rollover_ids else {}
+
+        alerts = []
+        current = month_start()
+        for budget_id, month, spent, carried_over in totals:
+            budget = budgets[budget_id]
+            carried_over = carried.get((budget_id, month), carried_over)
+            if month == current:
+                # Keep the legacy column in step with the current month
+                await db.execute(
+                    update(BudgetCategory).where(BudgetCategory.id == budget_id).values(current_spent=spent)
+                )
+            alert = self._alert(budget, spent - added[(budget_id, month)], spent, carried_over)
+            if alert and month == current:
+                alerts.append(alert)
+        return alerts
+
+    def _alert(self, budget: BudgetCategory, before: float, after: float, carried_over: float) -> Optional[Dict]:
+        limit = budget.monthly_limit + carried_over
+        if limit <= 0:
+            return None
+        threshold = limit * (budget.alert_threshold if budget.alert_threshold is not None else 0.8)
+        if before <= limit < after:
+            status = "over_budget"
+        elif before <= threshold < after:
+            status = "warning"
+        else:
+            return None
+        return {
+            "category_name": budget.category_name,
+            "status": status,
+            "spent": round(after, 2),
+            "budget": round(limit, 2),
+            "utilization_percentage": round(after / limit * 100, 1),
+        }
+
+    async def get_month_summary(self, db: AsyncSession, user_id: int, month: Optional[date] = None) -> List[Dict]:
+        """
+        All budgets with this month's spend, read in one query (nothing is
+        written; months are opened by record_spend). A budget without a row
+        for the month has spent nothing and carries over what open_month
+        would give it.
+        """
+        month = month or month_start()
+        previous = aliased(BudgetMonthlySpend)
+        rows = (await db.execute(
+            _join_previous(
+                select(
+                    BudgetCategory,
+                    BudgetMonthlySpend.spent,
+                    func.coalesce(BudgetMonthlySpend.carried_over, _carry_over(previous, month))
+                )
+                .outerjoin(
+                    BudgetMonthlySpend,
+                    and_(BudgetMonthlySpend.budget_id == BudgetCategory.id, BudgetMonthlySpend.month == month)
+                ),
+                previous, month
+            )
+            .where(BudgetCategory.user_id == user_id)
+            .order_by(BudgetCategory.id)
+        )).all()
+
+        summary = []
+        for budget, spent, carried_over in rows:
+            spent = spent or 0.0
+            limit = budget.monthly_limit + (carried_over or 0.0)
+            utilization = (spent / limit) * 100 if limit > 0 else 0
+            threshold = budget.alert_threshold if budget.alert_threshold is not None else 0.8
+            status = "over_budget" if utilization > 100 else "warning" if utilization > threshold * 100 else "good"
+            summary.append({
+                "id": budget.id,
+                "category_name": budget.category_name,
+                "monthly_limit": budget.monthly_limit,
+                "carried_over": round(carried_over or 0.0, 2),
+                "actual_spending": round(spent, 2),
+                "remaining": max(0, limit - spent),
+                "utilization_percentage": round(utilization, 1),
+                "category_type": budget.category_type,
+                "alert_threshold": budget.alert_threshold,
+                "rollover_enabled": budget.rollover_enabled,
+                "status": status,
+                "month": month.isoformat()
+            })
+        return summary
+
+
+# Global instance
+budget_service = BudgetService()
@@ -0,0 +1,191 @@
+"""
+Change Feed (Postgres LISTEN/NOTIFY)
+Pushes real ingested events to live subscribers so clients can stop polling
+/realtime/dashboard and /user/{id}/recent-activity.
+
+- Write paths call notify() inside their transaction; Postgres delivers the
+  NOTIFY only if the transaction commits, to every backend process.
+- One dedicated asyncpg connection per process LISTENs on
+  CHANGE_FEED_CHANNEL and publishes each notification to the "activity"
+  topic of the user's stream hub (SSE GET /stream/activity/{user_id}).
+  It reconnects with backoff if the connection drops.
+
+Payloads are JSON: {"type", "user_id", ...}. Batch writes send one summary
+notification (count, latest row, recent ids) to stay under Postgres'
+8000-byte NOTIFY limit.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import asyncpg
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.stream_hub import stream_hub
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_TOPIC = "activity"
+MAX_NOTIFY_BYTES = 7900  # Postgres rejects payloads of 8000 bytes or more
+MAX_BATCH_IDS = 100
+RECONNECT_MAX_SECONDS = 30.0
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+# --- Payloads (built from the rows the write paths just inserted) ---
+
+def biometric_event(user_id: int, reading: Dict) -> Dict:
+    return {
+        "type": "biometric",
+        "user_id": user_id,
+        "timestamp": _iso(reading["timestamp"]),
+        "heart_rate": reading["heart_rate"],
+        "hrv_ms": reading["hrv_ms"],
+        "stress_score": reading["stress_score"],
+    }
+
+
+def biometric_batch_event(user_id: int, readings: List[Dict]) -> Dict:
+    latest = max(readings, key=lambda reading: reading["timestamp"])
+    scores = [reading["stress_score"] for reading in readings]
+    return {
+        "type": "biometric_batch",
+        "user_id": user_id,
+        "count": len(readings),
+        "mean_stress_score": sum(scores) / len(scores),
+        "max_stress_score": max(scores),
+        "latest": biometric_event(user_id, latest),
+    }
+
+
+def transaction_event(user_id: int, transaction_id: int, txn: Dict) -> Dict:
+    return {
+        "type": "transaction",
+        "user_id": user_id,
+        "id": transaction_id,
+        "timestamp": _iso(txn["timestamp"]),
+        "amount": txn["amount"],
+        "currency": txn.get("currency", "INR"),
+        "merchant": txn["merchant"],
+        "category": txn.get("category"),
+        "budget_category": txn.get("budget_category"),
+        "stress_at_time": txn.get("stress_at_time"),
+    }
+
+
+def transaction_batch_event(user_id: int, transaction_ids: List[int], rows: List[Dict]) -> Dict:
+    latest_id, latest = max(zip(transaction_ids, rows), key=lambda item: (item[1]["timestamp"], item[0]))
+    return {
+        "type": "transaction_batch",
+        "user_id": user_id,
+        "count": len(rows),
+        "total_amount": sum(row["amount"] for row in rows),
+        "ids": list(transaction_ids[-MAX_BATCH_IDS:]),
+        "latest": transaction_event(user_id, latest_id, latest),
+    }
+
+
+def intervention_event(user_id: int, intervention) -> Dict:
+    return {
+        "type": "intervention",
+        "user_id": user_id,
+        "id": intervention.id,
+        "timestamp": _iso(intervention.timestamp),
+        "url": intervention.url,
+        "website_category": intervention.website_category,
+        "severity": intervention.severity,
+        "user_action": intervention.user_action,
+        "effectiveness": intervention.effectiveness,
+    }
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.notifications = 0
+        self.reconnects = 0
+
+    # --- Publishing side (inside the writer's transaction) ---
+
+    async def notify(self, db: AsyncSession, event: Dict):
+        """Queue a NOTIFY in the caller's transaction; delivered on commit."""
+        if not settings.CHANGE_FEED_ENABLED:
+            return
+        payload = orjson.dumps(event)
+        if len(payload) > MAX_NOTIFY_BYTES:
+            # Oversized free text (e.g. long URLs): subscribers still learn that something changed
+            payload = orjson.dumps({"type": event["type"], "user_id": event["user_id"], "truncated": True})
+        await db.execute(select(func.pg_notify(settings.CHANGE_FEED_CHANNEL, payload.decode())))
+
+    # --- Listening side ---
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            event = orjson.loads(payload)
+            self.notifications += 1
+            stream_hub.publish(ACTIVITY_TOPIC, event["user_id"], event)
+        except Exception as e:
+            logger.warning(f"Ignoring malformed change notification: {e}")
+
+    async def _listen(self):
+        from app.core.database import DATABASE_URL
+
+        dsn = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        delay = 1.0
+        while not self._stopping:
+            try:
+                self._connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                self._connection.add_termination_listener(lambda connection: lost.set())
+                await self._connection.add_listener(settings.CHANGE_FEED_CHANNEL, self._on_notification)
+                logger.info(f"Listening for changes on {settings.CHANGE_FEED_CHANNEL}")
+                delay = 1.0
+                await lost.wait()
+                logger.warning("Change feed connection lost; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change feed listener error: {e}")
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    def start(self):
+        if not settings.CHANGE_FEED_ENABLED or self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": settings.CHANGE_FEED_ENABLED,
+            "channel": settings.CHANGE_FEED_CHANNEL,
+            "listening": self._connection is not None and not self._connection.is_closed(),
+            "notifications": self.notifications,
+            "reconnects": self.reconnects,
+        }
+
+
+# Global instance
+change_feed = ChangeFeed()
@@ -0,0 +1,315 @@
+"""
+Intervention Decision State
+Per-user inputs to the intervention decision, kept in memory so
+/intervention/check answers without touching Postgres.
+
+Per user:
+- latest stress score and when it was measured (24h freshness window)
+- stress baseline fallback from the users table
+- high-stress purchases (stress_at_time > 0.6) in the last 7 days
+- intervention counters: total, prevented purchases, snoozes, proceeds
+
+The state is rebuilt from the database at startup (and every
+DECISION_STATE_REFRESH_SECONDS, which also picks up writes made by other
+workers or scripts) and updated incrementally by the ingest write paths.
+The decision rules themselves are the pure functions below, shared with
+the user data services so every path agrees.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.database import User, BiometricReading, Transaction, Intervention
+from app.services.site_classifier import site_classifier
+
+logger = logging.getLogger(__name__)
+
+STRESS_WINDOW = timedelta(hours=24)
+PURCHASE_WINDOW = timedelta(days=7)
+HIGH_STRESS_PURCHASE = 0.6
+DEFAULT_BASELINE = 0.3
+
+
+# --- Decision rules (shared with the user data services) ---
+
+def stress_level_for(stress_score: float) -> str:
+    if stress_score > 0.7:
+        return "High"
+    elif stress_score > 0.4:
+        return "Medium"
+    return "Low"
+
+
+def spending_risk_for(recent_stress_purchases: int, stress_score: float) -> str:
+    if recent_stress_purchases > 2 or stress_score > 0.7:
+        return "Critical"
+    elif recent_stress_purchases > 0 or stress_score > 0.4:
+        return "Moderate"
+    return "Safe"
+
+
+def effectiveness_for(total: int, successful: int, snooze_actions: int, proceed_actions: int) -> Dict:
+    if not total:
+        return {"success_rate": 0.5, "preferred_severity": "medium", "total_interventions": 0}
+
+    # Snoozers respond well to gentle nudges, others need stronger interventions
+    preferred_severity = "low" if snooze_actions > proceed_actions else "high"
+    return {
+        "success_rate": successful / total,
+        "preferred_severity": preferred_severity,
+        "total_interventions": total,
+        "successful_interventions": successful
+    }
+
+
+def decide_intervention(stress_level: str, stress_score: float, spending_risk: str,
+                        effectiveness: Dict, context_url: str) -> Dict:
+    """Intervention decision for a page visit given the user's current context."""
+    should_intervene = False
+    intervention_severity = "low"
+    delay_minutes = 3
+    message = "Consider waiting before making this purchase."
+
+    # Site-specific logic
+    site = site_classifier.classify(context_url)
+
+    if site.is_shopping and stress_score > 0.5:
+        should_intervene = True
+        if stress_score > 0.7:
+            intervention_severity = "high"
+            delay_minutes = 10
+            message = f"🔴 HIGH STRESS ALERT: Your stress level is {stress_level}. Take a break before purchasing."
+        elif stress_score > 0.4:
+            intervention_severity = "medium"
+            delay_minutes = 5
+            message = f"🟡 CAUTION: Elevated stress detected. Consider if this purchase aligns with your goals."
+
+    elif site.is_gig_work and stress_score > 0.6:
+        should_intervene = True
+        intervention_severity = "medium"
+        delay_minutes = 7
+        message = "High stress detected. Review your pricing carefully to avoid undervaluing your work."
+
+    # Adjust based on user's intervention history
+    if effectiveness['success_rate'] < 0.3:
+        # User often ignores interventions, try stronger approach
+        if intervention_severity == "low":
+            intervention_severity = "medium"
+        delay_minutes += 2
+
+    return {
+        "should_intervene": should_intervene,
+        "severity": intervention_severity,
+        "delay_minutes": delay_minutes,
+        "message": message,
+        "user_context": {
+            "stress_level": stress_level,
+            "stress_score": stress_score,
+            "spending_risk": spending_risk,
+            "intervention_success_rate": effectiveness['success_rate'],
+            "website_category": site.category
+        }
+    }
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive timestamps in this codebase are UTC (datetime.utcnow())."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class UserDecisionState:
+    __slots__ = ("stress_baseline", "stress_score", "stress_at", "high_stress_purchases",
+                 "interventions", "prevented", "snoozed", "proceeded", "last_intervention_id")
+
+    def __init__(self, stress_baseline: float = DEFAULT_BASELINE):
+        self.stress_baseline = stress_baseline
+        self.stress_score: Optional[float] = None
+        self.stress_at: Optional[datetime] = None
+        # transaction id -> timestamp; keyed so replays and rebuild overlap can't double count
+        self.high_stress_purchases: Dict[int, datetime] = {}
+        self.interventions = 0
+        self.prevented = 0
+        self.snoozed = 0
+        self.proceeded = 0
+        self.last_intervention_id = 0
+
+    def current_stress(self, now: datetime) -> Tuple[str, float]:
+        if self.stress_at is None or self.stress_at < now - STRESS_WINDOW:
+            # Fallback to user's baseline
+            return "Low", self.stress_baseline
+        return stress_level_for(self.stress_score), self.stress_score
+
+    def recent_stress_purchases(self, now: datetime) -> int:
+        cutoff = now - PURCHASE_WINDOW
+        expired = [txn_id for txn_id, ts in self.high_stress_purchases.items() if ts < cutoff]
+        for txn_id in expired:
+            del self.high_stress_purchases[txn_id]
+        return len(self.high_stress_purchases)
+
+    def effectiveness(self) -> Dict:
+        return effectiveness_for(self.interventions, self.prevented, self.snoozed, self.proceeded)
+
+
+class DecisionStateStore:
+    def __init__(self):
+        self.users: Dict[int, UserDecisionState] = {}
+        self.default_user_id: Optional[int] = None
+        self.last_rebuild: Optional[datetime] = None
+        self._rebuilding = False
+        self._pending: List[Tuple] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, user_id: int) -> UserDecisionState:
+        state = self.users.get(user_id)
+        if state is None:
+            state = self.users[user_id] = UserDecisionState()
+        return state
+
+    # --- Incremental updates (called after the DB commit) ---
+
+    def _record(self, event: Tuple):
+        if self._rebuilding:
+            # Re-applied on top of the rebuilt state; every event is idempotent
+            self._pending.append(event)
+        self._apply(event)
+
+    def _apply(self, event: Tuple):
+        kind, user_id, *args = event
+        state = self.get(user_id)
+        if kind == "biometric":
+            score, ts = args
+            if state.stress_at is None or ts >= state.stress_at:
+                state.stress_score, state.stress_at = score, ts
+        elif kind == "transaction":
+            txn_id, ts, stress_at_time = args
+            if stress_at_time is not None and stress_at_time > HIGH_STRESS_PURCHASE:
+                state.high_stress_purchases[txn_id] = ts
+        elif kind == "intervention":
+            intervention_id, effectiveness, user_action = args
+            if intervention_id <= state.last_intervention_id:
+                return
+            state.last_intervention_id = intervention_id
+            state.interventions += 1
+            state.prevented += effectiveness == "prevented_purchase"
+            state.snoozed += user_action == "snooze"
+            state.proceeded += user_action == "proceed"
+
+    def record_biometrics(self, user_id: int, readings: Iterable[Tuple[datetime, float]]):
+        """(timestamp, stress_score) pairs; only the newest matters."""
+        latest = max(((_utc(ts), score) for ts, score in readings), default=None, key=lambda r: r[0])
+        if latest is not None:
+            self._record(("biometric", user_id, latest[1], latest[0]))
+
+    def record_biometric(self, user_id: int, stress_score: float, timestamp: datetime):
+        self.record_biometrics(user_id, [(timestamp, stress_score)])
+
+    def record_transactions(self, user_id: int, transactions: Iterable[Tuple[int, datetime, Optional[float]]]):
+        """(transaction_id, timestamp, stress_at_time) triples."""
+        for txn_id, ts, stress_at_time in transactions:
+            self._record(("transaction", user_id, txn_id, _utc(ts), stress_at_time))
+
+    def record_intervention(self, user_id: int, intervention_id: int,
+                            effectiveness: Optional[str], user_action: Optional[str]):
+        self._record(("intervention", user_id, intervention_id, effectiveness, user_action))
+
+    # --- Reads ---
+
+    def should_intervene(self, user_id: int, context_url: str) -> Dict:
+        """Same result as PostgreSQLUserDataService.should_intervene, from memory."""
+        now = datetime.now(timezone.utc)
+        state = self.get(user_id)
+        stress_level, stress_score = state.current_stress(now)
+        spending_risk = spending_risk_for(state.recent_stress_purchases(now), stress_score)
+        return decide_intervention(stress_level, stress_score, spending_risk, state.effectiveness(), context_url)
+
+    def get_stats(self) -> Dict:
+        return {
+            "users": len(self.users),
+            "default_user_id": self.default_user_id,
+            "last_rebuild": self.last_rebuild.isoformat() if self.last_rebuild else None,
+        }
+
+    # --- Rebuild from the database ---
+
+    async def rebuild(self):
+        """Replace the state with a fresh snapshot of the database."""
+        from app.core.database import AsyncSessionLocal
+
+        now = datetime.now(timezone.utc)
+        users: Dict[int, UserDecisionState] = {}
+        self._rebuilding, self._pending = True, []
+        try:
+            async with AsyncSessionLocal() as db:
+                default_user_id = await db.scalar(select(User.id).order_by(User.id).limit(1))
+                for user_id, baseline in await db.execute(select(User.id, User.stress_baseline)):
+                    users[user_id] = UserDecisionState(baseline if baseline is not None else DEFAULT_BASELINE)
+
+                # Latest reading per user inside the freshness window (prunes old partitions)
+                latest = await db.execute(
+                    select(BiometricReading.user_id, BiometricReading.timestamp, BiometricReading.stress_score)
+                    .where(BiometricReading.timestamp >= now - STRESS_WINDOW)
+                    .distinct(BiometricReading.user_id)
+                    .order_by(BiometricReading.user_id, BiometricReading.timestamp.desc())
+                )
+                for user_id, ts, score in latest:
+                    state = users.setdefault(user_id, UserDecisionState())
+                    state.stress_score, state.stress_at = score, _utc(ts)
+
+                # Served by the partial ix_transactions_user_ts_high_stress index
+                purchases = await db.execute(
+                    select(Transaction.user_id, Transaction.id, Transaction.timestamp).where(
+                        Transaction.timestamp >= now - PURCHASE_WINDOW,
+                        Transaction.stress_at_time > HIGH_STRESS_PURCHASE
+                    )
+                )
+                for user_id, txn_id, ts in purchases:
+                    users.setdefault(user_id, UserDecisionState()).high_stress_purchases[txn_id] = _utc(ts)
+
+                counters = await db.execute(
+                    select(
+                        Intervention.user_id,
+                        func.count(),
+                        func.count().filter(Intervention.effectiveness == 'prevented_purchase'),
+                        func.count().filter(Intervention.user_action == 'snooze'),
+                        func.count().filter(Intervention.user_action == 'proceed'),
+                        func.max(Intervention.id)
+                    ).group_by(Intervention.user_id)
+                )
+                for user_id, total, prevented, snoozed, proceeded, last_id in counters:
+                    state = users.setdefault(user_id, UserDecisionState())
+                    state.interventions, state.prevented = total, prevented
+                    state.snoozed, state.proceeded = snoozed, proceeded
+                    state.last_intervention_id = last_id or 0
+
+            self.users, self.default_user_id, self.last_rebuild = users, default_user_id, now
+            for event in self._pending:
+                self._apply(event)
+            logger.info(f"Rebuilt intervention decision state for {len(users)} users")
+        except Exception as e:
+            logger.error(f"Error rebuilding intervention decision state: {e}")
+        finally:
+            self._rebuilding, self._pending = False, []
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(settings.DECISION_STATE_REFRESH_SECONDS)
+            await self.rebuild()
+
+    async def start(self):
+        await self.rebuild()
+        if self._task is None and settings.DECISION_STATE_REFRESH_SECONDS > 0:
+            self._task = asyncio.create_task(self._refresh_periodically())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Global instance
+decision_state = DecisionStateStore()
@@ -1,18 +1,49 @@
 """
 Fake Data Stream Generator
 Generates realistic real-time data for email sentiment and biometric readings
+
+- Live streams step a per-user random walk, seeded from SYNTHETIC_DATA_SEED
+  and the user id so each user's sequence is stable across restarts.
+- Historical series are generated in one shot with NumPy: AR(1) HR/HRV/stress
+  walks pulled toward time-of-day targets, and vectorized email sampling.
+  The RNG is seeded from (seed, user, window), and windows end on a minute
+  boundary, so the same request returns the same data.
 """
 
 import asyncio
+import math
 import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, AsyncGenerator
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+
+import numpy as np
 from faker import Faker
 
+from app.core.config import settings
+
 fake = Faker()
 
+HISTORY_WINDOW_ALIGN_SECONDS = 60  # Historical windows end on this boundary (reproducible within it)
+SENDER_POOL_SIZE = 20              # Seeded Faker names per category for historical emails
+
+# Smoothing of the walks: value = PHI * previous + (1 - PHI) * time-of-day target (+ noise)
+HR_PHI, HRV_PHI, STRESS_PHI = 0.7, 0.8, 0.6
+
+
+def _ar1(x0: float, phi: float, innovations: np.ndarray) -> np.ndarray:
+    """
+    x[t] = phi * x[t-1] + innovations[t] with x[-1] = x0, for the whole series.
+    Computed as a convolution with the (truncated) impulse response phi**k,
+    which is exact to float precision since phi**k vanishes after a few dozen taps.
+    """
+    n = len(innovations)
+    taps = min(n, int(math.ceil(math.log(1e-15) / math.log(phi))) + 1)
+    x = np.convolve(innovations, phi ** np.arange(taps))[:n]
+    x += x0 * phi ** np.arange(1, n + 1)
+    return x
+
 @dataclass
 class EmailData:
     """Email sentiment data structure"""
@@ -27,6 +58,14 @@ class EmailData:
     category: str        # work, finance, personal, shopping, etc.
     emotional_impact: float  # 0 to 10
     
+@dataclass
+class BiometricWalk:
+    """Per-user random-walk state so each user's readings are continuous"""
+    hr: float = 72
+    hrv: float = 28
+    stress: float = 0.4
+    rng: random.Random = field(default_factory=random.Random)
+
 class BiometricData:
     """Biometric data structure"""
     def __init__(self):
@@ -84,40 +123,8 @@ class FakeDataStreamGenerator:
             'night': {'hr_range': (55, 75), 'hrv_range': (30, 50), 'stress_base': 0.2},
         }
         
-        # Current baseline values for continuity
-        self.current_hr = 72
-        self.current_hrv = 28
-        self.current_stress = 0.4
-        
-    def get_time_period(self) -> str:
-        """Get current time period for realistic patterns"""
-        hour = datetime.now().hour
-        if 6 <= hour < 9:
-            return 'morning'
-        elif 9 <= hour < 17:
-            return 'work_hours'
-        elif 17 <= hour < 22:
-            return 'evening'
-        else:
-            return 'night'
-    
-    def generate_email(self, user_id: int) -> EmailData:
-        """Generate a single email with realistic content"""
-        category = random.choice(list(self.email_templates.keys()))
-        template = random.choice(self.email_templates[category])
-        
-        # Generate realistic sender
-        senders = {
-            'work': [f"{self.fake.first_name()}@company.com", "hr@company.com", "manager@company.com"],
-            'finance': ["noreply@bank.com", "alerts@creditcard.com", "support@investment.com"],
-            'shopping': ["deals@store.com", "noreply@amazon.com", "sales@retailer.com"],
-            'personal': [self.fake.email(), f"{self.fake.first_name().lower()}@gmail.com"]
-        }
-        
-        sender = random.choice(senders[category])
-        
-        # Generate content preview
-        content_previews = {
+        # Email content previews per category
+        self.content_previews = {
             'work': [
                 "Please review the attached documents before tomorrow's meeting...",
                 "The client has requested some changes to the proposal...",
@@ -144,7 +151,63 @@ class FakeDataStreamGenerator:
             ]
         }
         
-        content = random.choice(content_previews[category])
+        # Current values per user for continuity (users' streams must not share a walk)
+        self.walks: Dict[int, BiometricWalk] = {}
+        
+        # Lookup tables for the vectorized historical generators
+        self._periods = list(self.biometric_patterns)
+        self._hour_period = np.array([self._periods.index(self.get_time_period(hour)) for hour in range(24)])
+        patterns = [self.biometric_patterns[period] for period in self._periods]
+        self._hr_range = np.array([pattern['hr_range'] for pattern in patterns])     # (period, low/high)
+        self._hrv_range = np.array([pattern['hrv_range'] for pattern in patterns])
+        self._stress_base = np.array([pattern['stress_base'] for pattern in patterns])
+        self._categories = list(self.email_templates)
+        self._template_stress = np.array([[t['stress'] for t in self.email_templates[c]] for c in self._categories])
+        self._template_sentiment = np.array([[t['sentiment'] for t in self.email_templates[c]] for c in self._categories])
+        self._sender_pools = self._build_sender_pools()
+        
+    def _build_sender_pools(self) -> Dict[str, List[str]]:
+        """Seeded sender addresses per category, so historical emails are reproducible"""
+        seeded = Faker()
+        seeded.seed_instance(settings.SYNTHETIC_DATA_SEED)
+        names = [seeded.first_name() for _ in range(SENDER_POOL_SIZE)]
+        return {
+            'work': [f"{name}@company.com" for name in names] + ["hr@company.com", "manager@company.com"],
+            'finance': ["noreply@bank.com", "alerts@creditcard.com", "support@investment.com"],
+            'shopping': ["deals@store.com", "noreply@amazon.com", "sales@retailer.com"],
+            'personal': [seeded.email() for _ in range(SENDER_POOL_SIZE // 2)]
+                        + [f"{name.lower()}@gmail.com" for name in names[:SENDER_POOL_SIZE // 2]],
+        }
+    
+    def get_time_period(self, hour: Optional[int] = None) -> str:
+        """Get the time period (default: now) for realistic patterns"""
+        if hour is None:
+            hour = datetime.now().hour
+        if 6 <= hour < 9:
+            return 'morning'
+        elif 9 <= hour < 17:
+            return 'work_hours'
+        elif 17 <= hour < 22:
+            return 'evening'
+        else:
+            return 'night'
+    
+    def generate_email(self, user_id: int) -> EmailData:
+        """Generate a single email with realistic content"""
+        category = random.choice(list(self.email_templates.keys()))
+        template = random.choice(self.email_templates[category])
+        
+        # Generate realistic sender
+        senders = {
+            'work': [f"{self.fake.first_name()}@company.com", "hr@company.com", "manager@company.com"],
+            'finance': ["noreply@bank.com", "alerts@creditcard.com", "support@investment.com"],
+            'shopping': ["deals@store.com", "noreply@amazon.com", "sales@retailer.com"],
+            'personal': [self.fake.email(), f"{self.fake.first_name().lower()}@gmail.com"]
+        }
+        
+        sender = random.choice(senders[category])
+        
+        content = random.choice(self.content_previews[category])
         
         # Add some noise to template values
         stress_trigger = template['stress'] > 0.6
@@ -184,50 +247,54 @@ class FakeDataStreamGenerator:
         """Generate realistic biometric data with continuity"""
         time_period = self.get_time_period()
         pattern = self.biometric_patterns[time_period]
+        walk = self.walks.get(user_id)
+        if walk is None:
+            walk = self.walks[user_id] = BiometricWalk(rng=random.Random(f"{settings.SYNTHETIC_DATA_SEED}:{user_id}"))
+        rng = walk.rng
         
         # Generate heart rate with some continuity
-        hr_target = random.randint(*pattern['hr_range'])
-        self.current_hr += random.uniform(-3, 3)
-        self.current_hr = 0.7 * self.current_hr + 0.3 * hr_target
-        self.current_hr = max(50, min(120, self.current_hr))
+        hr_target = rng.randint(*pattern['hr_range'])
+        walk.hr += rng.uniform(-3, 3)
+        walk.hr = 0.7 * walk.hr + 0.3 * hr_target
+        walk.hr = max(50, min(120, walk.hr))
         
         # Generate HRV inversely correlated with stress
-        hrv_target = random.randint(*pattern['hrv_range'])
-        self.current_hrv += random.uniform(-2, 2)
-        self.current_hrv = 0.8 * self.current_hrv + 0.2 * hrv_target
-        self.current_hrv = max(10, min(60, self.current_hrv))
+        hrv_target = rng.randint(*pattern['hrv_range'])
+        walk.hrv += rng.uniform(-2, 2)
+        walk.hrv = 0.8 * walk.hrv + 0.2 * hrv_target
+        walk.hrv = max(10, min(60, walk.hrv))
         
         # Generate stress level
-        stress_target = pattern['stress_base'] + random.uniform(-0.2, 0.3)
-        self.current_stress += random.uniform(-0.1, 0.1)
-        self.current_stress = 0.6 * self.current_stress + 0.4 * stress_target
-        self.current_stress = max(0, min(1, self.current_stress))
+        stress_target = pattern['stress_base'] + rng.uniform(-0.2, 0.3)
+        walk.stress += rng.uniform(-0.1, 0.1)
+        walk.stress = 0.6 * walk.stress + 0.4 * stress_target
+        walk.stress = max(0, min(1, walk.stress))
         
         # Activity level based on heart rate
-        if self.current_hr > 90:
+        if walk.hr > 90:
             activity_level = "high"
-        elif self.current_hr > 75:
+        elif walk.hr > 75:
             activity_level = "moderate"
         else:
             activity_level = "low"
         
         # Recovery score (higher HRV = better recovery)
-        recovery_score = min(100, (self.current_hrv / 50) * 100)
+        recovery_score = min(100, (walk.hrv / 50) * 100)
         
         # Sleep quality (randomized but realistic)
-        sleep_quality = random.uniform(6, 9) if time_period == 'night' else random.uniform(4, 7)
+        sleep_quality = rng.uniform(6, 9) if time_period == 'night' else rng.uniform(4, 7)
         
         return {
             'user_id': str(user_id),
             'timestamp': datetime.now().isoformat(),
-            'heart_rate': round(self.current_hr, 1),
-            'hrv_ms': round(self.current_hrv, 1),
-            'stress_level': round(self.current_stress * 10, 1),  # Scale to 0-10
+            'heart_rate': round(walk.hr, 1),
+            'hrv_ms': round(walk.hrv, 1),
+            'stress_level': round(walk.stress * 10, 1),  # Scale to 0-10
             'activity_level': activity_level,
             'recovery_score': round(recovery_score, 1),
             'sleep_quality': round(sleep_quality, 1),
             'source': 'apple_watch',
-            'raw_stress_score': round(self.current_stress, 3)
+            'raw_stress_score': round(walk.stress, 3)
         }
     
     async def email_stream(self, user_id: int, interval_seconds: int = 30) -> AsyncGenerator[EmailData, None]:
@@ -246,43 +313,100 @@ class FakeDataStreamGenerator:
             yield self.generate_biometric(user_id)
             await asyncio.sleep(interval_seconds)
     
-    def generate_historical_emails(self, user_id: int, hours: int = 24, count: int = 20) -> List[EmailData]:
-        """Generate historical email data"""
-        emails = []
-        start_time = datetime.now() - timedelta(hours=hours)
+    def _history_window(self, user_id: int, kind: int, hours: int, count: int, end: Optional[datetime]):
+        """Seeded RNG, sorted timestamps and their hours of day for a historical window"""
+        if end is None:
+            now = datetime.now()
+            end = now - timedelta(seconds=now.timestamp() % HISTORY_WINDOW_ALIGN_SECONDS)
+        end = end.replace(microsecond=0)
+        rng = np.random.default_rng(
+            [settings.SYNTHETIC_DATA_SEED, user_id % 2**63, kind, int(end.timestamp()), hours, count]
+        )
+        seconds = int(hours * 3600)
+        timestamps = np.datetime64(end - timedelta(seconds=seconds), 's') + np.sort(rng.integers(0, seconds, count))
+        hour_of_day = timestamps.astype('datetime64[h]').astype(np.int64) % 24
+        return rng, np.datetime_as_string(timestamps, unit='s').tolist(), hour_of_day
+    
+    def generate_historical_emails(self, user_id: int, hours: int = 24, count: int = 20,
+                                   end: Optional[datetime] = None) -> List[EmailData]:
+        """Generate historical email data (same user, window and seed -> same emails)"""
+        rng, timestamps, _ = self._history_window(user_id, 1, hours, count, end)
         
-        for i in range(count):
-            # Generate timestamp in the past
-            timestamp = start_time + timedelta(
-                seconds=random.randint(0, int(hours * 3600))
-            )
-            
-            email = self.generate_email(user_id)
-            email.timestamp = timestamp.isoformat()
-            emails.append(email)
+        category = rng.integers(0, len(self._categories), count)
+        template = rng.integers(0, self._template_stress.shape[1], count)
+        stress = self._template_stress[category, template]
+        sentiment = np.clip(self._template_sentiment[category, template] + rng.uniform(-0.2, 0.2, count), -1, 1)
+        sentiment_label = np.where(sentiment > 0.3, "positive", np.where(sentiment < -0.3, "negative", "neutral"))
+        priority = np.where(stress > 0.7, "high", np.where(stress > 0.4, "medium", "low"))
+        content_pick, sender_pick = rng.random(count).tolist(), rng.random(count).tolist()
         
-        # Sort by timestamp
-        emails.sort(key=lambda x: x.timestamp)
+        emails = []
+        for c, t, ts, score, label, level, trigger, impact, cp, sp in zip(
+            category.tolist(), template.tolist(), timestamps, sentiment.round(3).tolist(), sentiment_label.tolist(),
+            priority.tolist(), (stress > 0.6).tolist(), (stress * 10).round(1).tolist(), content_pick, sender_pick
+        ):
+            name = self._categories[c]
+            previews, senders = self.content_previews[name], self._sender_pools[name]
+            emails.append(EmailData(
+                timestamp=ts,
+                sender=senders[int(sp * len(senders))],
+                subject=self.email_templates[name][t]['subject'],
+                content_preview=previews[int(cp * len(previews))],
+                sentiment_score=score,
+                sentiment_label=label,
+                stress_trigger=trigger,
+                priority=level,
+                category=name,
+                emotional_impact=impact
+            ))
         return emails
     
-    def generate_historical_biometrics(self, user_id: int, hours: int = 24, count: int = 100) -> List[Dict]:
-        """Generate historical biometric data"""
-        biometrics = []
-        start_time = datetime.now() - timedelta(hours=hours)
+    def generate_historical_biometrics(self, user_id: int, hours: int = 24, count: int = 100,
+                                       end: Optional[datetime] = None) -> List[Dict]:
+        """Generate historical biometric data (same user, window and seed -> same series)"""
+        rng, timestamps, hour_of_day = self._history_window(user_id, 0, hours, count, end)
+        period = self._hour_period[hour_of_day]
+        start = BiometricWalk()
         
-        for i in range(count):
-            # Generate timestamp in the past
-            timestamp = start_time + timedelta(
-                seconds=random.randint(0, int(hours * 3600))
-            )
-            
-            biometric = self.generate_biometric(user_id)
-            biometric['timestamp'] = timestamp.isoformat()
-            biometrics.append(biometric)
+        # Same dynamics as generate_biometric, as AR(1) series over the sorted timestamps
+        hr_target = rng.integers(self._hr_range[period, 0], self._hr_range[period, 1] + 1)
+        hr = _ar1(start.hr, HR_PHI, HR_PHI * rng.uniform(-3, 3, count) + (1 - HR_PHI) * hr_target)
+        hr = np.clip(hr, 50, 120)
         
-        # Sort by timestamp
-        biometrics.sort(key=lambda x: x['timestamp'])
-        return biometrics
+        hrv_target = rng.integers(self._hrv_range[period, 0], self._hrv_range[period, 1] + 1)
+        hrv = _ar1(start.hrv, HRV_PHI, HRV_PHI * rng.uniform(-2, 2, count) + (1 - HRV_PHI) * hrv_target)
+        hrv = np.clip(hrv, 10, 60)
+        
+        stress_target = self._stress_base[period] + rng.uniform(-0.2, 0.3, count)
+        stress = _ar1(start.stress, STRESS_PHI,
+                      STRESS_PHI * rng.uniform(-0.1, 0.1, count) + (1 - STRESS_PHI) * stress_target)
+        stress = np.clip(stress, 0, 1)
+        
+        activity_level = np.where(hr > 90, "high", np.where(hr > 75, "moderate", "low")).tolist()
+        recovery_score = np.minimum(100, hrv / 50 * 100)
+        night = period == self._periods.index('night')
+        sleep_quality = np.where(night, rng.uniform(6, 9, count), rng.uniform(4, 7, count))
+        
+        uid = str(user_id)
+        return [
+            {
+                'user_id': uid,
+                'timestamp': ts,
+                'heart_rate': h,
+                'hrv_ms': v,
+                'stress_level': sl,
+                'activity_level': a,
+                'recovery_score': r,
+                'sleep_quality': q,
+                'source': 'apple_watch',
+                'raw_stress_score': rs
+            }
+            for ts, h, v, sl, a, r, q, rs in zip(
+                timestamps, hr.round(1).tolist(), hrv.round(1).tolist(), (stress * 10).round(1).tolist(),
+                activity_level, recovery_score.round(1).tolist(), sleep_quality.round(1).tolist(),
+                stress.round(3).tolist()
+            )
+        ]
 
 # Global instance
 fake_data_generator = FakeDataStreamGenerator()
\ No newline at end of file
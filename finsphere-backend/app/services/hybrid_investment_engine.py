@@ -16,6 +16,7 @@ from enum import Enum
 # Import advanced components
 from .advanced_risk_override_engine import AdvancedRiskOverrideEngine, RiskMetrics
 from .llm_reasoning_layer import LLMReasoningLayer, ReasoningContext, LLMResponse
+from .market_data import MarketDataCache, market_data_cache
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,7 @@ class MarketData:
     bond_yield_10y: float
     market_condition: MarketCondition
     sector_performance: Dict[str, float]
+    snapshot_version: int = 0  # Market data cache snapshot the values came from (0 = defaults)
     
 @dataclass
 class UserProfile:
@@ -83,98 +85,67 @@ class InvestmentRecommendation:
     review_date: str
 
 class MarketDataFetcher:
-    """Fetches real-time market data from various sources"""
+    """Market data for recommendations, read through the shared market data cache"""
     
-    def __init__(self):
-        self.cache_duration = 300  # 5 minutes cache
-        self.last_fetch = {}
-        self.data_cache = {}
+    def __init__(self, cache: Optional[MarketDataCache] = None):
+        self.cache = cache or market_data_cache
+        self._market_data: Optional[MarketData] = None  # Built once per snapshot version
     
     async def get_nse_data(self) -> Dict:
         """Fetch NSE/BSE indices data"""
-        # Simulated market data - in production, use real APIs
-        return {
-            'nifty_50': {
-                'current': 19800,
-                'change_percent': np.random.uniform(-2.5, 2.5),
-                'volume': np.random.uniform(0.8, 1.2) * 1000000
-            },
-            'sensex': {
-                'current': 66500,
-                'change_percent': np.random.uniform(-2.5, 2.5),
-                'volume': np.random.uniform(0.8, 1.2) * 800000
-            },
-            'bank_nifty': {
-                'current': 44500,
-                'change_percent': np.random.uniform(-3.0, 3.0)
-            }
-        }
+        return await self.cache.get("indices")
     
     async def get_vix_data(self) -> float:
         """Fetch India VIX (volatility index)"""
-        # Simulate VIX values: 12-35 range
-        return np.random.uniform(12, 35)
+        return (await self.cache.get("vix"))["india_vix"]
     
     async def get_commodity_data(self) -> Dict:
         """Fetch gold, silver, crude prices"""
-        return {
-            'gold_per_10g': np.random.uniform(62000, 68000),
-            'silver_per_kg': np.random.uniform(74000, 82000),
-            'crude_oil': np.random.uniform(75, 95)
-        }
+        return await self.cache.get("commodities")
     
     async def get_forex_data(self) -> Dict:
         """Fetch currency rates"""
-        return {
-            'usd_inr': np.random.uniform(82.5, 84.5),
-            'eur_inr': np.random.uniform(88, 92),
-            'gbp_inr': np.random.uniform(102, 108)
-        }
+        return await self.cache.get("forex")
     
     async def get_bond_yields(self) -> Dict:
         """Fetch government bond yields"""
-        return {
-            '10y_yield': np.random.uniform(6.8, 7.5),
-            '5y_yield': np.random.uniform(6.5, 7.2),
-            '2y_yield': np.random.uniform(6.2, 6.8)
-        }
+        return await self.cache.get("bonds")
     
     async def get_sector_performance(self) -> Dict[str, float]:
         """Fetch sector-wise performance"""
-        sectors = ['IT', 'Banking', 'Pharma', 'Auto', 'FMCG', 'Metals', 'Energy', 'Realty']
-        return {
-            sector: np.random.uniform(-3.0, 3.0) 
-            for sector in sectors
-        }
+        return await self.cache.get("sectors")
     
     async def fetch_comprehensive_market_data(self) -> MarketData:
-        """Fetch all market data and create MarketData object"""
+        """
+        Current MarketData from the cached snapshot. Recommendations made
+        while the snapshot is unchanged share one MarketData object (treat it
+        as read-only).
+        """
         try:
-            # Fetch all data in parallel
-            nse_data, vix, commodities, forex, bonds, sectors = await asyncio.gather(
-                self.get_nse_data(),
-                self.get_vix_data(),
-                self.get_commodity_data(),
-                self.get_forex_data(),
-                self.get_bond_yields(),
-                self.get_sector_performance()
-            )
+            snapshot = await self.cache.snapshot()
+            if self._market_data is not None and self._market_data.snapshot_version == snapshot.version:
+                return self._market_data
+            
+            nse_data = snapshot.feeds['indices']
+            vix = snapshot.feeds['vix']['india_vix']
             
             # Determine market condition
             nifty_change = nse_data['nifty_50']['change_percent']
             market_condition = self._determine_market_condition(nifty_change, vix)
             
-            return MarketData(
-                timestamp=datetime.now().isoformat(),
+            self._market_data = MarketData(
+                timestamp=snapshot.as_of.isoformat(),
                 nifty_change=nifty_change,
                 sensex_change=nse_data['sensex']['change_percent'],
                 vix_level=vix,
-                gold_price=commodities['gold_per_10g'],
-                usd_inr=forex['usd_inr'],
-                bond_yield_10y=bonds['10y_yield'],
+                gold_price=snapshot.feeds['commodities']['gold_per_10g'],
+                usd_inr=snapshot.feeds['forex']['usd_inr'],
+                bond_yield_10y=snapshot.feeds['bonds']['10y_yield'],
                 market_condition=market_condition,
-                sector_performance=sectors
+                sector_performance=snapshot.feeds['sectors'],
+                snapshot_version=snapshot.version
             )
+            return self._market_data
             
         except Exception as e:
             logger.error(f"Error fetching market data: {e}")
@@ -0,0 +1,276 @@
+"""
+Durable Ingest Queue
+File-backed (SQLite WAL) job queue for work that used to run as FastAPI
+BackgroundTasks, such as vector upserts from the ingest endpoints.
+
+- Jobs survive crashes and restarts; jobs in flight when the process died
+  are picked up again on startup.
+- A configurable pool of async workers drains the queue, claiming up to
+  INGEST_QUEUE_BATCH_SIZE jobs of the same kind per handler call.
+- Failures are retried with exponential backoff and moved to a dead-letter
+  state after INGEST_QUEUE_MAX_ATTEMPTS.
+- A claim is a lease: jobs still locked INGEST_QUEUE_LEASE_SECONDS after
+  being claimed (their worker could not record the outcome) are claimed
+  again, so delivery is at-least-once.
+- Enqueue fails fast with QueueFullError once INGEST_QUEUE_MAX_DEPTH jobs are
+  pending, so endpoints can apply backpressure instead of piling up work.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    locked_at REAL,
+    dead INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs (dead, locked_at, available_at, id);
+"""
+
+
+class QueueFullError(Exception):
+    """Raised when the queue is at INGEST_QUEUE_MAX_DEPTH pending jobs."""
+
+
+class IngestQueue:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.INGEST_QUEUE_PATH
+        self.workers = settings.INGEST_QUEUE_WORKERS
+        self.batch_size = settings.INGEST_QUEUE_BATCH_SIZE
+        self.max_depth = settings.INGEST_QUEUE_MAX_DEPTH
+        self.max_attempts = settings.INGEST_QUEUE_MAX_ATTEMPTS
+        self.backoff_base = settings.INGEST_QUEUE_BACKOFF_SECONDS
+        self.poll_interval = settings.INGEST_QUEUE_POLL_SECONDS
+        self.lease_seconds = settings.INGEST_QUEUE_LEASE_SECONDS
+
+        self._handlers: Dict[str, Handler] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self._depth = 0
+        self._in_flight = 0
+        self.counters = {"enqueued": 0, "processed": 0, "failed": 0, "retried": 0, "dead_lettered": 0, "rejected": 0}
+
+    def register_handler(self, kind: str, handler: Handler):
+        """Register the coroutine that processes a batch of payloads of this kind."""
+        self._handlers[kind] = handler
+
+    # --- SQLite access (called via asyncio.to_thread) ---
+
+    def _connect(self):
+        if self._conn is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        # Jobs claimed by a previous process never finished: make them available again
+        conn.execute("UPDATE jobs SET locked_at = NULL WHERE locked_at IS NOT NULL")
+        self._depth = conn.execute("SELECT COUNT(*) FROM jobs WHERE dead = 0").fetchone()[0]
+        self._conn = conn
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _insert(self, kind: str, payloads: List[Dict[str, Any]]):
+        now = time.time()
+        rows = [(kind, json.dumps(payload), now, now) for payload in payloads]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (kind, payload, available_at, created_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def _claim(self) -> Tuple[Optional[str], List[Tuple[int, int, Dict[str, Any]]]]:
+        """Lock up to batch_size ready jobs (unlocked, or with an expired lease) of the oldest ready kind."""
+        now = time.time()
+        expired = now - self.lease_seconds
+        kind, rows = None, []
+        with self._transaction() as conn:
+            first = conn.execute(
+                "SELECT kind FROM jobs WHERE dead = 0 AND (locked_at IS NULL OR locked_at < ?) AND available_at <= ? "
+                "ORDER BY id LIMIT 1",
+                (expired, now),
+            ).fetchone()
+            if first is not None:
+                kind = first[0]
+                rows = conn.execute(
+                    "SELECT id, attempts, payload FROM jobs "
+                    "WHERE dead = 0 AND (locked_at IS NULL OR locked_at < ?) AND available_at <= ? AND kind = ? "
+                    "ORDER BY id LIMIT ?",
+                    (expired, now, kind, self.batch_size),
+                ).fetchall()
+                conn.executemany("UPDATE jobs SET locked_at = ? WHERE id = ?", [(now, row[0]) for row in rows])
+        return kind, [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def _complete(self, job_ids: List[int]):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+    def _fail(self, jobs: List[Tuple[int, int, Dict[str, Any]]], error: str) -> Tuple[int, int]:
+        """Schedule a retry with exponential backoff, or dead-letter. Returns (retried, dead)."""
+        now = time.time()
+        retry_rows, dead_rows = [], []
+        for job_id, attempts, _ in jobs:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                dead_rows.append((attempts, error, job_id))
+            else:
+                delay = self.backoff_base * (2 ** (attempts - 1)) * (1 + random.random() * 0.1)
+                retry_rows.append((attempts, now + delay, error, job_id))
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET attempts = ?, available_at = ?, last_error = ?, locked_at = NULL WHERE id = ?",
+                retry_rows,
+            )
+            conn.executemany(
+                "UPDATE jobs SET attempts = ?, last_error = ?, dead = 1, locked_at = NULL WHERE id = ?",
+                dead_rows,
+            )
+        return len(retry_rows), len(dead_rows)
+
+    def _counts(self) -> Dict[str, Any]:
+        with self._lock:
+            dead = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE dead = 1").fetchone()[0]
+            oldest = self._conn.execute("SELECT MIN(created_at) FROM jobs WHERE dead = 0").fetchone()[0]
+        return {"dead_letter": dead, "oldest_job_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0}
+
+    # --- Public API ---
+
+    def check_capacity(self, count: int = 1):
+        """Raise QueueFullError if `count` more jobs would exceed the depth limit."""
+        if self._depth + count > self.max_depth:
+            self.counters["rejected"] += count
+            raise QueueFullError(f"Ingest queue full ({self._depth} pending jobs)")
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any]):
+        await self.enqueue_many(kind, [payload])
+
+    async def enqueue_many(self, kind: str, payloads: List[Dict[str, Any]]):
+        """Durably enqueue payloads; returns once they are written to disk."""
+        if not payloads:
+            return
+        self.check_capacity(len(payloads))
+        if self._conn is None:
+            await asyncio.to_thread(self._connect)
+        await asyncio.to_thread(self._insert, kind, payloads)
+        self._depth += len(payloads)
+        self.counters["enqueued"] += len(payloads)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self, worker_id: int):
+        while True:
+            try:
+                kind, jobs = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"Ingest queue claim error: {e}")
+                kind, jobs = None, []
+
+            if not jobs:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._in_flight += len(jobs)
+            try:
+                error: Optional[Exception] = None
+                try:
+                    handler = self._handlers.get(kind)
+                    if handler is None:
+                        raise RuntimeError(f"No handler registered for job kind '{kind}'")
+                    await handler([payload for _, _, payload in jobs])
+                except Exception as e:
+                    error = e
+
+                # Recording the outcome can fail too (database locked, disk error): keep the
+                # worker alive; the jobs are claimed again once their lease expires
+                try:
+                    if error is not None:
+                        retried, dead = await asyncio.to_thread(self._fail, jobs, str(error))
+                        self.counters["failed"] += len(jobs)
+                        self.counters["retried"] += retried
+                        self.counters["dead_lettered"] += dead
+                        self._depth -= dead
+                        logger.warning(f"Ingest worker {worker_id}: {len(jobs)} '{kind}' jobs failed ({error})")
+                    else:
+                        await asyncio.to_thread(self._complete, [job_id for job_id, _, _ in jobs])
+                        self.counters["processed"] += len(jobs)
+                        self._depth -= len(jobs)
+                except Exception as e:
+                    logger.error(f"Ingest worker {worker_id}: could not record {len(jobs)} '{kind}' jobs ({e}), "
+                                 f"retrying after the {self.lease_seconds:g}s lease")
+            finally:
+                self._in_flight -= len(jobs)
+
+    async def start(self):
+        """Open the queue file and start the worker pool."""
+        if self._tasks:
+            return
+        await asyncio.to_thread(self._connect)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Ingest queue started at {self.path} with {self.workers} workers ({self._depth} pending)")
+
+    async def stop(self):
+        """Stop workers; unfinished jobs stay on disk for the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        metrics = {
+            "depth": self._depth,
+            "in_flight": self._in_flight,
+            "max_depth": self.max_depth,
+            "workers": len(self._tasks),
+            **self.counters,
+        }
+        if self._conn is not None:
+            metrics.update(await asyncio.to_thread(self._counts))
+        return metrics
+
+
+# Global instance
+ingest_queue = IngestQueue()
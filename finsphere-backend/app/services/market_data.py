@@ -0,0 +1,262 @@
+"""
+Market Data Cache
+Shared, stale-while-revalidate cache of the market feeds behind investment
+recommendations (indices, VIX, commodities, forex, bond yields, sectors),
+so concurrent recommendations share one fetch per feed instead of each
+regenerating every feed.
+
+- Each feed has its own TTL (MARKET_DATA_TTLS). A fresh entry is served
+  as-is; an entry past its TTL is still served for up to
+  MARKET_DATA_MAX_STALE_SECONDS while one background refresh runs. Only a
+  missing (or too stale) feed makes the caller wait, and concurrent callers
+  wait on the same fetch.
+- A failed refresh keeps the last value and is retried after
+  MARKET_DATA_RETRY_SECONDS rather than on every read.
+- snapshot() returns all feeds with a version number that changes whenever
+  any feed is refreshed, so derived objects (MarketData) can be built once
+  per version.
+
+Providers: "simulated" (random values in realistic ranges, the default) or
+"replay" (MARKET_DATA_REPLAY_PATH, a CSV of recorded ticks, for offline and
+reproducible runs; format in ReplayMarketProvider). Any object with
+`async fetch(feed) -> Dict` can be passed to MarketDataCache.
+"""
+
+import asyncio
+import csv
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FEEDS = ("indices", "vix", "commodities", "forex", "bonds", "sectors")
+SECTORS = ("IT", "Banking", "Pharma", "Auto", "FMCG", "Metals", "Energy", "Realty")
+SAMPLE_REPLAY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "market_replay_sample.csv")
+
+
+class SimulatedMarketProvider:
+    """Random values in realistic ranges (no market API is configured)."""
+
+    async def fetch(self, feed: str) -> Dict:
+        rng = np.random
+        if feed == "indices":
+            return {
+                "nifty_50": {
+                    "current": 19800,
+                    "change_percent": rng.uniform(-2.5, 2.5),
+                    "volume": rng.uniform(0.8, 1.2) * 1000000,
+                },
+                "sensex": {
+                    "current": 66500,
+                    "change_percent": rng.uniform(-2.5, 2.5),
+                    "volume": rng.uniform(0.8, 1.2) * 800000,
+                },
+                "bank_nifty": {"current": 44500, "change_percent": rng.uniform(-3.0, 3.0)},
+            }
+        elif feed == "vix":
+            return {"india_vix": rng.uniform(12, 35)}
+        elif feed == "commodities":
+            return {
+                "gold_per_10g": rng.uniform(62000, 68000),
+                "silver_per_kg": rng.uniform(74000, 82000),
+                "crude_oil": rng.uniform(75, 95),
+            }
+        elif feed == "forex":
+            return {
+                "usd_inr": rng.uniform(82.5, 84.5),
+                "eur_inr": rng.uniform(88, 92),
+                "gbp_inr": rng.uniform(102, 108),
+            }
+        elif feed == "bonds":
+            return {
+                "10y_yield": rng.uniform(6.8, 7.5),
+                "5y_yield": rng.uniform(6.5, 7.2),
+                "2y_yield": rng.uniform(6.2, 6.8),
+            }
+        elif feed == "sectors":
+            return {sector: rng.uniform(-3.0, 3.0) for sector in SECTORS}
+        raise KeyError(f"Unknown market feed: {feed}")
+
+
+class ReplayMarketProvider:
+    """
+    Recorded ticks from a CSV with columns timestamp,feed,field,value, e.g.
+
+        2024-05-02T09:15:00,indices,nifty_50.change_percent,0.42
+        2024-05-02T09:15:00,vix,india_vix,14.8
+
+    Dotted fields nest ("nifty_50.change_percent" -> {"nifty_50": {...}}) and
+    lines starting with # are comments. app/data/market_replay_sample.csv is
+    a small example covering every feed.
+
+    Each fetch of a feed returns its next tick, wrapping around at the end,
+    so a run replays the same market sequence every time.
+    """
+
+    def __init__(self, path: str):
+        ticks: Dict[str, Dict[str, Dict]] = defaultdict(dict)  # feed -> timestamp -> values
+        with open(path, newline="") as f:
+            for row in csv.DictReader(line for line in f if not line.startswith("#")):
+                values = ticks[row["feed"]].setdefault(row["timestamp"], {})
+                *parents, field = row["field"].split(".")
+                for parent in parents:
+                    values = values.setdefault(parent, {})
+                values[field] = float(row["value"])
+        self.path = path
+        self.ticks: Dict[str, List[Dict]] = {feed: [by_time[ts] for ts in sorted(by_time)]
+                                             for feed, by_time in ticks.items()}
+        self.position: Dict[str, int] = defaultdict(int)
+
+    async def fetch(self, feed: str) -> Dict:
+        ticks = self.ticks.get(feed)
+        if not ticks:
+            raise KeyError(f"No {feed} ticks in {self.path}")
+        tick = ticks[self.position[feed] % len(ticks)]
+        self.position[feed] += 1
+        return tick
+
+
+def _make_provider():
+    if settings.MARKET_DATA_PROVIDER == "replay":
+        try:
+            return ReplayMarketProvider(settings.MARKET_DATA_REPLAY_PATH or SAMPLE_REPLAY)
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Market replay file unusable ({e}), falling back to simulated market data")
+    return SimulatedMarketProvider()
+
+
+def _ttls(value: str) -> Dict[str, float]:
+    ttls = {}
+    for item in value.split(","):
+        if "=" in item:
+            feed, seconds = item.split("=", 1)
+            ttls[feed.strip()] = float(seconds)
+    return ttls
+
+
+@dataclass
+class FeedEntry:
+    value: Dict
+    fetched_at: float   # time.monotonic()
+    as_of: datetime
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    version: int                # Changes whenever any feed is refreshed
+    feeds: Dict[str, Dict]
+    as_of: datetime             # Fetch time of the oldest feed in the snapshot
+
+
+class MarketDataCache:
+    def __init__(self, provider=None):
+        self.provider = provider or _make_provider()
+        self.ttls = _ttls(settings.MARKET_DATA_TTLS)
+        self._entries: Dict[str, FeedEntry] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._version = 0
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._snapshot_fresh_until = 0.0  # Monotonic time the first feed of the snapshot expires
+        self.snapshot_hits = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def ttl(self, feed: str) -> float:
+        return self.ttls.get(feed, settings.MARKET_DATA_DEFAULT_TTL_SECONDS)
+
+    async def get(self, feed: str) -> Dict:
+        """The feed's latest value; refreshes in the background once past its TTL."""
+        entry = self._entries.get(feed)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl(feed):
+                self.hits += 1
+                return entry.value
+            if age < self.ttl(feed) + settings.MARKET_DATA_MAX_STALE_SECONDS:
+                self.stale_hits += 1
+                self._refresh(feed)
+                return entry.value
+        self.misses += 1
+        return await asyncio.shield(self._refresh(feed))
+
+    def _refresh(self, feed: str) -> asyncio.Task:
+        """Start a refresh of the feed unless one is running; returns the running one."""
+        task = self._refreshing.get(feed)
+        if task is None:
+            task = self._refreshing[feed] = asyncio.create_task(self._fetch(feed))
+            task.add_done_callback(lambda done: self._refresh_done(feed, done))
+        return task
+
+    def _refresh_done(self, feed: str, task: asyncio.Task):
+        self._refreshing.pop(feed, None)
+        if not task.cancelled():
+            task.exception()  # Retrieved here so background failures aren't reported as unhandled
+
+    async def _fetch(self, feed: str) -> Dict:
+        entry = self._entries.get(feed)
+        failed_at = self._failed_at.get(feed)
+        if entry is not None and failed_at is not None and \
+                time.monotonic() - failed_at < settings.MARKET_DATA_RETRY_SECONDS:
+            return entry.value  # Provider failed recently; keep serving the last value
+        try:
+            value = await self.provider.fetch(feed)
+        except Exception as e:
+            self.errors += 1
+            self._failed_at[feed] = time.monotonic()
+            if entry is None:
+                raise
+            logger.warning(f"Market feed {feed} refresh failed, serving stale data: {e}")
+            return entry.value
+        self._entries[feed] = FeedEntry(value, time.monotonic(), datetime.now())
+        self._failed_at.pop(feed, None)
+        self._version += 1
+        self.refreshes += 1
+        return value
+
+    async def snapshot(self) -> MarketSnapshot:
+        """All feeds; the same object is returned until a feed changes."""
+        if self._snapshot is not None and self._snapshot.version == self._version \
+                and time.monotonic() < self._snapshot_fresh_until:
+            self.snapshot_hits += 1  # Every feed fresh: no per-feed lookups
+            return self._snapshot
+        await asyncio.gather(*(self.get(feed) for feed in FEEDS))
+        if self._snapshot is None or self._snapshot.version != self._version:
+            entries = {feed: self._entries[feed] for feed in FEEDS}
+            self._snapshot = MarketSnapshot(
+                version=self._version,
+                feeds={feed: entry.value for feed, entry in entries.items()},
+                as_of=min(entry.as_of for entry in entries.values()),
+            )
+            self._snapshot_fresh_until = min(entry.fetched_at + self.ttl(feed) for feed, entry in entries.items())
+        return self._snapshot
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "provider": type(self.provider).__name__,
+            "version": self._version,
+            "snapshot_hits": self.snapshot_hits,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "feed_age_seconds": {feed: round(now - entry.fetched_at, 1) for feed, entry in self._entries.items()},
+        }
+
+
+# Global instance
+market_data_cache = MarketDataCache()
@@ -1,163 +1,109 @@
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, and_, insert, select, func
 from app.models.database import User, BiometricReading, Transaction, Intervention, GigWork
 from app.models.schemas import DashboardStats
-from app.core.database import get_db
+from app.services import stress_scoring
+from app.services.budget_service import budget_service
+from app.services.site_classifier import site_classifier
+from app.services.change_feed import (
+    change_feed, biometric_event, biometric_batch_event, transaction_event, transaction_batch_event,
+    intervention_event
+)
+from app.services.decision_state import (
+    decision_state, decide_intervention, effectiveness_for, spending_risk_for, stress_level_for
+)
+from app.services.realtime_state import realtime_state
+from app.core.database import get_async_db
 
 class PostgreSQLUserDataService:
-    """User data service using PostgreSQL instead of JSON files"""
+    """User data service using PostgreSQL instead of JSON files (async, asyncpg)"""
     
     def __init__(self):
-        self.db_dependency = get_db
+        self.db_dependency = get_async_db
     
-    def get_user_by_email(self, db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        return await db.scalar(select(User).where(User.email == email).limit(1))
     
-    def get_user_by_id(self, db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(self, db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
     
-    def get_current_stress_level(self, db: Session, user_id: int) -> Tuple[str, float]:
+    async def get_first_user(self, db: AsyncSession) -> Optional[User]:
+        """Lowest-id user in the database (dev default user; decision_state picks the same one)"""
+        return await db.scalar(select(User).order_by(User.id).limit(1))
+    
+    async def get_current_stress_level(self, db: AsyncSession, user_id: int) -> Tuple[str, float]:
         """Get current stress level based on recent biometric data"""
         # Get most recent biometric reading from last 24 hours
-        recent_reading = db.query(BiometricReading).filter(
-            and_(
-                BiometricReading.user_id == user_id,
-                BiometricReading.timestamp >= datetime.utcnow() - timedelta(hours=24)
-            )
-        ).order_by(desc(BiometricReading.timestamp)).first()
+        stress_score = await db.scalar(
+            select(BiometricReading.stress_score).where(
+                and_(
+                    BiometricReading.user_id == user_id,
+                    BiometricReading.timestamp >= datetime.utcnow() - timedelta(hours=24)
+                )
+            ).order_by(desc(BiometricReading.timestamp)).limit(1)
+        )
         
-        if not recent_reading:
+        if stress_score is None:
             # Fallback to user's baseline
-            user = self.get_user_by_id(db, user_id)
+            user = await self.get_user_by_id(db, user_id)
             baseline = user.stress_baseline if user else 0.3
             return "Low", baseline
         
-        stress_score = recent_reading.stress_score
-        
-        if stress_score > 0.7:
-            return "High", stress_score
-        elif stress_score > 0.4:
-            return "Medium", stress_score
-        else:
-            return "Low", stress_score
+        return stress_level_for(stress_score), stress_score
     
-    def get_spending_risk(self, db: Session, user_id: int) -> str:
+    async def get_spending_risk(self, db: AsyncSession, user_id: int,
+                                stress_score: Optional[float] = None) -> str:
         """Calculate spending risk based on user history"""
-        stress_level, stress_score = self.get_current_stress_level(db, user_id)
+        if stress_score is None:
+            stress_level, stress_score = await self.get_current_stress_level(db, user_id)
         
         # Check recent high-stress purchases (last 7 days)
-        recent_stress_purchases = db.query(Transaction).filter(
-            and_(
-                Transaction.user_id == user_id,
-                Transaction.timestamp >= datetime.utcnow() - timedelta(days=7),
-                Transaction.stress_at_time > 0.6
+        recent_stress_purchases = await db.scalar(
+            select(func.count()).select_from(Transaction).where(
+                and_(
+                    Transaction.user_id == user_id,
+                    Transaction.timestamp >= datetime.utcnow() - timedelta(days=7),
+                    Transaction.stress_at_time > 0.6
+                )
             )
-        ).count()
+        )
         
-        if recent_stress_purchases > 2 or stress_score > 0.7:
-            return "Critical"
-        elif recent_stress_purchases > 0 or stress_score > 0.4:
-            return "Moderate"
-        else:
-            return "Safe"
+        return spending_risk_for(recent_stress_purchases, stress_score)
     
-    def get_intervention_effectiveness(self, db: Session, user_id: int) -> Dict:
+    async def get_intervention_effectiveness(self, db: AsyncSession, user_id: int) -> Dict:
         """Analyze intervention effectiveness for this user"""
-        interventions = db.query(Intervention).filter(
-            Intervention.user_id == user_id
-        ).all()
-        
-        if not interventions:
-            return {"success_rate": 0.5, "preferred_severity": "medium", "total_interventions": 0}
+        # Aggregate in the database instead of loading every intervention row
+        total, successful, snooze_actions, proceed_actions = (await db.execute(
+            select(
+                func.count(),
+                func.count().filter(Intervention.effectiveness == 'prevented_purchase'),
+                func.count().filter(Intervention.user_action == 'snooze'),
+                func.count().filter(Intervention.user_action == 'proceed')
+            ).where(Intervention.user_id == user_id)
+        )).one()
         
-        successful = len([i for i in interventions if i.effectiveness == 'prevented_purchase'])
-        total = len(interventions)
-        success_rate = successful / total if total > 0 else 0.5
-        
-        # Determine preferred intervention severity
-        snooze_actions = len([i for i in interventions if i.user_action == 'snooze'])
-        proceed_actions = len([i for i in interventions if i.user_action == 'proceed'])
-        
-        if snooze_actions > proceed_actions:
-            preferred_severity = "low"  # User responds well to gentle nudges
-        else:
-            preferred_severity = "high"  # User needs stronger interventions
-        
-        return {
-            "success_rate": success_rate,
-            "preferred_severity": preferred_severity,
-            "total_interventions": total,
-            "successful_interventions": successful
-        }
+        return effectiveness_for(total, successful, snooze_actions, proceed_actions)
     
-    def should_intervene(self, db: Session, user_id: int, context_url: str) -> Dict:
+    async def should_intervene(self, db: AsyncSession, user_id: int, context_url: str) -> Dict:
         """Enhanced intervention decision logic using real user data"""
-        stress_level, stress_score = self.get_current_stress_level(db, user_id)
-        spending_risk = self.get_spending_risk(db, user_id)
-        effectiveness = self.get_intervention_effectiveness(db, user_id)
-        
-        # Base intervention logic
-        should_intervene = False
-        intervention_severity = "low"
-        delay_minutes = 3
-        message = "Consider waiting before making this purchase."
-        
-        # Site-specific logic
-        shopping_sites = ["amazon", "myntra", "flipkart", "swiggy", "zomato"]
-        is_shopping = any(site in context_url.lower() for site in shopping_sites)
-        
-        gig_sites = ["upwork", "fiverr", "freelancer"]
-        is_gig_work = any(site in context_url.lower() for site in gig_sites)
-        
-        if is_shopping and stress_score > 0.5:
-            should_intervene = True
-            if stress_score > 0.7:
-                intervention_severity = "high"
-                delay_minutes = 10
-                message = f"🔴 HIGH STRESS ALERT: Your stress level is {stress_level}. Take a break before purchasing."
-            elif stress_score > 0.4:
-                intervention_severity = "medium" 
-                delay_minutes = 5
-                message = f"🟡 CAUTION: Elevated stress detected. Consider if this purchase aligns with your goals."
+        stress_level, stress_score = await self.get_current_stress_level(db, user_id)
+        spending_risk = await self.get_spending_risk(db, user_id, stress_score)
+        effectiveness = await self.get_intervention_effectiveness(db, user_id)
         
-        elif is_gig_work and stress_score > 0.6:
-            should_intervene = True
-            intervention_severity = "medium"
-            delay_minutes = 7
-            message = "High stress detected. Review your pricing carefully to avoid undervaluing your work."
-        
-        # Adjust based on user's intervention history
-        if effectiveness['success_rate'] < 0.3:
-            # User often ignores interventions, try stronger approach
-            if intervention_severity == "low":
-                intervention_severity = "medium"
-            delay_minutes += 2
-        
-        return {
-            "should_intervene": should_intervene,
-            "severity": intervention_severity,
-            "delay_minutes": delay_minutes,
-            "message": message,
-            "user_context": {
-                "stress_level": stress_level,
-                "stress_score": stress_score,
-                "spending_risk": spending_risk,
-                "intervention_success_rate": effectiveness['success_rate']
-            }
-        }
+        return decide_intervention(stress_level, stress_score, spending_risk, effectiveness, context_url)
     
-    def get_dashboard_stats(self, db: Session, user_id: int) -> DashboardStats:
+    async def get_dashboard_stats(self, db: AsyncSession, user_id: int) -> DashboardStats:
         """Get dashboard statistics for a user"""
-        user = self.get_user_by_id(db, user_id)
+        user = await self.get_user_by_id(db, user_id)
         if not user:
             raise ValueError(f"User {user_id} not found")
         
-        stress_level, stress_score = self.get_current_stress_level(db, user_id)
-        spending_risk = self.get_spending_risk(db, user_id)
+        stress_level, stress_score = await self.get_current_stress_level(db, user_id)
+        spending_risk = await self.get_spending_risk(db, user_id, stress_score)
         
         # Calculate savings runway
         savings_runway = "Unknown"
@@ -168,9 +114,11 @@ class PostgreSQLUserDataService:
         
         # Get recent interventions
         recent_interventions = []
-        interventions = db.query(Intervention).filter(
-            Intervention.user_id == user_id
-        ).order_by(desc(Intervention.timestamp)).limit(3).all()
+        interventions = (await db.scalars(
+            select(Intervention).where(
+                Intervention.user_id == user_id
+            ).order_by(desc(Intervention.timestamp)).limit(3)
+        )).all()
         
         for intervention in interventions:
             time_ago = self._format_time_ago(intervention.timestamp)
@@ -190,12 +138,13 @@ class PostgreSQLUserDataService:
             recent_interventions=recent_interventions
         )
     
-    def log_intervention_result(self, db: Session, user_id: int, intervention_data: Dict):
+    async def log_intervention_result(self, db: AsyncSession, user_id: int, intervention_data: Dict):
         """Log intervention result to database"""
         intervention = Intervention(
             user_id=user_id,
             timestamp=datetime.utcnow(),
             url=intervention_data.get('url', ''),
+            website_category=intervention_data.get('website_category') or site_classifier.classify(intervention_data.get('url', '')).category,
             reason=intervention_data.get('reason', ''),
             severity=intervention_data.get('severity', 'medium'),
             user_action=intervention_data.get('user_action', 'unknown'),
@@ -204,17 +153,16 @@ class PostgreSQLUserDataService:
         )
         
         db.add(intervention)
-        db.commit()
+        await db.flush()
+        await change_feed.notify(db, intervention_event(user_id, intervention))
+        await db.commit()
+        decision_state.record_intervention(user_id, intervention.id, intervention.effectiveness, intervention.user_action)
     
-    def add_biometric_reading(self, db: Session, user_id: int, heart_rate: int, hrv_ms: float, context: str = ""):
-        """Add a new biometric reading"""
-        # Calculate stress score (using the same logic as analyzer)
-        hr_score = max(0, min(1, (heart_rate - 60) / 40))
-        hrv_score = max(0, min(1, (100 - hrv_ms) / 80))
-        stress_score = (hr_score * 0.4) + (hrv_score * 0.6)
-        
-        if heart_rate > 90 and hrv_ms < 35:
-            stress_score = max(stress_score, 0.8)
+    async def add_biometric_reading(self, db: AsyncSession, user_id: int, heart_rate: int, hrv_ms: float,
+                              context: str = "", stress_score: Optional[float] = None):
+        """Add a new biometric reading (scored with the population heuristic unless a score is given)"""
+        if stress_score is None:
+            _, stress_score = stress_scoring.stress_score(heart_rate, hrv_ms)
         
         reading = BiometricReading(
             user_id=user_id,
@@ -226,13 +174,52 @@ class PostgreSQLUserDataService:
         )
         
         db.add(reading)
-        db.commit()
+        await change_feed.notify(db, biometric_event(user_id, {
+            "timestamp": reading.timestamp, "heart_rate": heart_rate, "hrv_ms": hrv_ms, "stress_score": stress_score
+        }))
+        await db.commit()
+        decision_state.record_biometric(user_id, stress_score, reading.timestamp)
+        realtime_state.record_readings(user_id, [{
+            "timestamp": reading.timestamp, "heart_rate": heart_rate, "hrv_ms": hrv_ms, "stress_score": stress_score
+        }])
         return reading
     
-    def add_transaction(self, db: Session, user_id: int, amount: float, merchant: str, category: str):
-        """Add a new transaction"""
+    async def add_biometric_readings(self, db: AsyncSession, user_id: int, readings: List[Dict], context: str = "") -> int:
+        """
+        Bulk-insert pre-scored biometric readings in one transaction.
+        Each reading is a dict with timestamp, heart_rate, hrv_ms and stress_score.
+        """
+        if not readings:
+            return 0
+        
+        rows = [
+            {
+                "user_id": user_id,
+                "timestamp": reading["timestamp"],
+                "heart_rate": reading["heart_rate"],
+                "hrv_ms": reading["hrv_ms"],
+                "stress_score": reading["stress_score"],
+                "context": context
+            }
+            for reading in readings
+        ]
+        
+        # executemany on a Core insert is sent as multi-row INSERT ... VALUES pages
+        await db.execute(insert(BiometricReading), rows)
+        await change_feed.notify(db, biometric_batch_event(user_id, rows))
+        await db.commit()
+        decision_state.record_biometrics(user_id, ((row["timestamp"], row["stress_score"]) for row in rows))
+        realtime_state.record_readings(user_id, rows)
+        return len(rows)
+    
+    async def add_transaction(self, db: AsyncSession, user_id: int, amount: float, merchant: str, category: str,
+                              budget_category: Optional[str] = None) -> Tuple[Transaction, List[Dict]]:
+        """Add a new transaction and update its monthly budget total. Returns (transaction, budget_alerts)."""
         # Get current stress level
-        stress_level, stress_score = self.get_current_stress_level(db, user_id)
+        stress_level, stress_score = await self.get_current_stress_level(db, user_id)
+        
+        budgets = await budget_service.match_budgets(db, user_id, [budget_category or category])
+        budget = budgets.get((budget_category or category or "").lower())
         
         transaction = Transaction(
             user_id=user_id,
@@ -241,14 +228,72 @@ class PostgreSQLUserDataService:
             currency="INR",
             merchant=merchant,
             category=category,
+            budget_category=budget.category_name if budget else None,
             stress_at_time=stress_score,
             intervention_shown=False,  # Will be updated by intervention system
             user_proceeded=True
         )
         
         db.add(transaction)
-        db.commit()
-        return transaction
+        alerts = []
+        if budget:
+            alerts = await budget_service.record_spend(db, user_id, [(budget, transaction.timestamp, amount)])
+        await db.flush()
+        await change_feed.notify(db, transaction_event(user_id, transaction.id, {
+            "timestamp": transaction.timestamp, "amount": amount, "merchant": merchant, "category": category,
+            "budget_category": transaction.budget_category, "stress_at_time": stress_score
+        }))
+        await db.commit()
+        decision_state.record_transactions(user_id, [(transaction.id, transaction.timestamp, stress_score)])
+        return transaction, alerts
+    
+    async def add_transactions(self, db: AsyncSession, user_id: int,
+                               transactions: List[Dict]) -> Tuple[List[int], float, List[Dict]]:
+        """
+        Bulk-insert transactions in one transaction and update monthly budget totals.
+        Each transaction is a dict with timestamp, amount, currency, merchant, category
+        and optional budget_category. Returns (transaction_ids, stress_at_time, budget_alerts).
+        """
+        if not transactions:
+            return [], 0.0, []
+        
+        # One stress lookup and one budget lookup for the whole batch
+        stress_level, stress_score = await self.get_current_stress_level(db, user_id)
+        budget_names = [txn.get("budget_category") or txn.get("category") for txn in transactions]
+        budgets = await budget_service.match_budgets(db, user_id, budget_names)
+        matched = [budgets.get((name or "").lower()) for name in budget_names]
+        
+        rows = [
+            {
+                "user_id": user_id,
+                "timestamp": txn["timestamp"],
+                "amount": txn["amount"],
+                "currency": txn.get("currency", "INR"),
+                "merchant": txn["merchant"],
+                "category": txn.get("category") or "uncategorized",
+                "budget_category": budget.category_name if budget else None,
+                "stress_at_time": stress_score,
+                "intervention_shown": False,
+                "user_proceeded": True
+            }
+            for txn, budget in zip(transactions, matched)
+        ]
+        
+        # Ids are zipped with rows below, so RETURNING must follow parameter order
+        transaction_ids = (await db.scalars(
+            insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), rows
+        )).all()
+        alerts = await budget_service.record_spend(db, user_id, [
+            (budget, txn["timestamp"], txn["amount"])
+            for txn, budget in zip(transactions, matched)
+            if budget is not None
+        ])
+        await change_feed.notify(db, transaction_batch_event(user_id, transaction_ids, rows))
+        await db.commit()
+        decision_state.record_transactions(user_id, (
+            (txn_id, row["timestamp"], stress_score) for txn_id, row in zip(transaction_ids, rows)
+        ))
+        return list(transaction_ids), stress_score, alerts
     
     def _format_time_ago(self, timestamp: datetime) -> str:
         """Format timestamp as 'X hours ago' etc."""
@@ -266,16 +311,7 @@ class PostgreSQLUserDataService:
     
     def _extract_site_name(self, url: str) -> str:
         """Extract readable site name from URL"""
-        if 'amazon' in url:
-            return 'Amazon'
-        elif 'myntra' in url:
-            return 'Myntra'
-        elif 'flipkart' in url:
-            return 'Flipkart'
-        elif 'upwork' in url:
-            return 'Upwork'
-        else:
-            return 'Shopping Site'
+        return site_classifier.site_name(url)
 
 # Global instance
 postgresql_user_service = PostgreSQLUserDataService()
\ No newline at end of file
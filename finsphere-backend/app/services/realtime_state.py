@@ -0,0 +1,231 @@
+"""
+Realtime Dashboard State
+Per-user rolling windows behind /realtime/dashboard, so a poll is a
+snapshot read instead of generating fresh samples and recounting emails.
+
+Per user:
+- ring buffer of the last REALTIME_BIOMETRIC_WINDOW biometric samples
+- ring buffer of the last REALTIME_EMAIL_WINDOW emails/messages, with
+  running counts of negative (sentiment < -0.3) and stress-trigger emails,
+  adjusted as entries enter and leave the window
+
+Fed by the live stream producers (tap_biometrics / tap_emails wrap the
+generators registered with the stream hub), by committed biometric writes
+and by message ingest. Committed readings are merged into the biometric
+window by timestamp, so a backdated batch (a watch syncing old samples)
+never becomes the current sample. A user seen for the first time is seeded from the
+reproducible synthetic history, so the dashboard is populated and stable
+between polls even when nothing is streaming.
+"""
+
+from collections import OrderedDict, deque
+from datetime import datetime
+from heapq import merge
+from itertools import islice
+from typing import AsyncIterator, Deque, Dict, Iterable
+
+from app.core.config import settings
+from app.services.fake_data_stream import EmailData, fake_data_generator
+
+NEGATIVE_SENTIMENT = -0.3
+SUMMARY_EMAILS = 5          # Emails listed in the summary
+SEED_BIOMETRIC_HOURS = 1    # Synthetic history used to seed a new user
+SEED_EMAIL_HOURS = 2
+
+EMAIL_FIELDS = ("timestamp", "sender", "subject", "sentiment_score", "stress_trigger", "priority", "category")
+
+
+def _activity_level(heart_rate: float) -> str:
+    if heart_rate > 90:
+        return "high"
+    elif heart_rate > 75:
+        return "moderate"
+    return "low"
+
+
+def biometric_sample(user_id: int, reading: Dict, sleep_quality: float = 0.0) -> Dict:
+    """
+    A stored reading (timestamp, heart_rate, hrv_ms, stress_score) in the stream
+    sample shape. The ingest API doesn't measure sleep, so the caller carries it over.
+    """
+    timestamp = reading["timestamp"]
+    score = float(reading["stress_score"])
+    return {
+        "user_id": str(user_id),
+        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else str(timestamp),
+        "heart_rate": float(reading["heart_rate"]),
+        "hrv_ms": float(reading["hrv_ms"]),
+        "stress_level": round(score * 10, 1),
+        "activity_level": _activity_level(reading["heart_rate"]),
+        "recovery_score": round(min(100.0, reading["hrv_ms"] / 50 * 100), 1),
+        "sleep_quality": sleep_quality,
+        "source": "api",
+        "raw_stress_score": round(score, 3),
+    }
+
+
+def sample_time(sample: Dict) -> datetime:
+    """A sample's timestamp as a naive local datetime (the stream generators' convention)."""
+    value = sample["timestamp"]
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value)
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def email_entry(email: EmailData) -> Dict:
+    return {name: getattr(email, name) for name in EMAIL_FIELDS}
+
+
+def message_entry(timestamp: datetime, sender: str, channel: str, content: str,
+                  score: float, risk_flag: bool) -> Dict:
+    """An ingested message in the dashboard's email shape."""
+    return {
+        "timestamp": timestamp.isoformat(),
+        "sender": sender,
+        "subject": content[:80],
+        "sentiment_score": round(score, 3),
+        "stress_trigger": risk_flag,
+        "priority": "high" if risk_flag else "low",
+        "category": channel,
+    }
+
+
+class UserWindow:
+    __slots__ = ("biometrics", "emails", "negative_emails", "stress_trigger_emails", "updated_at")
+
+    def __init__(self):
+        self.biometrics: Deque[Dict] = deque(maxlen=settings.REALTIME_BIOMETRIC_WINDOW)
+        self.emails: Deque[Dict] = deque(maxlen=settings.REALTIME_EMAIL_WINDOW)
+        self.negative_emails = 0
+        self.stress_trigger_emails = 0
+        self.updated_at = datetime.now()
+
+    def add_biometric(self, sample: Dict):
+        self.biometrics.append(sample)
+        self.updated_at = datetime.now()
+
+    def merge_biometrics(self, samples: Iterable[Dict]):
+        """
+        Merge samples into the window in timestamp order. Samples older than
+        the oldest entry of a full window are dropped.
+        """
+        samples = sorted(samples, key=sample_time)
+        if self.biometrics:
+            if len(self.biometrics) == self.biometrics.maxlen:
+                oldest = sample_time(self.biometrics[0])
+                samples = [sample for sample in samples if sample_time(sample) >= oldest]
+            if samples and sample_time(samples[0]) < sample_time(self.biometrics[-1]):
+                samples = list(merge(self.biometrics, samples, key=sample_time))
+                self.biometrics.clear()
+        if samples:
+            self.biometrics.extend(samples)  # maxlen keeps the newest
+            self.updated_at = datetime.now()
+
+    def add_email(self, entry: Dict):
+        if len(self.emails) == self.emails.maxlen:
+            self._count(self.emails[0], -1)  # About to be evicted
+        self.emails.append(entry)
+        self._count(entry, 1)
+        self.updated_at = datetime.now()
+
+    def _count(self, entry: Dict, delta: int):
+        self.negative_emails += delta * (entry["sentiment_score"] < NEGATIVE_SENTIMENT)
+        self.stress_trigger_emails += delta * bool(entry["stress_trigger"])
+
+
+class RealtimeStateStore:
+    def __init__(self):
+        self.users: "OrderedDict[int, UserWindow]" = OrderedDict()
+        self.seeded = 0
+
+    def _window(self, user_id: int) -> UserWindow:
+        window = self.users.get(user_id)
+        if window is None:
+            window = self.users[user_id] = UserWindow()
+            if len(self.users) > settings.REALTIME_MAX_USERS:
+                self.users.popitem(last=False)
+        else:
+            self.users.move_to_end(user_id)
+        return window
+
+    def _seeded_window(self, user_id: int) -> UserWindow:
+        """The user's window, seeded from the synthetic history if nothing has arrived yet."""
+        window = self._window(user_id)
+        if not window.biometrics:
+            for sample in fake_data_generator.generate_historical_biometrics(
+                user_id, hours=SEED_BIOMETRIC_HOURS, count=settings.REALTIME_BIOMETRIC_WINDOW
+            ):
+                window.add_biometric(sample)
+        if not window.emails:
+            for email in fake_data_generator.generate_historical_emails(
+                user_id, hours=SEED_EMAIL_HOURS, count=settings.REALTIME_EMAIL_WINDOW
+            ):
+                window.add_email(email_entry(email))
+            self.seeded += 1
+        return window
+
+    # --- Feeds ---
+
+    def record_biometric(self, user_id: int, sample: Dict):
+        """A sample in the biometric stream shape (see FakeDataStreamGenerator.generate_biometric)."""
+        self._window(user_id).add_biometric(sample)
+
+    def record_readings(self, user_id: int, readings: Iterable[Dict]):
+        """Committed readings (timestamp, heart_rate, hrv_ms, stress_score), merged in by timestamp."""
+        window = self._window(user_id)
+        sleep_quality = window.biometrics[-1]["sleep_quality"] if window.biometrics else 0.0
+        window.merge_biometrics(biometric_sample(user_id, reading, sleep_quality) for reading in readings)
+
+    def record_emails(self, user_id: int, entries: Iterable[Dict]):
+        """Entries in the dashboard's email shape (email_entry / message_entry)."""
+        window = self._window(user_id)
+        for entry in entries:
+            window.add_email(entry)
+
+    async def tap_biometrics(self, user_id: int, stream: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        """Pass a live biometric stream through, recording each sample."""
+        async for sample in stream:
+            self.record_biometric(user_id, sample)
+            yield sample
+
+    async def tap_emails(self, user_id: int, stream: AsyncIterator[EmailData]) -> AsyncIterator[EmailData]:
+        """Pass a live email stream through, recording each email."""
+        async for email in stream:
+            self.record_emails(user_id, [email_entry(email)])
+            yield email
+
+    # --- Reads ---
+
+    def summary(self, user_id: int) -> Dict:
+        """RealtimeDashboardSummary for the user, from the running window state."""
+        window = self._seeded_window(user_id)
+        current = window.biometrics[-1]
+        stress_level = current["stress_level"]
+        negative = window.negative_emails
+        return {
+            "user_id": user_id,
+            "timestamp": window.updated_at.isoformat(),
+            "current_biometric": current,
+            "stress_level": "Low" if stress_level < 4 else "Medium" if stress_level < 7 else "High",
+            "stress_score": current["raw_stress_score"],
+            "spending_risk": "Critical" if negative > 5 else "Warning" if negative > 2 else "Safe",
+            "cognitive_load": current["activity_level"].title(),
+            "heart_rate": current["heart_rate"],
+            "hrv": current["hrv_ms"],
+            "recovery_score": current["recovery_score"],
+            "recent_emails_count": len(window.emails),
+            "stress_trigger_emails": window.stress_trigger_emails,
+            "recent_emails": list(islice(reversed(window.emails), SUMMARY_EMAILS))[::-1],
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            "users": len(self.users),
+            "seeded_users": self.seeded,
+            "biometric_window": settings.REALTIME_BIOMETRIC_WINDOW,
+            "email_window": settings.REALTIME_EMAIL_WINDOW,
+        }
+
+
+# Global instance
+realtime_state = RealtimeStateStore()
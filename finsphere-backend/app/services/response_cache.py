@@ -0,0 +1,206 @@
+"""
+Response Cache
+Read-through cache for the per-user read endpoints polled by the dashboard
+and the extension (dashboard, goals, budgets, insights, recent activity).
+
+- Entries hold the serialized JSON body and its ETag, keyed per endpoint
+  and user (plus query string), and tagged "user:<id>".
+- Ingest writes (biometrics, transactions) invalidate the user's tag, so
+  the next poll recomputes; RESPONSE_CACHE_TTL_SECONDS bounds staleness of
+  time-relative fields ("5 minutes ago", 24h stress windows).
+- Requests with a matching If-None-Match get 304 without touching the
+  database or serializing anything.
+
+Backends: in-process LRU (default) or Redis (RESPONSE_CACHE_BACKEND=redis,
+needs the optional `redis` package). With several API workers use Redis so
+invalidations reach every worker.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Entry = Tuple[str, bytes]  # (etag, body)
+
+
+class MemoryCacheBackend:
+    """Process-local LRU with TTL and tag sets."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    async def get(self, key: str) -> Optional[Entry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: Entry, ttl: int, tags: Iterable[str]):
+        self._entries[key] = (time.monotonic() + ttl, entry)
+        self._entries.move_to_end(key)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, tag: str) -> int:
+        keys = self._tags.pop(tag, set())
+        removed = 0
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Redis (or compatible) backend; tags are Redis sets of cache keys."""
+
+    PREFIX = "finsphere:cache:"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # Optional dependency
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Entry]:
+        raw = await self._redis.get(self.PREFIX + key)
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return etag.decode(), body
+
+    async def set(self, key: str, entry: Entry, ttl: int, tags: Iterable[str]):
+        etag, body = entry
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(self.PREFIX + key, etag.encode() + b"\n" + body, ex=ttl)
+            for tag in tags:
+                pipe.sadd(self.PREFIX + "tag:" + tag, key)
+                pipe.expire(self.PREFIX + "tag:" + tag, ttl)
+            await pipe.execute()
+
+    async def invalidate(self, tag: str) -> int:
+        tag_key = self.PREFIX + "tag:" + tag
+        keys = await self._redis.smembers(tag_key)
+        if not keys:
+            return 0
+        await self._redis.delete(tag_key, *(self.PREFIX + key.decode() for key in keys))
+        return len(keys)
+
+    def size(self) -> int:
+        return -1  # Not tracked locally
+
+
+def _make_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        try:
+            return RedisCacheBackend(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-memory response cache")
+    return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def user_tag(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    def __init__(self):
+        self.enabled = settings.RESPONSE_CACHE_ENABLED
+        self.ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+        self.backend = _make_backend()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0, "errors": 0}
+
+    @staticmethod
+    def _serialize(payload: Any) -> Entry:
+        body = orjson.dumps(
+            payload, default=jsonable_encoder,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body
+
+    def _respond(self, request: Request, entry: Entry) -> Response:
+        etag, body = entry
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def serve(self, request: Request, endpoint: str, user_id: Any,
+                    compute: Callable[[], Awaitable[Any]]) -> Response:
+        """
+        Return the cached response for (endpoint, user, query), computing and
+        storing it on a miss. Exceptions from compute are not cached.
+        """
+        query = str(request.query_params)
+        key = f"{endpoint}:{user_id}" + (f"?{query}" if query else "")
+
+        if self.enabled:
+            try:
+                entry = await self.backend.get(key)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Response cache read error: {e}")
+                entry = None
+            if entry is not None:
+                self.stats["hits"] += 1
+                return self._respond(request, entry)
+            self.stats["misses"] += 1
+
+        entry = self._serialize(await compute())
+        if self.enabled:
+            try:
+                await self.backend.set(key, entry, self.ttl, [user_tag(user_id)])
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Response cache write error: {e}")
+        return self._respond(request, entry)
+
+    async def invalidate_user(self, user_id: Any):
+        """Drop every cached response for this user (call after their data changes)."""
+        if not self.enabled or user_id is None:
+            return
+        try:
+            await self.backend.invalidate(user_tag(user_id))
+            self.stats["invalidations"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Response cache invalidation error: {e}")
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+        }
+
+
+# Global instance
+response_cache = ResponseCache()
@@ -0,0 +1,145 @@
+"""
+Sentiment Engine
+Batched sentiment scoring for messages, emails and chat bursts.
+
+Scoring uses TextBlob's pattern lexicon directly (no TextBlob object per
+message). The lexicon is loaded once per worker process, CPU-bound scoring
+runs in a process pool off the event loop, and repeated texts such as
+notification templates are served from an LRU cache.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+_lexicon = None
+
+
+def _load_lexicon():
+    """Load the pattern sentiment lexicon (once per process)."""
+    global _lexicon
+    if _lexicon is None:
+        from textblob.en import sentiment as pattern_sentiment
+        pattern_sentiment.load()
+        _lexicon = pattern_sentiment
+    return _lexicon
+
+
+def _score_texts(texts: List[str]) -> List[float]:
+    """Polarity (-1.0 to 1.0) for each text. Runs inside pool workers."""
+    lexicon = _load_lexicon()
+    return [float(lexicon(text)[0]) for text in texts]
+
+
+def label_for(polarity: float) -> str:
+    if polarity > POSITIVE_THRESHOLD:
+        return "positive"
+    elif polarity < NEGATIVE_THRESHOLD:
+        return "negative"
+    else:
+        return "neutral"
+
+
+class SentimentEngine:
+    def __init__(self):
+        self.workers = settings.SENTIMENT_WORKERS
+        self.cache_size = settings.SENTIMENT_CACHE_SIZE
+        self.chunk_size = settings.SENTIMENT_CHUNK_SIZE
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"cache_hits": 0, "cache_misses": 0, "scored": 0}
+
+    def start(self):
+        """Start the worker pool; workers load the lexicon up front."""
+        if self._pool is not None or self.workers <= 0:
+            return
+        try:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_load_lexicon)
+            logger.info(f"Sentiment engine started with {self.workers} workers")
+        except Exception as e:
+            logger.error(f"Sentiment pool unavailable, scoring in the default thread pool: {e}")
+            self._pool = None
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _cache_get(self, text: str) -> Optional[float]:
+        polarity = self._cache.get(text)
+        if polarity is not None:
+            self._cache.move_to_end(text)
+            self.stats["cache_hits"] += 1
+        else:
+            self.stats["cache_misses"] += 1
+        return polarity
+
+    def _cache_put(self, text: str, polarity: float):
+        self._cache[text] = polarity
+        self._cache.move_to_end(text)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def score(self, text: str) -> Tuple[float, str]:
+        """Synchronous scoring in the calling thread (scripts, non-async callers)."""
+        polarity = self._cache_get(text)
+        if polarity is None:
+            polarity = _score_texts([text])[0]
+            self._cache_put(text, polarity)
+            self.stats["scored"] += 1
+        return polarity, label_for(polarity)
+
+    async def analyze(self, text: str) -> Tuple[float, str]:
+        """Score one text without blocking the event loop. Returns (polarity, label)."""
+        return (await self.analyze_batch([text]))[0]
+
+    async def analyze_batch(self, texts: List[str]) -> List[Tuple[float, str]]:
+        """
+        Score many texts. Cache hits are answered inline; unique misses are
+        split into chunks and scored in parallel across the pool.
+        """
+        results: Dict[str, float] = {}
+        misses: List[str] = []
+        for text in texts:
+            if text in results:
+                continue
+            polarity = self._cache_get(text)
+            if polarity is None:
+                misses.append(text)
+                results[text] = 0.0  # Placeholder, also dedupes repeats within the batch
+            else:
+                results[text] = polarity
+
+        if misses:
+            chunks = [misses[i:i + self.chunk_size] for i in range(0, len(misses), self.chunk_size)]
+            loop = asyncio.get_running_loop()
+            scored = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, _score_texts, chunk) for chunk in chunks)
+            )
+            for chunk, polarities in zip(chunks, scored):
+                for text, polarity in zip(chunk, polarities):
+                    results[text] = polarity
+                    self._cache_put(text, polarity)
+            self.stats["scored"] += len(misses)
+
+        return [(results[text], label_for(results[text])) for text in texts]
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "workers": self.workers if self._pool is not None else 0,
+            "cache_entries": len(self._cache),
+        }
+
+
+# Global instance
+sentiment_engine = SentimentEngine()
@@ -0,0 +1,260 @@
+"""
+Site Classifier
+Maps a URL to the merchant / platform it belongs to and a site category
+(ecommerce, food_delivery, travel, gig_platform, ...), for intervention
+decisions and Intervention.website_category.
+
+- The catalogue (app/data/site_catalogue.csv, plus SITE_CATALOGUE_EXTRA_PATH)
+  is loaded into a trie keyed by reversed host labels, so "m.myntra.com"
+  walks com -> myntra -> m and the most specific catalogued suffix wins.
+- Hosts not in the catalogue fall back to an Aho-Corasick scan of their
+  registered-domain label for known brand names ("amazon.co.za" -> Amazon).
+- Results are memoized per host in an LRU cache.
+
+Lookups cost O(len(host)) however large the catalogue grows.
+"""
+
+import csv
+import logging
+import os
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_CATALOGUE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "site_catalogue.csv")
+
+# Categories that count as spending for intervention decisions
+SHOPPING_CATEGORIES = frozenset({
+    "ecommerce", "marketplace", "fashion", "beauty", "food_delivery", "grocery",
+    "electronics", "home", "travel", "ticketing", "gaming", "bnpl", "gambling",
+})
+GIG_CATEGORIES = frozenset({"gig_platform"})
+
+# Multi-label public suffixes seen in the catalogue's markets; everything else
+# is treated as a single-label TLD. Good enough for registered-domain parsing
+# without shipping the full Public Suffix List.
+MULTI_LABEL_SUFFIXES = frozenset({
+    "co.uk", "org.uk", "ac.uk", "gov.uk",
+    "co.in", "net.in", "org.in", "firm.in", "gen.in", "ind.in", "ac.in", "gov.in",
+    "com.au", "net.au", "org.au", "co.nz",
+    "co.jp", "ne.jp", "or.jp", "co.kr",
+    "com.br", "com.mx", "com.ar", "com.co",
+    "com.tr", "com.sg", "com.my", "com.ph", "com.vn", "co.id", "co.th",
+    "com.cn", "com.hk", "com.tw", "co.za", "com.sa", "com.eg",
+})
+
+# Brand keywords shorter than this are too likely to appear inside unrelated names
+MIN_KEYWORD_LENGTH = 5
+
+
+class SiteClassification(NamedTuple):
+    domain: str               # Registered domain, e.g. "amazon.co.uk" ("" if unparseable)
+    name: Optional[str]       # Merchant / platform name from the catalogue
+    category: Optional[str]   # Site category, None if unknown
+    matched_by: Optional[str]  # "domain", "keyword" or None
+
+    @property
+    def is_shopping(self) -> bool:
+        return self.category in SHOPPING_CATEGORIES
+
+    @property
+    def is_gig_work(self) -> bool:
+        return self.category in GIG_CATEGORIES
+
+
+UNKNOWN = SiteClassification("", None, None, None)
+
+
+def url_host(url: str) -> str:
+    """Lower-cased host of a URL (scheme optional), without port or trailing dot."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if "//" not in url:
+        url = "//" + url
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+    return "" if any(char.isspace() for char in host) else host.rstrip(".")
+
+
+def registered_domain(host: str) -> str:
+    """eTLD+1 of a host: "m.shop.amazon.co.uk" -> "amazon.co.uk"."""
+    labels = host.split(".")
+    if len(labels) < 2:
+        return host
+    suffix_labels = 2 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES and len(labels) > 2 else 1
+    return ".".join(labels[-(suffix_labels + 1):])
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over brand keywords; reports the longest match."""
+
+    def __init__(self, keywords: Dict[str, Tuple[str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Optional[str]] = [None]  # Longest keyword ending at this state
+        self._values = keywords
+
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                state = nxt
+            self._out[state] = keyword
+
+        # Breadth-first failure links (depth-1 states fail to the root). A
+        # state's own keyword is longer than any suffix keyword it inherits.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] or self._out[self._fail[nxt]]
+
+    def longest_match(self, text: str) -> Optional[Tuple[str, str]]:
+        state, best = 0, None
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found = self._out[state]
+            if found and (best is None or len(found) > len(best)):
+                best = found
+        return self._values[best] if best else None
+
+
+class SiteClassifier:
+    def __init__(self, paths: Optional[Iterable[str]] = None):
+        if paths is None:
+            paths = [BUNDLED_CATALOGUE] + ([settings.SITE_CATALOGUE_EXTRA_PATH] if settings.SITE_CATALOGUE_EXTRA_PATH else [])
+        self.load(paths)
+
+    def load(self, paths: Iterable[str]):
+        """(Re)build the trie and keyword automaton from catalogue CSV files; later files override earlier ones."""
+        entries: Dict[str, Tuple[str, str]] = {}
+        for path in paths:
+            try:
+                with open(path, newline="", encoding="utf-8") as f:
+                    rows = csv.DictReader(line for line in f if not line.startswith("#"))
+                    for row in rows:
+                        domain = (row.get("domain") or "").strip().lower().rstrip(".")
+                        if domain:
+                            entries[domain] = ((row.get("name") or domain).strip(), (row.get("category") or "").strip())
+            except OSError as e:
+                logger.error(f"Could not load site catalogue {path}: {e}")
+
+        trie: Dict = {}
+        for domain, value in entries.items():
+            node = trie
+            for label in reversed(domain.split(".")):
+                node = node.setdefault(label, {})
+            node[""] = value  # Empty key marks a catalogued domain
+
+        # Brand keywords come from catalogued registered domains only, so a
+        # subdomain override (aws.amazon.com) doesn't claim the brand; a label
+        # shared by different categories is ambiguous and left out.
+        keywords: Dict[str, Tuple[str, str]] = {}
+        ambiguous = set()
+        for domain, value in entries.items():
+            if registered_domain(domain) != domain:
+                continue
+            brand = domain.split(".")[0]
+            if len(brand) < MIN_KEYWORD_LENGTH:
+                continue
+            if brand in keywords and keywords[brand][1] != value[1]:
+                ambiguous.add(brand)
+            keywords.setdefault(brand, value)
+        for brand in ambiguous:
+            del keywords[brand]
+
+        self._trie = trie
+        self._automaton = KeywordAutomaton(keywords)
+        self.domain_count = len(entries)
+        self.keyword_count = len(keywords)
+        self._classify_host = lru_cache(maxsize=settings.SITE_CLASSIFIER_CACHE_SIZE)(self._classify_host_uncached)
+        logger.info(f"Loaded site catalogue: {self.domain_count} domains, {self.keyword_count} brand keywords")
+
+    def _classify_host_uncached(self, host: str) -> SiteClassification:
+        if not host:
+            return UNKNOWN
+        domain = registered_domain(host)
+
+        # Longest catalogued suffix of the host
+        node, match = self._trie, None
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            match = node.get("", match)
+        if match:
+            return SiteClassification(domain, match[0], match[1] or None, "domain")
+
+        # Brand keyword inside the registered-domain label ("amazon.co.za", "flipkart-deals.shop")
+        keyword_match = self._automaton.longest_match(domain.split(".")[0])
+        if keyword_match:
+            return SiteClassification(domain, keyword_match[0], keyword_match[1] or None, "keyword")
+        return SiteClassification(domain, None, None, None)
+
+    def classify(self, url: str) -> SiteClassification:
+        return self._classify_host(url_host(url))
+
+    def site_name(self, url: str, default: str = "Shopping Site") -> str:
+        """Readable merchant name for a URL, e.g. "Amazon"."""
+        site = self.classify(url)
+        return site.name or site.domain or default
+
+    def get_stats(self) -> Dict:
+        info = self._classify_host.cache_info()
+        return {
+            "domains": self.domain_count,
+            "brand_keywords": self.keyword_count,
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_size": info.currsize,
+        }
+
+
+# Global instance
+site_classifier = SiteClassifier()
+
+
+if __name__ == "__main__":
+    # Backfill Intervention.website_category for rows logged before classification existed:
+    #     python -m app.services.site_classifier
+    from sqlalchemy import select, update
+    from app.core.database import SessionLocal
+    from app.models.database import Intervention
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Intervention.id, Intervention.url).where(Intervention.website_category.is_(None))
+        ).all()
+        updates = [
+            {"id": row_id, "website_category": category}
+            for row_id, url in rows
+            if (category := site_classifier.classify(url).category)
+        ]
+        if updates:
+            db.execute(update(Intervention), updates)
+            db.commit()
+        print(f"Classified {len(updates)} of {len(rows)} uncategorized interventions")
+    finally:
+        db.close()
@@ -0,0 +1,173 @@
+"""
+Live Stream Hub
+Fans one producer per (stream kind, user) out to every connection watching
+that user, so N tabs on one dashboard cost one generator instead of N.
+
+- Producers are registered per kind (e.g. "biometrics", "emails") and
+  started on the first subscription; the last unsubscribe cancels them.
+- Each connection gets a bounded queue of STREAM_SUBSCRIBER_QUEUE_SIZE.
+  When a slow client falls behind, coalescing kinds (state samples such as
+  biometrics) keep only the newest pending event; other kinds drop the
+  oldest pending event. Either way the producer never blocks.
+- Coalescing kinds replay the latest event to new subscribers.
+- Idle subscriptions yield None every STREAM_HEARTBEAT_SECONDS so the
+  endpoint can send a keep-alive.
+- Events are encoded once per wire format and shared by all subscribers.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import asdict, is_dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core import wire_format
+
+logger = logging.getLogger(__name__)
+
+PRODUCER_RESTART_SECONDS = 1.0
+
+
+class StreamEvent:
+    """An event plus its encoded frames, built once for all subscribers."""
+    __slots__ = ("data", "_frames")
+
+    def __init__(self, data: Any):
+        self.data = asdict(data) if is_dataclass(data) else data
+        self._frames: Dict[bool, bytes] = {}
+
+    def frame(self, binary: bool) -> bytes:
+        frame = self._frames.get(binary)
+        if frame is None:
+            frame = self._frames[binary] = wire_format.stream_frame(self.data, binary)
+        return frame
+
+
+class Subscription:
+    """One connection's view of a topic: async-iterate for events (None = heartbeat)."""
+
+    def __init__(self, coalesce: bool):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.STREAM_SUBSCRIBER_QUEUE_SIZE)
+        self.coalesce = coalesce
+        self.dropped = 0
+
+    def offer(self, event: StreamEvent):
+        if self.queue.full():
+            # Slow client: coalesce to the newest sample, or make room by dropping the oldest
+            if self.coalesce:
+                self.dropped += self.queue.qsize()
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+            else:
+                self.dropped += 1
+                self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Optional[StreamEvent]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), settings.STREAM_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _Topic:
+    __slots__ = ("subscribers", "producer", "last_event", "published")
+
+    def __init__(self):
+        self.subscribers: Set[Subscription] = set()
+        self.producer: Optional[asyncio.Task] = None
+        self.last_event: Optional[StreamEvent] = None
+        self.published = 0
+
+
+class StreamHub:
+    def __init__(self):
+        self.producers: Dict[str, Callable[[int], AsyncIterator]] = {}
+        self.coalescing: Set[str] = set()
+        self.topics: Dict[Tuple[str, int], _Topic] = {}
+        self.dropped = 0
+
+    def register_producer(self, kind: str, factory: Callable[[int], AsyncIterator], coalesce: bool = False):
+        """
+        `factory(user_id)` returns the async iterator feeding the kind's topics.
+        Kinds without a producer are fed through publish() only.
+        """
+        self.producers[kind] = factory
+        if coalesce:
+            self.coalescing.add(kind)
+
+    @asynccontextmanager
+    async def subscribe(self, kind: str, user_id: int):
+        key = (kind, user_id)
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = self.topics[key] = _Topic()
+        subscription = Subscription(kind in self.coalescing)
+        topic.subscribers.add(subscription)
+        if kind in self.coalescing and topic.last_event is not None:
+            subscription.offer(topic.last_event)
+        if topic.producer is None and kind in self.producers:
+            topic.producer = asyncio.create_task(self._produce(kind, user_id, topic))
+        try:
+            yield subscription
+        finally:
+            self._unsubscribe(key, topic, subscription)
+
+    def _unsubscribe(self, key: Tuple[str, int], topic: _Topic, subscription: Subscription):
+        topic.subscribers.discard(subscription)
+        self.dropped += subscription.dropped
+        if not topic.subscribers:
+            # Last viewer gone: stop the producer and forget the topic
+            if topic.producer is not None:
+                topic.producer.cancel()
+            if self.topics.get(key) is topic:
+                del self.topics[key]
+
+    def publish(self, kind: str, user_id: int, data: Any):
+        """Deliver an event to the current subscribers of (kind, user_id), if any."""
+        topic = self.topics.get((kind, user_id))
+        if topic is None:
+            return
+        event = StreamEvent(data)
+        topic.last_event = event
+        topic.published += 1
+        for subscription in topic.subscribers:
+            subscription.offer(event)
+
+    async def _produce(self, kind: str, user_id: int, topic: _Topic):
+        while topic.subscribers:
+            try:
+                async for data in self.producers[kind](user_id):
+                    self.publish(kind, user_id, data)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stream producer {kind}/{user_id} failed: {e}")
+                await asyncio.sleep(PRODUCER_RESTART_SECONDS)
+
+    def get_stats(self) -> Dict:
+        return {
+            "topics": len(self.topics),
+            "producers": sum(1 for topic in self.topics.values() if topic.producer is not None),
+            "subscribers": sum(len(topic.subscribers) for topic in self.topics.values()),
+            "published_events": sum(topic.published for topic in self.topics.values()),
+            "dropped_events": self.dropped + sum(
+                s.dropped for topic in self.topics.values() for s in topic.subscribers
+            ),
+        }
+
+    async def stop(self):
+        tasks = [topic.producer for topic in self.topics.values() if topic.producer is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.topics.clear()
+
+
+# Global instance
+stream_hub = StreamHub()
@@ -0,0 +1,407 @@
+"""
+Per-User Stress Baselines
+Online HR/HRV baselines updated in O(1) per reading, so stress can be scored
+as a deviation from the user's own normal instead of population thresholds.
+
+Each signal keeps:
+- a rolling Welford mean/variance (count capped at BASELINE_WINDOW so old data decays)
+- an EWMA that tracks slow drift (fitness, medication, season)
+- P² percentile sketches (p10/p50/p90) with constant memory
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import stress_scoring
+
+logger = logging.getLogger(__name__)
+
+# Weights mirror the population heuristic (HR 40%, HRV 60%)
+HR_WEIGHT = stress_scoring.HR_WEIGHT
+HRV_WEIGHT = stress_scoring.HRV_WEIGHT
+
+# Floors so a very steady user doesn't turn every tiny wobble into a huge z-score
+MIN_HR_STD = 3.0    # bpm
+MIN_HRV_STD = 4.0   # ms
+
+# Deviation (in combined z units) at which the score crosses 0.5
+Z_MIDPOINT = 1.0
+
+
+class RunningStats:
+    """Welford mean/variance with the sample count capped at `window`."""
+
+    def __init__(self, window: int, count: float = 0.0, mean: float = 0.0, m2: float = 0.0):
+        self.window = window
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, x: float):
+        if self.count >= self.window:
+            # Keep the effective window fixed: shrink the accumulated spread by one sample
+            self.m2 *= (self.window - 1) / self.window
+            self.count = self.window - 1
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def to_dict(self) -> Dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, window: int, data: Dict) -> "RunningStats":
+        return cls(window, data.get("count", 0.0), data.get("mean", 0.0), data.get("m2", 0.0))
+
+
+class P2Quantile:
+    """P² streaming quantile estimator (Jain & Chlamtac, 1985): five markers, O(1) update."""
+
+    def __init__(self, p: float):
+        self.p = p
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def update(self, x: float):
+        h = self.heights
+        if len(h) < 5:
+            h.append(x)
+            if len(h) == 5:
+                h.sort()
+            return
+
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(h, x) - 1
+
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        n = self.positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                q = self._parabolic(i, step)
+                if not h[i - 1] < q < h[i + 1]:
+                    q = h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+                h[i] = q
+                n[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        h, n = self.heights, self.positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            ordered = sorted(self.heights)
+            return ordered[int(round(self.p * (len(ordered) - 1)))]
+        return self.heights[2]
+
+    def to_dict(self) -> Dict:
+        return {
+            "p": self.p,
+            "heights": list(self.heights),
+            "positions": list(self.positions),
+            "desired": list(self.desired),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "P2Quantile":
+        sketch = cls(data["p"])
+        sketch.heights = list(data.get("heights", []))
+        sketch.positions = list(data.get("positions", sketch.positions))
+        sketch.desired = list(data.get("desired", sketch.desired))
+        return sketch
+
+
+class SignalBaseline:
+    """Baseline for one physiological signal (HR or HRV)."""
+
+    QUANTILES = (0.1, 0.5, 0.9)
+
+    def __init__(self, window: int, alpha: float):
+        self.alpha = alpha
+        self.stats = RunningStats(window)
+        self.ewma: Optional[float] = None
+        self.sketches = {p: P2Quantile(p) for p in self.QUANTILES}
+
+    def update(self, x: float):
+        self.stats.update(x)
+        self.ewma = x if self.ewma is None else self.alpha * x + (1 - self.alpha) * self.ewma
+        for sketch in self.sketches.values():
+            sketch.update(x)
+
+    @property
+    def center(self) -> float:
+        return self.ewma if self.ewma is not None else self.stats.mean
+
+    def quantile(self, p: float) -> Optional[float]:
+        return self.sketches[p].value
+
+    def to_dict(self) -> Dict:
+        return {
+            "stats": self.stats.to_dict(),
+            "ewma": self.ewma,
+            "sketches": [sketch.to_dict() for sketch in self.sketches.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, window: int, alpha: float, data: Dict) -> "SignalBaseline":
+        baseline = cls(window, alpha)
+        baseline.stats = RunningStats.from_dict(window, data.get("stats", {}))
+        baseline.ewma = data.get("ewma")
+        for sketch_data in data.get("sketches", []):
+            sketch = P2Quantile.from_dict(sketch_data)
+            baseline.sketches[sketch.p] = sketch
+        return baseline
+
+
+class UserBaseline:
+    """HR and HRV baselines for a single user."""
+
+    def __init__(self, window: int, alpha: float):
+        self.hr = SignalBaseline(window, alpha)
+        self.hrv = SignalBaseline(window, alpha)
+        self.updated_at: Optional[datetime] = None
+
+    @property
+    def sample_count(self) -> int:
+        return int(self.hr.stats.count)
+
+    def update(self, hr: float, hrv: float):
+        self.hr.update(hr)
+        self.hrv.update(hrv)
+        self.updated_at = datetime.utcnow()
+
+    def deviation(self, hr, hrv):
+        """Combined z-score: HR above normal and HRV below normal both add stress."""
+        hr_z = (hr - self.hr.center) / max(self.hr.stats.std, MIN_HR_STD)
+        hrv_z = (self.hrv.center - hrv) / max(self.hrv.stats.std, MIN_HRV_STD)
+        return HR_WEIGHT * hr_z + HRV_WEIGHT * hrv_z
+
+    def to_dict(self) -> Dict:
+        return {"hr": self.hr.to_dict(), "hrv": self.hrv.to_dict()}
+
+    @classmethod
+    def from_dict(cls, window: int, alpha: float, data: Dict) -> "UserBaseline":
+        baseline = cls(window, alpha)
+        baseline.hr = SignalBaseline.from_dict(window, alpha, data.get("hr", {}))
+        baseline.hrv = SignalBaseline.from_dict(window, alpha, data.get("hrv", {}))
+        return baseline
+
+
+class StressBaselineStore:
+    """In-memory per-user baselines, persisted periodically to `user_stress_baselines`."""
+
+    def __init__(self):
+        self.window = settings.BASELINE_WINDOW
+        self.alpha = settings.BASELINE_EWMA_ALPHA
+        self.min_samples = settings.BASELINE_MIN_SAMPLES
+        self.baselines: Dict[int, UserBaseline] = {}
+        self._dirty: set = set()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def get(self, user_id: int) -> UserBaseline:
+        baseline = self.baselines.get(user_id)
+        if baseline is None:
+            baseline = self.baselines[user_id] = UserBaseline(self.window, self.alpha)
+        return baseline
+
+    def assess(self, user_id: int, hr: float, hrv: float) -> Tuple[bool, float]:
+        """
+        Score a reading against the user's baseline, then fold it into the baseline.
+        Falls back to the population heuristic until enough samples are seen.
+        Returns (is_stressed, stress_score).
+        """
+        baseline = self.get(user_id)
+        result = self._score(baseline, hr, hrv)
+        baseline.update(hr, hrv)
+        self._dirty.add(user_id)
+        return result
+
+    def assess_batch(self, user_id: int, hr, hrv) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a batch against the baseline as it stood before the batch (vectorized),
+        then fold every sample in.
+        """
+        hr = np.asarray(hr, dtype=np.float64)
+        hrv = np.asarray(hrv, dtype=np.float64)
+        baseline = self.get(user_id)
+
+        if baseline.sample_count < self.min_samples:
+            is_stressed, scores = stress_scoring.stress_scores(hr, hrv)
+        else:
+            z = baseline.deviation(hr, hrv)
+            scores = 1 / (1 + np.exp(-(z - Z_MIDPOINT)))
+            is_stressed = (hr > baseline.hr.quantile(0.9)) & (hrv < baseline.hrv.quantile(0.1))
+            scores = np.where(is_stressed, np.maximum(scores, stress_scoring.ACUTE_MIN_SCORE), scores)
+
+        for h, v in zip(hr.tolist(), hrv.tolist()):
+            baseline.update(h, v)
+        self._dirty.add(user_id)
+        return is_stressed, scores
+
+    def _score(self, baseline: UserBaseline, hr: float, hrv: float) -> Tuple[bool, float]:
+        if baseline.sample_count < self.min_samples:
+            return stress_scoring.stress_score(hr, hrv)
+
+        z = baseline.deviation(hr, hrv)
+        score = 1 / (1 + math.exp(-(z - Z_MIDPOINT)))
+
+        # Personal version of "High HR + Low HRV": above own p90 HR and below own p10 HRV
+        is_stressed = hr > baseline.hr.quantile(0.9) and hrv < baseline.hrv.quantile(0.1)
+        if is_stressed:
+            score = max(score, stress_scoring.ACUTE_MIN_SCORE)
+        return is_stressed, score
+
+    def summary(self, user_id: int) -> Dict:
+        """Readable snapshot of a user's baseline"""
+        baseline = self.baselines.get(user_id) or UserBaseline(self.window, self.alpha)
+        return {
+            "sample_count": baseline.sample_count,
+            "personalized": baseline.sample_count >= self.min_samples,
+            "heart_rate": self._signal_summary(baseline.hr),
+            "hrv_ms": self._signal_summary(baseline.hrv),
+            "updated_at": baseline.updated_at.isoformat() if baseline.updated_at else None,
+        }
+
+    @staticmethod
+    def _signal_summary(signal: SignalBaseline) -> Dict:
+        return {
+            "mean": round(signal.stats.mean, 2),
+            "std": round(signal.stats.std, 2),
+            "ewma": round(signal.center, 2),
+            "p10": signal.quantile(0.1),
+            "p50": signal.quantile(0.5),
+            "p90": signal.quantile(0.9),
+        }
+
+    # --- Persistence ---
+
+    def load(self):
+        """Load persisted baselines (called once at startup)."""
+        from app.core.database import SessionLocal
+        from app.models.database import UserStressBaseline
+
+        if SessionLocal is None:
+            return
+        db = SessionLocal()
+        try:
+            for row in db.query(UserStressBaseline).all():
+                baseline = UserBaseline.from_dict(self.window, self.alpha, row.state or {})
+                baseline.updated_at = row.updated_at
+                self.baselines[row.user_id] = baseline
+            logger.info(f"Loaded {len(self.baselines)} stress baselines")
+        except Exception as e:
+            logger.error(f"Error loading stress baselines: {e}")
+        finally:
+            db.close()
+
+    def _snapshot_dirty(self) -> List[Dict]:
+        """Copy baselines changed since the last flush (runs on the event loop)."""
+        dirty, self._dirty = self._dirty, set()
+        return [
+            {
+                "user_id": user_id,
+                "sample_count": self.baselines[user_id].sample_count,
+                "hr_mean": self.baselines[user_id].hr.center,
+                "hrv_mean": self.baselines[user_id].hrv.center,
+                "state": self.baselines[user_id].to_dict(),
+                "updated_at": self.baselines[user_id].updated_at,
+            }
+            for user_id in dirty
+        ]
+
+    def _write(self, rows: List[Dict]) -> List[int]:
+        """
+        Upsert baseline snapshots (safe to run in a worker thread: touches no
+        store state). Returns the user ids that were not persisted.
+        """
+        from app.core.database import SessionLocal
+        from app.models.database import UserStressBaseline
+        from sqlalchemy.dialects.postgresql import insert
+
+        if SessionLocal is None or not rows:
+            return []
+        db = SessionLocal()
+        try:
+            stmt = insert(UserStressBaseline)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[UserStressBaseline.user_id],
+                    set_={
+                        "sample_count": stmt.excluded.sample_count,
+                        "hr_mean": stmt.excluded.hr_mean,
+                        "hrv_mean": stmt.excluded.hrv_mean,
+                        "state": stmt.excluded.state,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                ),
+                rows,
+            )
+            db.commit()
+            logger.debug(f"Persisted {len(rows)} stress baselines")
+            return []
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error persisting stress baselines: {e}")
+            return [row["user_id"] for row in rows]
+        finally:
+            db.close()
+
+    async def flush(self):
+        """Persist baselines changed since the last flush."""
+        rows = self._snapshot_dirty()
+        if rows:
+            failed = await asyncio.to_thread(self._write, rows)
+            self._dirty.update(failed)  # Retry on the next flush (back on the event loop)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(settings.BASELINE_FLUSH_SECONDS)
+            await self.flush()
+
+    def start(self):
+        self.load()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+
+# Global instance
+stress_baseline_store = StressBaselineStore()
@@ -0,0 +1,59 @@
+"""
+Stress Scoring
+Single HR/HRV stress heuristic shared by the API, ingestion and ML training code.
+
+Only depends on NumPy so it can be imported outside the backend (ml/, scripts/).
+"""
+
+from typing import Sequence, Tuple, Union
+import numpy as np
+
+# Normalization ranges (population defaults)
+HR_REST_BPM = 60.0      # HR at or below this scores 0
+HR_RANGE_BPM = 40.0     # HR at or above 100 bpm scores 1
+HRV_CEILING_MS = 100.0  # HRV at or above this scores 0
+HRV_RANGE_MS = 80.0     # HRV at or below 20 ms scores 1
+
+HR_WEIGHT = 0.4
+HRV_WEIGHT = 0.6
+
+# Acute stress: High HR + Low HRV forces a high score
+ACUTE_HR_BPM = 90.0
+ACUTE_HRV_MS = 35.0
+ACUTE_MIN_SCORE = 0.8
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def stress_score(hr: float, hrv: float) -> Tuple[bool, float]:
+    """
+    Scalar fast path for a single reading (no NumPy overhead).
+    Returns (is_stressed, stress_score) with stress_score in [0, 1].
+    """
+    hr_score = min(1.0, max(0.0, (hr - HR_REST_BPM) / HR_RANGE_BPM))
+    hrv_score = min(1.0, max(0.0, (HRV_CEILING_MS - hrv) / HRV_RANGE_MS))
+    score = (hr_score * HR_WEIGHT) + (hrv_score * HRV_WEIGHT)
+
+    is_stressed = hr > ACUTE_HR_BPM and hrv < ACUTE_HRV_MS
+    if is_stressed:
+        score = max(score, ACUTE_MIN_SCORE)
+
+    return is_stressed, score
+
+
+def stress_scores(hr: ArrayLike, hrv: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Array path for batch ingest, backfills and training data.
+    Returns (is_stressed, stress_score) arrays matching the input shape.
+    """
+    hr = np.asarray(hr, dtype=np.float64)
+    hrv = np.asarray(hrv, dtype=np.float64)
+
+    hr_score = np.clip((hr - HR_REST_BPM) / HR_RANGE_BPM, 0.0, 1.0)
+    hrv_score = np.clip((HRV_CEILING_MS - hrv) / HRV_RANGE_MS, 0.0, 1.0)
+    score = (hr_score * HR_WEIGHT) + (hrv_score * HRV_WEIGHT)
+
+    is_stressed = (hr > ACUTE_HR_BPM) & (hrv < ACUTE_HRV_MS)
+    score = np.where(is_stressed, np.maximum(score, ACUTE_MIN_SCORE), score)
+
+    return is_stressed, score
@@ -3,6 +3,8 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from app.models.schemas import DashboardStats
+from app.services.decision_state import decide_intervention
+from app.services.site_classifier import site_classifier
 
 class UserDataService:
     def __init__(self):
@@ -119,55 +121,7 @@ class UserDataService:
         spending_risk = self.get_spending_risk(user_id)
         effectiveness = self.get_intervention_effectiveness(user_id)
         
-        # Base intervention logic
-        should_intervene = False
-        intervention_severity = "low"
-        delay_minutes = 3
-        message = "Consider waiting before making this purchase."
-        
-        # High stress + shopping site = likely intervention
-        shopping_sites = ["amazon", "myntra", "flipkart", "swiggy", "zomato"]
-        is_shopping = any(site in context_url.lower() for site in shopping_sites)
-        
-        gig_sites = ["upwork", "fiverr", "freelancer"]
-        is_gig_work = any(site in context_url.lower() for site in gig_sites)
-        
-        if is_shopping and stress_score > 0.5:
-            should_intervene = True
-            if stress_score > 0.7:
-                intervention_severity = "high"
-                delay_minutes = 10
-                message = f"🔴 HIGH STRESS ALERT: Your stress level is {stress_level}. Take a break before purchasing."
-            elif stress_score > 0.4:
-                intervention_severity = "medium" 
-                delay_minutes = 5
-                message = f"🟡 CAUTION: Elevated stress detected. Consider if this purchase aligns with your goals."
-        
-        elif is_gig_work and stress_score > 0.6:
-            should_intervene = True
-            intervention_severity = "medium"
-            delay_minutes = 7
-            message = "High stress detected. Review your pricing carefully to avoid undervaluing your work."
-        
-        # Adjust based on user's intervention history
-        if effectiveness['success_rate'] < 0.3:
-            # User often ignores interventions, try stronger approach
-            if intervention_severity == "low":
-                intervention_severity = "medium"
-            delay_minutes += 2
-        
-        return {
-            "should_intervene": should_intervene,
-            "severity": intervention_severity,
-            "delay_minutes": delay_minutes,
-            "message": message,
-            "user_context": {
-                "stress_level": stress_level,
-                "stress_score": stress_score,
-                "spending_risk": spending_risk,
-                "intervention_success_rate": effectiveness['success_rate']
-            }
-        }
+        return decide_intervention(stress_level, stress_score, spending_risk, effectiveness, context_url)
     
     def log_intervention_result(self, user_id: str, intervention_data: Dict):
         """Log intervention result to user's history (in production, this would update database)"""
@@ -230,16 +184,7 @@ class UserDataService:
     
     def _extract_site_name(self, url: str) -> str:
         """Extract readable site name from URL"""
-        if 'amazon' in url:
-            return 'Amazon'
-        elif 'myntra' in url:
-            return 'Myntra'
-        elif 'flipkart' in url:
-            return 'Flipkart'
-        elif 'upwork' in url:
-            return 'Upwork'
-        else:
-            return 'Shopping Site'
+        return site_classifier.site_name(url)
     
     def check_permissions(self, user_id: str, data_type: str) -> bool:
         """Check if user has granted permission for specific data type"""
@@ -1,8 +1,10 @@
+import asyncio
 import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, PayloadSchemaType
+import numpy as np
 import ollama
 from app.core.config import settings
 import json
@@ -55,10 +57,30 @@ class VectorService:
                 )
                 print(f"Created collection: {self.collection_name}")
                 logger.info(f"Created Qdrant collection: {self.collection_name}")
+            
+            self._ensure_payload_indexes()
         except Exception as e:
             print(f"Error ensuring collection exists: {e}")
             logger.error(f"Collection creation error: {e}")
 
+    def _ensure_payload_indexes(self):
+        """Index the payload fields used for filtering and re-ranking (idempotent)."""
+        payload_indexes = {
+            "user_id": PayloadSchemaType.KEYWORD,
+            "type": PayloadSchemaType.KEYWORD,
+            "hour_of_day": PayloadSchemaType.INTEGER,
+            "stress_level": PayloadSchemaType.FLOAT,
+        }
+        for field_name, field_schema in payload_indexes.items():
+            try:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+            except Exception as e:
+                logger.debug(f"Payload index {field_name} not created: {e}")
+
     def get_embedding(self, text: str) -> List[float]:
         """Generate embedding for text using Ollama."""
         try:
@@ -73,6 +95,20 @@ class VectorService:
             # Return mock embedding of correct size for nomic-embed-text
             return [0.1] * 768
 
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts with a single Ollama call."""
+        if not texts:
+            return []
+        try:
+            response = ollama.embed(
+                model=settings.OLLAMA_EMBEDDINGS_MODEL,
+                input=texts
+            )
+            return response['embeddings']
+        except Exception as e:
+            logger.warning(f"Batch embedding failed, falling back to per-text embeddings: {e}")
+            return [self.get_embedding(text) for text in texts]
+
     async def upsert_event(self, 
                            event_id: str, 
                            text_description: str, 
@@ -91,27 +127,11 @@ class VectorService:
         try:
             vector = self.get_embedding(text_description)
             
-            # Enrich metadata with additional context for better querying
-            enriched_metadata = {
-                **metadata,
-                "created_at": datetime.now().isoformat(),
-                "text_length": len(text_description),
-                "description_hash": hash(text_description) % (2**31)  # For deduplication
-            }
-            
-            # Add behavioral tags for easier filtering
-            if metadata.get('type') == 'transaction':
-                enriched_metadata['spending_tags'] = self._extract_spending_tags(metadata)
-            elif metadata.get('type') == 'biometric':
-                enriched_metadata['wellbeing_tags'] = self._extract_wellbeing_tags(metadata)
-            elif metadata.get('type') == 'intervention':
-                enriched_metadata['intervention_tags'] = self._extract_intervention_tags(metadata)
-            
             # Create point for Qdrant
             point = PointStruct(
                 id=event_id,
                 vector=vector,
-                payload=enriched_metadata
+                payload=self._enrich_metadata(text_description, metadata)
             )
             
             self.client.upsert(
@@ -122,6 +142,65 @@ class VectorService:
         except Exception as e:
             logger.error(f"Error upserting event: {e}")
 
+    async def upsert_events(self, events: List[Dict[str, Any]]):
+        """
+        Upsert many events at once (batch ingestion).
+        Each event is a dict with `event_id`, `text_description` and `metadata`.
+        Embeddings are generated in one call and points written in QDRANT_BATCH_SIZE chunks.
+        The Ollama and Qdrant calls are blocking, so they run in a worker thread.
+        Raises on failure, including when Qdrant is unavailable, so the ingest
+        queue retries (and eventually dead-letters) instead of dropping the jobs.
+        """
+        if not events:
+            return
+        if not self.client:
+            raise RuntimeError("Qdrant client not available")
+        
+        try:
+            await asyncio.to_thread(self._write_events, events)
+        except Exception as e:
+            logger.error(f"Error upserting events batch: {e}")
+            raise  # Let the ingest queue retry the batch
+
+    def _write_events(self, events: List[Dict[str, Any]]):
+        vectors = self.get_embeddings([event['text_description'] for event in events])
+        points = [
+            PointStruct(
+                id=event['event_id'],
+                vector=vector,
+                payload=self._enrich_metadata(event['text_description'], event['metadata'])
+            )
+            for event, vector in zip(events, vectors)
+        ]
+        
+        batch_size = settings.QDRANT_BATCH_SIZE
+        for start in range(0, len(points), batch_size):
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=points[start:start + batch_size]
+            )
+        logger.debug(f"Upserted {len(points)} events to Qdrant")
+
+    def _enrich_metadata(self, text_description: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Enrich metadata with additional context for better querying"""
+        enriched_metadata = {
+            **metadata,
+            **self._extract_context_features(metadata),
+            "created_at": datetime.now().isoformat(),
+            "text_length": len(text_description),
+            "description_hash": hash(text_description) % (2**31)  # For deduplication
+        }
+        
+        # Add behavioral tags for easier filtering
+        if metadata.get('type') == 'transaction':
+            enriched_metadata['spending_tags'] = self._extract_spending_tags(metadata)
+        elif metadata.get('type') == 'biometric':
+            enriched_metadata['wellbeing_tags'] = self._extract_wellbeing_tags(metadata)
+        elif metadata.get('type') == 'intervention':
+            enriched_metadata['intervention_tags'] = self._extract_intervention_tags(metadata)
+        
+        return enriched_metadata
+
     async def query_similar_events(self, 
                                    user_id: str, 
                                    query_text: str, 
@@ -166,26 +245,18 @@ class VectorService:
 
             search_filter = Filter(must=must_conditions) if must_conditions else None
 
+            # Over-fetch when re-ranking so better behavioral matches beyond top_k are seen
+            limit = top_k * settings.VECTOR_RERANK_POOL_FACTOR if behavioral_context else top_k
+
             results = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=vector,
-                limit=top_k,
+                limit=limit,
                 query_filter=search_filter,
                 with_payload=True
             )
             
-            events = [
-                {
-                    "id": str(result.id),
-                    "score": result.score,
-                    "metadata": result.payload or {},
-                    "relevance_score": self._calculate_behavioral_relevance(result.payload, behavioral_context)
-                }
-                for result in results
-            ]
-            
-            # Sort by combined similarity + behavioral relevance
-            events.sort(key=lambda x: (x['score'] + x['relevance_score']) / 2, reverse=True)
+            events = self._rerank_events(results, behavioral_context, top_k)
             
             logger.debug(f"Retrieved {len(events)} behaviorally-relevant events for {user_id}")
             return events
@@ -193,33 +264,104 @@ class VectorService:
             logger.error(f"Error querying similar events: {e}")
             return []
     
-    def _calculate_behavioral_relevance(self, event_metadata: Dict, context: Optional[Dict]) -> float:
-        """Calculate behavioral relevance score for an event"""
-        if not context:
-            return 0.0
+    def _rerank_events(self, results: List[Any], context: Optional[Dict], top_k: int) -> List[Dict]:
+        """
+        Blend vector similarity with behavioral relevance over the whole candidate pool.
+        Relevance is computed column-wise with NumPy from the precomputed
+        `hour_of_day` / `stress_level` payload fields.
+        """
+        if not results:
+            return []
         
-        relevance_score = 0.0
+        payloads = [result.payload or {} for result in results]
+        scores = np.fromiter((result.score for result in results), dtype=np.float64, count=len(results))
+        relevance = self._calculate_behavioral_relevance(payloads, context)
         
-        # Stress level similarity
-        if context.get('current_stress') and event_metadata.get('stress_at_time'):
-            stress_diff = abs(context['current_stress'] - event_metadata['stress_at_time'])
-            relevance_score += max(0, 1 - stress_diff)  # Higher score for similar stress levels
+        # Sort by combined similarity + behavioral relevance (stable, so ties keep vector order)
+        order = np.argsort(-(scores + relevance) / 2, kind="stable")[:top_k]
         
-        # Time of day similarity
-        if context.get('current_hour') and event_metadata.get('timestamp'):
-            try:
-                from datetime import datetime
-                event_time = datetime.fromisoformat(event_metadata['timestamp'].replace('Z', '+00:00'))
-                hour_diff = abs(context['current_hour'] - event_time.hour)
-                relevance_score += max(0, 1 - hour_diff / 12)  # Similar time of day
-            except:
-                pass
+        return [
+            {
+                "id": str(results[i].id),
+                "score": float(scores[i]),
+                "metadata": payloads[i],
+                "relevance_score": float(relevance[i])
+            }
+            for i in order
+        ]
+    
+    def _calculate_behavioral_relevance(self, payloads: List[Dict], context: Optional[Dict]) -> np.ndarray:
+        """Calculate behavioral relevance scores for a batch of event payloads"""
+        relevance = np.zeros(len(payloads), dtype=np.float64)
+        if not context:
+            return relevance
+        
+        # Stress level similarity: higher score for similar stress levels
+        current_stress = context.get('current_stress')
+        if current_stress is not None:
+            stress = np.array(
+                [self._payload_stress_level(p) for p in payloads], dtype=np.float64
+            )
+            stress_similarity = np.clip(1 - np.abs(current_stress - stress), 0, 1)
+            relevance += np.nan_to_num(stress_similarity, nan=0.0)
+        
+        # Time of day similarity (circular, so 23h and 0h are neighbours)
+        current_hour = context.get('current_hour')
+        if current_hour is not None:
+            hours = np.array(
+                [self._payload_hour_of_day(p) for p in payloads], dtype=np.float64
+            )
+            hour_diff = np.abs(current_hour - hours)
+            hour_diff = np.minimum(hour_diff, 24 - hour_diff)
+            relevance += np.nan_to_num(np.clip(1 - hour_diff / 12, 0, 1), nan=0.0)
         
         # Behavioral pattern match
-        if context.get('spending_personality') == 'impulsive' and 'unplanned' in event_metadata.get('spending_tags', []):
-            relevance_score += 0.5
+        if context.get('spending_personality') == 'impulsive':
+            unplanned = np.fromiter(
+                ('unplanned' in p.get('spending_tags', []) for p in payloads),
+                dtype=bool, count=len(payloads)
+            )
+            relevance += 0.5 * unplanned
+        
+        return np.minimum(relevance, 1.0)  # Cap at 1.0
+
+    def _extract_context_features(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Precompute re-ranking features once at ingest so queries never parse timestamps"""
+        features = {}
+        
+        hour = self._parse_hour(metadata.get('timestamp'))
+        if hour is not None:
+            features['hour_of_day'] = hour
         
-        return min(1.0, relevance_score)  # Cap at 1.0
+        for key in ('stress_at_time', 'stress_score', 'user_stress_level', 'score'):
+            value = metadata.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if key == 'score' and metadata.get('type') != 'biometric':
+                    continue  # Message scores are sentiment, not stress
+                features['stress_level'] = float(value)
+                break
+        
+        return features
+
+    @staticmethod
+    def _parse_hour(timestamp: Any) -> Optional[int]:
+        if not timestamp:
+            return None
+        try:
+            return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00')).hour
+        except ValueError:
+            return None
+
+    def _payload_stress_level(self, payload: Dict) -> float:
+        value = payload.get('stress_level', payload.get('stress_at_time'))
+        return float(value) if value is not None else np.nan
+
+    def _payload_hour_of_day(self, payload: Dict) -> float:
+        hour = payload.get('hour_of_day')
+        if hour is None:
+            # Points written before hour_of_day was stored in the payload
+            hour = self._parse_hour(payload.get('timestamp'))
+        return float(hour) if hour is not None else np.nan
 
     def _extract_spending_tags(self, metadata: Dict[str, Any]) -> List[str]:
         """Extract behavioral tags from transaction metadata"""
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Market Data Cache Benchmark
+Compares fetching every market feed per recommendation (as
+MarketDataFetcher used to) with reading snapshots from the shared
+stale-while-revalidate cache, for N concurrent recommendations (the first
+one fills the cache). A provider latency models a real market API.
+
+Usage (from finsphere-backend/):
+    python benchmarks/bench_market_data.py [--recommendations 100 10000] [--provider-latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.market_data import FEEDS, MarketDataCache, SimulatedMarketProvider
+
+
+class LatencyProvider(SimulatedMarketProvider):
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    async def fetch(self, feed: str):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return await super().fetch(feed)
+
+
+async def _timed(coro_fn, n: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(coro_fn() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def run(sizes, latency_ms: float):
+    print(f"{'recs':>8} | {'per-rec fetch':>14} | {'calls':>8} | {'cached':>10} | {'calls':>6} | {'speedup':>8}")
+    print("-" * 70)
+    for n in sizes:
+        uncached = LatencyProvider(latency_ms)
+        loop = await _timed(lambda: asyncio.gather(*(uncached.fetch(feed) for feed in FEEDS)), n)
+
+        provider = LatencyProvider(latency_ms)
+        cache = MarketDataCache(provider)
+        start = time.perf_counter()
+        await cache.snapshot()
+        cached = time.perf_counter() - start + await _timed(cache.snapshot, n - 1)
+        assert provider.calls == len(FEEDS)  # One fetch per feed, shared by every recommendation
+
+        print(f"{n:>8} | {loop * 1000:>11.1f} ms | {uncached.calls:>8} | {cached * 1000:>7.1f} ms | "
+              f"{provider.calls:>6} | {loop / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recommendations", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--provider-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.recommendations, args.provider_latency_ms))
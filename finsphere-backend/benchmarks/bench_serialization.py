@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Response Serialization Benchmark
+Compares how the API used to encode dict payloads (jsonable_encoder +
+json.dumps, FastAPI's path for endpoints without a response model) with the
+current path (typed response model serialized by pydantic-core, rendered
+with orjson), and reports wire size with gzip / brotli compression.
+
+Payloads are /historical/biometrics and /historical/emails responses from
+the fake data generator.
+
+Usage (from finsphere-backend/):
+    python benchmarks/bench_serialization.py [--sizes 100 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import sys
+import time
+import zlib
+from dataclasses import asdict
+from pathlib import Path
+
+import orjson
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.models.schemas import HistoricalBiometricsResponse, HistoricalEmailsResponse
+from app.services.fake_data_stream import fake_data_generator
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def encode_before(payload) -> bytes:
+    # Starlette JSONResponse.render after FastAPI's jsonable_encoder
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_after(adapter: TypeAdapter, payload) -> bytes:
+    # FastAPI response_model path (validate + serialize in pydantic-core), then ORJSONResponse
+    return orjson.dumps(adapter.dump_python(adapter.validate_python(payload), mode="json"))
+
+
+def payloads(n: int):
+    biometrics = fake_data_generator.generate_historical_biometrics(1, 24, n)
+    emails = [asdict(email) for email in fake_data_generator.generate_historical_emails(1, 24, n)]
+    yield "biometrics", TypeAdapter(HistoricalBiometricsResponse), {
+        "user_id": 1, "time_range_hours": 24, "data_points": n, "biometrics": biometrics
+    }
+    yield "emails", TypeAdapter(HistoricalEmailsResponse), {
+        "user_id": 1, "time_range_hours": 24, "email_count": n, "emails": emails
+    }
+
+
+def run(sizes, repeat: int):
+    print(
+        f"{'payload':>10} {'items':>7} | {'before':>9} | {'after':>9} | {'speedup':>7} | "
+        f"{'raw KB':>8} | {'gzip KB':>8} {'ms':>6} | {'br KB':>8} {'ms':>6}"
+    )
+    print("-" * 100)
+    for n in sizes:
+        for name, adapter, payload in payloads(n):
+            before = _best_of(lambda: encode_before(payload), repeat)
+            after = _best_of(lambda: encode_after(adapter, payload), repeat)
+            # Same document either way
+            assert json.loads(encode_before(payload)) == json.loads(encode_after(adapter, payload))
+
+            body = encode_after(adapter, payload)
+            gzip_level = settings.RESPONSE_COMPRESSION_GZIP_LEVEL
+            gzip_body = zlib.compress(body, gzip_level)
+            gzip_time = _best_of(lambda: zlib.compress(body, gzip_level), repeat)
+            if brotli is not None:
+                quality = settings.RESPONSE_COMPRESSION_BROTLI_QUALITY
+                br_size = f"{len(brotli.compress(body, quality=quality)) / 1024:>8.1f}"
+                br_time = f"{_best_of(lambda: brotli.compress(body, quality=quality), repeat) * 1000:>6.2f}"
+            else:
+                br_size, br_time = f"{'n/a':>8}", f"{'':>6}"
+
+            print(
+                f"{name:>10} {n:>7} | {before * 1000:>6.2f} ms | {after * 1000:>6.2f} ms | "
+                f"{before / after:>6.1f}x | {len(body) / 1024:>8.1f} | "
+                f"{len(gzip_body) / 1024:>8.1f} {gzip_time * 1000:>6.2f} | {br_size} {br_time}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Stress Scoring Benchmark
+Compares per-sample scoring (one call per reading, as /ingest/biometrics does)
+with the batched NumPy path used by batch ingest, backfills and training.
+
+Usage (from finsphere-backend/):
+    python benchmarks/bench_stress_scoring.py [--sizes 1000 100000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.stress_scoring import stress_score, stress_scores
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat: int):
+    rng = np.random.default_rng(42)
+    print(f"{'samples':>10} | {'per-sample':>14} | {'batched':>14} | {'speedup':>8}")
+    print("-" * 56)
+
+    for n in sizes:
+        hr = rng.normal(80, 15, n).clip(40, 180)
+        hrv = rng.normal(40, 12, n).clip(5, 150)
+        hr_list, hrv_list = hr.tolist(), hrv.tolist()
+
+        per_sample = _best_of(lambda: [stress_score(h, v) for h, v in zip(hr_list, hrv_list)], repeat)
+        batched = _best_of(lambda: stress_scores(hr, hrv), repeat)
+
+        # Both paths must agree
+        expected = np.array([stress_score(h, v)[1] for h, v in zip(hr_list, hrv_list)])
+        assert np.allclose(expected, stress_scores(hr, hrv)[1])
+
+        print(
+            f"{n:>10} | {n / per_sample:>10,.0f} /s | {n / batched:>10,.0f} /s | "
+            f"{per_sample / batched:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Synthetic History Benchmark
+Compares the per-sample path (one generate_biometric / generate_email call
+per point, as the historical endpoints used to do) with the vectorized,
+seeded generators behind /historical/biometrics and /historical/emails.
+
+Usage (from finsphere-backend/):
+    python benchmarks/bench_synthetic_data.py [--sizes 1000 100000] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.fake_data_stream import fake_data_generator
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat: int):
+    generator = fake_data_generator
+    end = datetime(2024, 1, 1)
+    print(f"{'series':>10} | {'points':>8} | {'per-sample':>14} | {'vectorized':>14} | {'speedup':>8}")
+    print("-" * 68)
+
+    for n in sizes:
+        # Same window twice must give the same series
+        assert generator.generate_historical_biometrics(7, 24, n, end) == \
+            generator.generate_historical_biometrics(7, 24, n, end)
+        assert generator.generate_historical_emails(7, 24, n, end) == \
+            generator.generate_historical_emails(7, 24, n, end)
+
+        for name, per_sample, vectorized in (
+            ("biometrics", lambda: [generator.generate_biometric(7) for _ in range(n)],
+             lambda: generator.generate_historical_biometrics(7, 24 * 90, n, end)),
+            ("emails", lambda: [generator.generate_email(7) for _ in range(n)],
+             lambda: generator.generate_historical_emails(7, 24 * 90, n, end)),
+        ):
+            # Faker-backed emails are slow per sample; time a single run
+            loop = _best_of(per_sample, 1 if name == "emails" else repeat)
+            batch = _best_of(vectorized, repeat)
+            print(
+                f"{name:>10} | {n:>8} | {n / loop:>10,.0f} /s | {n / batch:>10,.0f} /s | "
+                f"{loop / batch:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Wire Format Benchmark
+Per-event cost of JSON vs MessagePack on the two hot paths of the wearable
+and extension clients:
+
+- ingest: decode a batch upload body (JSON array / NDJSON / MessagePack
+  array / MessagePack sequence) and validate it into BiometricData, as
+  /ingest/biometrics/batch does
+- stream: encode stream events (SSE `data:` frames vs MessagePack objects),
+  as /stream/biometrics does, and decode them on the client
+
+For each it reports throughput (events/s), CPU time per event (process
+time, so waiting is excluded) and bytes per event.
+
+Usage (from finsphere-backend/):
+    python benchmarks/bench_wire_format.py [--events 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+import msgpack
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.requests import Request
+
+from app.core import wire_format
+from app.models.schemas import BiometricData
+from app.services.fake_data_stream import fake_data_generator
+
+
+def _best_of(fn, repeat: int):
+    """(wall seconds, CPU seconds) of the fastest run."""
+    best = (float("inf"), float("inf"))
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        fn()
+        best = min(best, (time.perf_counter() - wall, time.process_time() - cpu))
+    return best
+
+
+def _request(content_type: str) -> Request:
+    return Request({"type": "http", "headers": [(b"content-type", content_type.encode())]})
+
+
+def wearable_samples(n: int) -> List[dict]:
+    start = datetime.utcnow() - timedelta(seconds=n)
+    return [
+        {
+            "user_id": "wearable-1",
+            "timestamp": start + timedelta(seconds=i),
+            "heart_rate": random.randint(55, 140),
+            "hrv_ms": round(random.uniform(15, 90), 1),
+            "source": "apple_watch",
+        }
+        for i in range(n)
+    ]
+
+
+def ingest_bodies(samples: List[dict]):
+    as_json = [{**s, "timestamp": s["timestamp"].isoformat()} for s in samples]
+    yield "JSON array", "application/json", json.dumps(as_json).encode()
+    yield "NDJSON", "application/x-ndjson", "\n".join(json.dumps(s) for s in as_json).encode()
+    yield "msgpack array", wire_format.MSGPACK_MEDIA_TYPE, wire_format.packb(samples)
+    yield "msgpack seq", wire_format.MSGPACK_MEDIA_TYPE, b"".join(wire_format.packb(s) for s in samples)
+
+
+def bench_ingest(n: int, repeat: int):
+    adapter = TypeAdapter(List[BiometricData])
+    samples = wearable_samples(n)
+    print(f"Ingest: decode + validate {n} BiometricData")
+    print(f"{'format':>14} | {'events/s':>10} | {'CPU us/event':>12} | {'bytes/event':>11}")
+    print("-" * 58)
+    for name, content_type, body in ingest_bodies(samples):
+        request = _request(content_type)
+        parse = lambda: adapter.validate_python(wire_format.decode_items(request, body))
+        assert [s.heart_rate for s in parse()] == [s["heart_rate"] for s in samples]
+        wall, cpu = _best_of(parse, repeat)
+        print(f"{name:>14} | {n / wall:>10,.0f} | {cpu / n * 1e6:>12.2f} | {len(body) / n:>11.1f}")
+
+
+def bench_stream(n: int, repeat: int):
+    events = [fake_data_generator.generate_biometric(1) for _ in range(n)]
+    print(f"\nStream: {n} biometric events")
+    print(f"{'format':>14} | {'encode ev/s':>11} | {'enc CPU us':>10} | "
+          f"{'decode ev/s':>11} | {'dec CPU us':>10} | {'bytes/event':>11}")
+    print("-" * 84)
+    for name, binary in (("SSE JSON", False), ("msgpack", True)):
+        encode = lambda: b"".join(wire_format.stream_frame(event, binary) for event in events)
+        body = encode()
+
+        if binary:
+            def decode():
+                unpacker = msgpack.Unpacker(raw=False)
+                unpacker.feed(body)
+                return list(unpacker)
+        else:
+            def decode():
+                return [json.loads(frame[6:]) for frame in body.split(b"\n\n") if frame]
+
+        assert len(decode()) == n
+        enc_wall, enc_cpu = _best_of(encode, repeat)
+        dec_wall, dec_cpu = _best_of(decode, repeat)
+        print(
+            f"{name:>14} | {n / enc_wall:>11,.0f} | {enc_cpu / n * 1e6:>10.2f} | "
+            f"{n / dec_wall:>11,.0f} | {dec_cpu / n * 1e6:>10.2f} | {len(body) / n:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    random.seed(42)
+    bench_ingest(args.events, args.repeat)
+    bench_stream(args.events, args.repeat)
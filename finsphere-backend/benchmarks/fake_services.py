@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama and Qdrant
+Minimal local stand-ins for the two HTTP services the backend calls, so load
+tests measure the API rather than an LLM or a vector DB (and run offline).
+
+- Ollama: /api/tags, /api/chat (plain and streamed), /api/generate,
+  /api/embeddings, /api/embed. Replies are canned; embeddings are
+  deterministic 768-d vectors derived from the text.
+- Qdrant REST: collections (list, get, create), payload indexes, point
+  upserts (kept in memory) and search (newest points of the collection).
+
+Each reply waits a configurable latency first (e.g. to model a slow LLM).
+Used by replay_traffic.py; can also run on its own for manual testing:
+
+    python benchmarks/fake_services.py [--ollama-port 11434] [--qdrant-port 6333] [--llm-latency-ms 300]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+EMBEDDING_DIM = 768
+FAKE_REPLY = "Take a breath before buying. Waiting a day usually makes the decision clearer."
+
+
+def _embedding(text: str) -> List[float]:
+    seed = hashlib.sha256(text.encode()).digest()
+    return [(seed[i % len(seed)] - 128) / 128.0 for i in range(EMBEDDING_DIM)]
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency_ms = 0.0
+
+    def log_message(self, format, *args):
+        pass  # Keep load-test output readable
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw) if raw else {}
+
+    def _reply(self, payload, status: int = 200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _wait(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+
+class FakeOllamaHandler(_JsonHandler):
+    models: Tuple[str, ...] = ("fake-model",)  # Listed by /api/tags; the backend checks its models are there
+
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            self._reply({"models": [{"name": name, "model": name, "size": 0, "details": {}} for name in self.models]})
+        else:
+            self._reply({"error": "not found"}, 404)
+
+    def do_POST(self):
+        body = self._body()
+        if self.path == "/api/embeddings":
+            self._reply({"embedding": _embedding(body.get("prompt", ""))})
+        elif self.path == "/api/embed":
+            texts = body.get("input", [])
+            texts = [texts] if isinstance(texts, str) else texts
+            self._reply({"model": body.get("model"), "embeddings": [_embedding(text) for text in texts]})
+        elif self.path == "/api/chat":
+            self._wait()
+            message = {"role": "assistant", "content": FAKE_REPLY}
+            if body.get("stream", True):
+                self._stream([{"message": {"role": "assistant", "content": word + " "}, "done": False}
+                              for word in FAKE_REPLY.split()] + [{"done": True}])
+            else:
+                self._reply({"model": body.get("model"), "message": message, "done": True})
+        elif self.path == "/api/generate":
+            self._wait()
+            self._reply({"model": body.get("model"), "response": FAKE_REPLY, "done": True})
+        else:
+            self._reply({"error": "not found"}, 404)
+
+    def _stream(self, chunks: List[Dict]):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            line = json.dumps(chunk).encode() + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeQdrantHandler(_JsonHandler):
+    collections: Dict[str, Dict] = {}  # In memory: name -> {"points": {id: point}, "indexes": {field: schema}}
+    lock = threading.Lock()
+
+    _COLLECTION = re.compile(r"^/collections/([^/?]+)")
+
+    def _ok(self, result):
+        self._reply({"result": result, "status": "ok", "time": 0.0})
+
+    def _collection(self) -> Tuple[str, Dict]:
+        name = self._COLLECTION.match(self.path).group(1)
+        with self.lock:
+            collection = self.collections.setdefault(name, {"points": {}, "indexes": {}})
+        return name, collection
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/collections":
+            self._ok({"collections": [{"name": name} for name in self.collections]})
+        elif self._COLLECTION.match(path):
+            name, collection = self._collection()
+            self._ok(self._collection_info(collection))
+        else:
+            self._ok({"title": "fake qdrant", "version": "1.11.0"})
+
+    def do_PUT(self):
+        body = self._body()
+        path = self.path.split("?")[0]
+        name, collection = self._collection()
+        if path.endswith("/points"):
+            self._wait()
+            with self.lock:
+                for point in body.get("points", []):
+                    collection["points"][str(point["id"])] = point
+            self._ok({"operation_id": 0, "status": "completed"})
+        elif path.endswith("/index"):
+            collection["indexes"][body.get("field_name")] = body.get("field_schema")
+            self._ok({"operation_id": 0, "status": "completed"})
+        else:
+            self._ok(True)
+
+    def do_POST(self):
+        body = self._body()
+        path = self.path.split("?")[0]
+        if path.endswith("/points/search"):
+            self._wait()
+            name, collection = self._collection()
+            with self.lock:
+                points = list(collection["points"].values())[-int(body.get("limit", 10)):]
+            self._ok([
+                {"id": point["id"], "version": 0, "score": 0.5, "payload": point.get("payload") or {}}
+                for point in reversed(points)
+            ])
+        else:
+            self._ok(True)
+
+    def _collection_info(self, collection: Dict) -> Dict:
+        return {
+            "status": "green",
+            "optimizer_status": "ok",
+            "points_count": len(collection["points"]),
+            "indexed_vectors_count": 0,
+            "segments_count": 1,
+            "config": {
+                "params": {"vectors": {"size": EMBEDDING_DIM, "distance": "Cosine"}},
+                "hnsw_config": {"m": 16, "ef_construct": 100, "full_scan_threshold": 10000},
+                "optimizer_config": {
+                    "deleted_threshold": 0.2, "vacuum_min_vector_number": 1000, "default_segment_number": 0,
+                    "flush_interval_sec": 5,
+                },
+                "wal_config": {"wal_capacity_mb": 32, "wal_segments_ahead": 0},
+            },
+            "payload_schema": {
+                field: {"data_type": schema, "points": 0} for field, schema in collection["indexes"].items()
+            },
+        }
+
+
+def _serve(handler, port: int, **attributes) -> ThreadingHTTPServer:
+    handler_class = type(handler.__name__, (handler,), attributes)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_fake_services(ollama_port: int = 0, qdrant_port: int = 0,
+                        llm_latency_ms: float = 0.0, vector_latency_ms: float = 0.0,
+                        models: Tuple[str, ...] = FakeOllamaHandler.models):
+    """Start both fakes on background threads (port 0 = any free port); returns (ollama_url, qdrant_port, servers)."""
+    ollama = _serve(FakeOllamaHandler, ollama_port, latency_ms=llm_latency_ms, models=tuple(models))
+    qdrant = _serve(FakeQdrantHandler, qdrant_port, latency_ms=vector_latency_ms, collections={})
+    return f"http://127.0.0.1:{ollama.server_address[1]}", qdrant.server_address[1], (ollama, qdrant)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ollama-port", type=int, default=11434)
+    parser.add_argument("--qdrant-port", type=int, default=6333)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--vector-latency-ms", type=float, default=0.0)
+    parser.add_argument("--models", nargs="+", default=["gpt-oss:20b-cloud", "nomic-embed-text"],
+                        help="Model names listed by /api/tags")
+    args = parser.parse_args()
+    ollama_url, qdrant_port, _ = start_fake_services(
+        args.ollama_port, args.qdrant_port, args.llm_latency_ms, args.vector_latency_ms, args.models
+    )
+    print(f"Fake Ollama on {ollama_url}, fake Qdrant on 127.0.0.1:{qdrant_port} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Traffic Replay Load Test
+Replays a traffic recording (TRAFFIC_RECORD_PATH, or synthesize_traffic.py)
+against the API at 1x, 10x, 100x... the recorded pace, keeping the original
+spacing of requests, and reports latency percentiles and error rates per
+route.
+
+By default the app runs in this process (over ASGI, no network), with local
+fake Ollama and Qdrant servers (fake_services.py) and a throwaway ingest
+queue, so only the API and PostgreSQL are measured. --base-url targets a
+running server instead (its own Ollama/Qdrant settings apply).
+
+Latency is measured from when a request is sent. When --concurrency
+requests are already in flight, later ones wait; that wait is reported as
+schedule lag rather than latency. A large lag means the replay, not the
+recording, is setting the pace.
+
+Usage (from finsphere-backend/):
+    python benchmarks/replay_traffic.py data/traffic.jsonl [--speed 1 10 100] [--concurrency 64]
+        [--llm-latency-ms 0] [--base-url http://localhost:8000] [--json report.json]
+        [--max-error-rate 0.01] [--max-p95-ms 250]
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import numpy as np
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fake_services import start_fake_services
+
+SKIPPED_PATHS = ("/api/v1/stream", "/api/v1/ws")  # Long-lived; not request/response traffic
+
+
+def load(path: Path) -> List[Dict]:
+    with open(path, "rb") as f:
+        entries = [orjson.loads(line) for line in f if line.strip()]
+    entries = [entry for entry in entries if not entry["path"].startswith(SKIPPED_PATHS)]
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+def _body(entry: Dict) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode()
+
+
+async def replay(client: httpx.AsyncClient, entries: List[Dict], speed: float, concurrency: int) -> List[Dict]:
+    """Send every entry at its recorded offset / speed; one result per entry."""
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    results = []
+
+    async def send(entry: Dict, due: float):
+        async with semaphore:
+            sent = loop.time()
+            result = {"route": entry.get("route") or f"{entry['method']} {entry['path']}",
+                      "lag_ms": (sent - due) * 1000, "recorded_ms": entry.get("duration_ms")}
+            try:
+                response = await client.request(
+                    entry["method"], entry["path"], params=entry.get("query") or None,
+                    headers=entry.get("headers"), content=_body(entry) or None,
+                )
+                await response.aread()
+                result["status"] = response.status_code
+            except Exception as e:
+                result["status"] = None
+                result["error"] = type(e).__name__
+            result["latency_ms"] = (loop.time() - sent) * 1000
+            results.append(result)
+
+    start = loop.time()
+    first = entries[0]["t"]
+    tasks = []
+    for entry in entries:
+        due = start + (entry["t"] - first) / speed
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(entry, due)))
+    await asyncio.gather(*tasks)
+    return results
+
+
+def summarize(results: List[Dict], wall_seconds: float) -> Dict:
+    by_route = defaultdict(list)
+    for result in results:
+        by_route[result["route"]].append(result)
+
+    routes = {}
+    for route, items in sorted(by_route.items()):
+        latency = np.array([item["latency_ms"] for item in items])
+        recorded = np.array([item["recorded_ms"] for item in items if item["recorded_ms"] is not None])
+        errors = sum(item["status"] is None or item["status"] >= 500 for item in items)
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99])
+        routes[route] = {
+            "requests": len(items),
+            "errors": errors,
+            "error_rate": errors / len(items),
+            "client_errors": sum(item["status"] is not None and 400 <= item["status"] < 500 for item in items),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "recorded_p95_ms": round(float(np.percentile(recorded, 95)), 2) if recorded.size else None,
+            "lag_p95_ms": round(float(np.percentile([item["lag_ms"] for item in items], 95)), 2),
+        }
+
+    errors = sum(route["errors"] for route in routes.values())
+    return {
+        "requests": len(results),
+        "seconds": round(wall_seconds, 2),
+        "throughput_rps": round(len(results) / wall_seconds, 1) if wall_seconds else None,
+        "error_rate": errors / len(results) if results else 0.0,
+        "routes": routes,
+    }
+
+
+def print_report(speed: float, report: Dict):
+    print(f"\n{speed:g}x: {report['requests']} requests in {report['seconds']} s "
+          f"({report['throughput_rps']} req/s), error rate {report['error_rate']:.2%}")
+    print(f"{'route':<48} | {'n':>6} | {'5xx':>5} | {'4xx':>5} | {'p50':>8} | {'p95':>8} | {'p99':>8} | "
+          f"{'rec p95':>8} | {'lag p95':>8}")
+    print("-" * 126)
+    for route, row in report["routes"].items():
+        recorded = f"{row['recorded_p95_ms']:>8.1f}" if row["recorded_p95_ms"] is not None else f"{'-':>8}"
+        print(f"{route[:48]:<48} | {row['requests']:>6} | {row['errors']:>5} | {row['client_errors']:>5} | "
+              f"{row['p50_ms']:>8.1f} | {row['p95_ms']:>8.1f} | {row['p99_ms']:>8.1f} | {recorded} | "
+              f"{row['lag_p95_ms']:>8.1f}")
+
+
+async def run(args) -> Dict:
+    entries = load(args.recording)
+    if not entries:
+        raise SystemExit(f"No replayable requests in {args.recording}")
+    span = entries[-1]["t"] - entries[0]["t"]
+    print(f"{len(entries)} requests over {span:.1f} s recorded ({', '.join(f'{s:g}x' for s in args.speed)})")
+
+    app = None
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        # Point the app at the fakes before its settings and clients are created
+        ollama_url, qdrant_port, servers = start_fake_services(
+            llm_latency_ms=args.llm_latency_ms, vector_latency_ms=args.vector_latency_ms
+        )
+        os.environ.update({
+            "OLLAMA_BASE_URL": ollama_url,
+            "OLLAMA_HOST": ollama_url,  # Read by the ollama package used for vector embeddings
+            "QDRANT_HOST": "127.0.0.1",
+            "QDRANT_PORT": str(qdrant_port),
+            "INGEST_QUEUE_PATH": str(Path(tempfile.mkdtemp(prefix="finsphere-replay-")) / "ingest_queue.db"),
+            "TRAFFIC_RECORD_PATH": "",  # Don't record the replay
+        })
+        from app.core.config import settings
+        servers[0].RequestHandlerClass.models = (settings.OLLAMA_MODEL, settings.OLLAMA_EMBEDDINGS_MODEL)
+        from main import app
+
+        await app.router.startup()
+        transport, base_url = httpx.ASGITransport(app=app), "http://replay"
+
+    reports = {}
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout,
+                                     limits=limits) as client:
+            for speed in args.speed:
+                started = time.perf_counter()
+                results = await replay(client, entries, speed, args.concurrency)
+                reports[f"{speed:g}x"] = report = summarize(results, time.perf_counter() - started)
+                print_report(speed, report)
+    finally:
+        if app is not None:
+            await app.router.shutdown()
+    return reports
+
+
+def breaches(reports: Dict, max_error_rate: float, max_p95_ms: float) -> List[str]:
+    found = []
+    for speed, report in reports.items():
+        if max_error_rate is not None and report["error_rate"] > max_error_rate:
+            found.append(f"{speed}: error rate {report['error_rate']:.2%} > {max_error_rate:.2%}")
+        for route, row in report["routes"].items():
+            if max_p95_ms is not None and row["p95_ms"] > max_p95_ms:
+                found.append(f"{speed}: {route} p95 {row['p95_ms']:.1f} ms > {max_p95_ms:g} ms")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--speed", type=float, nargs="+", default=[1.0, 10.0, 100.0])
+    parser.add_argument("--concurrency", type=int, default=64, help="Max requests in flight")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--base-url", help="Replay against a running server instead of in-process")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Fake Ollama chat/generate delay")
+    parser.add_argument("--vector-latency-ms", type=float, default=0.0, help="Fake Qdrant upsert/search delay")
+    parser.add_argument("--json", type=Path, help="Also write the report here")
+    parser.add_argument("--max-error-rate", type=float, help="Exit 1 if any run's 5xx/exception rate is higher")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit 1 if any route's p95 is higher")
+    args = parser.parse_args()
+
+    reports = asyncio.run(run(args))
+    if args.json:
+        args.json.write_bytes(orjson.dumps(reports, option=orjson.OPT_INDENT_2))
+    failed = breaches(reports, args.max_error_rate, args.max_p95_ms)
+    for line in failed:
+        print(f"FAIL {line}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Synthetic Traffic Recording
+Writes a recording in the TRAFFIC_RECORD_PATH format (see
+app/core/traffic_recorder.py) for replay_traffic.py, for when there is no
+recorded production traffic to replay. Users are interleaved, each running
+one of three scenarios:
+
+- wearable: a watch syncing a batch every 30 s, with single readings in
+  between (bursty writes)
+- checkout: the extension on a shopping site; intervention check, dashboard
+  poll, intervention log and response, then the purchase
+- therapy: a short voice-therapy chat (one LLM call per turn)
+
+Usage (from finsphere-backend/):
+    python benchmarks/synthesize_traffic.py data/traffic.jsonl [--users 50] [--duration 300] [--seed 7]
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import orjson
+
+API = "/api/v1"
+JSON_HEADERS = {"content-type": "application/json", "accept": "application/json"}
+SHOPS = ("https://www.amazon.in/cart", "https://www.flipkart.com/checkout", "https://www.myntra.com/bag",
+         "https://www.swiggy.com/checkout", "https://www.zomato.com/cart")
+CATEGORIES = ("Shopping", "Food & Dining", "Entertainment", "Electronics")
+THERAPY_LINES = ("I keep buying things when I'm stressed.", "Work has been really hard this week.",
+                 "How do I stop ordering food late at night?", "I feel better after talking about it.")
+
+
+class Recording:
+    def __init__(self, start: datetime):
+        self.start = start
+        self.entries = []
+
+    def add(self, t: float, method: str, route: str, path: str, body=None, query: str = ""):
+        entry = {
+            "t": round(t, 4),
+            "ts": (self.start + timedelta(seconds=t)).isoformat(),
+            "method": method,
+            "path": API + path,
+            "query": query,
+            "route": f"{method} {API}{route}",
+            "headers": dict(JSON_HEADERS) if body is not None else {"accept": "application/json"},
+        }
+        if body is not None:
+            entry["body"] = orjson.dumps(body).decode()
+        self.entries.append(entry)
+
+
+def _reading(rng: random.Random, user: str, at: datetime) -> dict:
+    stressed = rng.random() < 0.2
+    return {
+        "user_id": user,
+        "timestamp": at.isoformat(),
+        "heart_rate": rng.randint(95, 130) if stressed else rng.randint(60, 85),
+        "hrv_ms": round(rng.uniform(15, 30) if stressed else rng.uniform(40, 80), 1),
+        "source": "wearable",
+    }
+
+
+def wearable(rec: Recording, rng: random.Random, user: str, begin: float, duration: float):
+    t = begin
+    while t < duration:
+        at = rec.start + timedelta(seconds=t)
+        batch = [_reading(rng, user, at - timedelta(seconds=30 - i)) for i in range(0, 30, 2)]
+        rec.add(t, "POST", "/ingest/biometrics/batch", "/ingest/biometrics/batch", batch)
+        for offset in (10, 20):
+            rec.add(t + offset + rng.random(), "POST", "/ingest/biometrics", "/ingest/biometrics",
+                    _reading(rng, user, at + timedelta(seconds=offset)))
+        t += 30 + rng.uniform(-2, 2)
+
+
+def checkout(rec: Recording, rng: random.Random, user: str, user_id: int, begin: float, duration: float):
+    t = begin
+    while t < duration:
+        url = rng.choice(SHOPS)
+        rec.add(t, "POST", "/intervention/check", "/intervention/check",
+                {"user_id": user, "context_url": url, "current_activity": "checkout"})
+        rec.add(t + 0.05, "GET", "/realtime/dashboard/{user_id}", f"/realtime/dashboard/{user_id}")
+        t += rng.uniform(1, 4)
+        at = (rec.start + timedelta(seconds=t)).isoformat()
+        rec.add(t, "POST", "/intervention/log", "/intervention/log",
+                {"user_id": user, "url": url, "reason": "Elevated stress at checkout",
+                 "severity": rng.choice(("low", "medium", "high")), "timestamp": at})
+        accepted = rng.random() < 0.4
+        t += rng.uniform(2, 10)
+        rec.add(t, "POST", "/intervention/response", "/intervention/response",
+                {"user_id": user, "url": url, "intervention_action": "accepted" if accepted else "proceed",
+                 "accepted": accepted, "timestamp": at})
+        if not accepted:
+            t += rng.uniform(5, 20)
+            rec.add(t, "POST", "/ingest/transaction", "/ingest/transaction",
+                    {"user_id": user, "amount": round(rng.lognormvariate(7, 1), 2), "currency": "INR",
+                     "merchant": url.split("/")[2].removeprefix("www."), "category": rng.choice(CATEGORIES)})
+        t += rng.uniform(30, 120)
+
+
+def therapy(rec: Recording, rng: random.Random, user: str, begin: float, duration: float):
+    t = begin
+    while t < duration:
+        for line in rng.sample(THERAPY_LINES, rng.randint(2, len(THERAPY_LINES))):
+            rec.add(t, "POST", "/therapy/chat", "/therapy/chat", {"user_id": user, "message": line})
+            t += rng.uniform(8, 25)  # Listening to the reply, then speaking
+        t += rng.uniform(120, 300)
+
+
+def synthesize(path: Path, users: int, duration: float, seed: int) -> int:
+    rng = random.Random(seed)
+    rec = Recording(datetime.now(timezone.utc).replace(microsecond=0))
+    for n in range(users):
+        user_id = n + 1
+        user = f"user{user_id}@finsphere.com"
+        begin = rng.uniform(0, min(30.0, duration))
+        scenario = rng.choices(("wearable", "checkout", "therapy"), weights=(5, 4, 1))[0]
+        if scenario == "wearable":
+            wearable(rec, rng, user, begin, duration)
+        elif scenario == "checkout":
+            checkout(rec, rng, user, user_id, begin, duration)
+        else:
+            therapy(rec, rng, user, begin, duration)
+
+    entries = sorted((entry for entry in rec.entries if entry["t"] < duration), key=lambda entry: entry["t"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.writelines(orjson.dumps(entry) + b"\n" for entry in entries)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=300.0, help="Seconds of traffic at 1x")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    count = synthesize(args.output, args.users, args.duration, args.seed)
+    print(f"Wrote {count} requests over {args.duration:.0f} s for {args.users} users to {args.output}")
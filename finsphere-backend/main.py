@@ -1,13 +1,31 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api import endpoints, auth
-from app.core.database import create_tables
+from app.core import wire_format
+from app.api import endpoints, auth, websocket
+from app.core.database import create_tables, dispose_async_engine
+from app.core.query_metrics import QueryMetricsMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.traffic_recorder import TrafficRecorderMiddleware, traffic_recorder
+from app.core.indexes import ensure_indexes
+from app.core.partitions import partition_manager
+from app.services.stress_baseline import stress_baseline_store
+from app.services.sentiment_engine import sentiment_engine
+from app.services.ingest_queue import ingest_queue
+from app.services.vector_db import vector_service
+from app.services.decision_state import decision_state
+from app.services.stream_hub import stream_hub
+from app.services.change_feed import change_feed
+from app.services.realtime_state import realtime_state
+from app.services.fake_data_stream import fake_data_generator
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="Backend for FinSphere: Autonomous Financial Coaching Agent"
+    description="Backend for FinSphere: Autonomous Financial Coaching Agent",
+    default_response_class=ORJSONResponse
 )
 
 # CORS - Allow frontend to communicate
@@ -24,13 +42,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request statement count / DB time, N+1 detection in dev mode
+app.add_middleware(QueryMetricsMiddleware)
+
+# gzip/brotli for larger JSON bodies (SSE streams are left alone)
+app.add_middleware(CompressionMiddleware)
+
+# Record traffic for load-test replay (outermost, so durations are what clients see)
+if traffic_recorder.enabled:
+    app.add_middleware(TrafficRecorderMiddleware)
+
 # Create database tables on startup
 @app.on_event("startup")
 async def startup_event():
     print("🚀 Starting FinSphere Backend...")
     create_tables()
+    if settings.DB_BUILD_INDEXES_ON_STARTUP:
+        # Concurrent builds can take a while on large tables; don't hold up startup
+        app.state.index_build = asyncio.create_task(asyncio.to_thread(ensure_indexes))
+    partition_manager.start()
+    stress_baseline_store.start()
+    sentiment_engine.start()
+    await decision_state.start()
+    ingest_queue.register_handler("vector_upsert", vector_service.upsert_events)
+    await ingest_queue.start()
+    # Simulated wearable/email feeds: one generator per watched user, shared by all its connections
+    # (tapped so /realtime/dashboard reads the same samples the streams send)
+    stream_hub.register_producer(
+        "biometrics",
+        lambda user_id: realtime_state.tap_biometrics(
+            user_id, fake_data_generator.biometric_stream(user_id, interval_seconds=3)
+        ),
+        coalesce=True
+    )
+    stream_hub.register_producer(
+        "emails",
+        lambda user_id: realtime_state.tap_emails(
+            user_id, fake_data_generator.email_stream(user_id, interval_seconds=15)
+        )
+    )
+    # Dashboard stats recomputed once per user on committed activity, for the /ws dashboard channel
+    stream_hub.register_producer(websocket.DASHBOARD_TOPIC, websocket.dashboard_feed, coalesce=True)
+    change_feed.start()
     print("✅ Backend startup complete!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await ingest_queue.stop()
+    partition_manager.stop()
+    await stress_baseline_store.stop()
+    sentiment_engine.stop()
+    decision_state.stop()
+    await change_feed.stop()
+    await stream_hub.stop()
+    await dispose_async_engine()
+    traffic_recorder.close()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -52,6 +119,10 @@ async def api_health():
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_STR)
 app.include_router(endpoints.router, prefix=settings.API_V1_STR)
+app.include_router(websocket.router, prefix=settings.API_V1_STR)
+
+# Ingest bodies are parsed by wire_format (JSON or MessagePack), so their schemas are added to /openapi.json here
+wire_format.install_openapi(app)
 
 @app.get("/")
 async def root():
@@ -206,22 +206,154 @@ async function checkOllamaAvailability() {
 }
 
 /**
- * No authentication required - Extension works independently
+ * Authentication is optional - Extension works independently.
+ * With a token (from /auth/login) the extension keeps one multiplexed
+ * WebSocket to the backend instead of polling and one-off POSTs.
  */
-function getAuthToken() {
-  return Promise.resolve(null); // No auth needed
+async function getAuthToken() {
+  const stored = await chrome.storage.local.get(['authToken']);
+  return stored.authToken || null;
 }
 
-function setAuthToken(token) {
-  return Promise.resolve(); // No-op
+async function setAuthToken(token) {
+  if (token) {
+    await chrome.storage.local.set({ authToken: token });
+  } else {
+    await chrome.storage.local.remove('authToken');
+  }
+  backendSocket.connect();
 }
 
+/**
+ * Multiplexed WebSocket (/api/v1/ws): dashboard and intervention pushes,
+ * plus request/response calls, over one authenticated connection.
+ * Callers fall back to HTTP whenever the socket is not ready.
+ */
+const WS_URL = API_URL.replace(/^http/, 'ws') + '/ws';
+const WS_REQUEST_TIMEOUT = 10000;
+const WS_RECONNECT_MAX = 60000;
+const WS_PING_INTERVAL = 20000; // Keeps the MV3 service worker and proxies from idling out
+
+const backendSocket = {
+  ws: null,
+  ready: false,
+  userId: null,
+  dashboard: null, // Latest DashboardStats (snapshot + merged deltas)
+  pending: new Map(),
+  nextId: 1,
+  retryDelay: 1000,
+  reconnectTimer: null,
+  pingTimer: null,
+
+  async connect() {
+    this.close();
+    const token = await getAuthToken();
+    if (!token) return;
+
+    const ws = new WebSocket(WS_URL);
+    this.ws = ws;
+    ws.onopen = () => ws.send(JSON.stringify({ type: 'auth', token }));
+    ws.onmessage = (event) => this.onMessage(JSON.parse(event.data));
+    ws.onclose = (event) => {
+      if (this.ws !== ws) return; // Replaced by a newer connection
+      this.reset();
+      if (event.code === 4401) {
+        console.warn('🔒 WebSocket auth rejected; using HTTP until a new token is set');
+        return;
+      }
+      this.reconnectTimer = setTimeout(() => this.connect(), this.retryDelay);
+      this.retryDelay = Math.min(this.retryDelay * 2, WS_RECONNECT_MAX);
+    };
+  },
+
+  onMessage(message) {
+    switch (message.type) {
+      case 'ready':
+        this.ready = true;
+        this.userId = message.user_id;
+        this.retryDelay = 1000;
+        this.send({ type: 'subscribe', channel: 'dashboard' });
+        this.send({ type: 'subscribe', channel: 'interventions' });
+        this.pingTimer = setInterval(() => this.send({ type: 'ping' }), WS_PING_INTERVAL);
+        console.log('🔌 WebSocket connected for user', this.userId);
+        break;
+
+      case 'event':
+        if (message.channel === 'dashboard') {
+          this.dashboard = message.delta ? { ...this.dashboard, ...message.data } : message.data;
+        } else if (message.channel === 'interventions') {
+          console.log('🛡️ Intervention recorded:', message.data);
+        }
+        break;
+
+      case 'response':
+      case 'error': {
+        const call = this.pending.get(message.id);
+        if (!call) break;
+        this.pending.delete(message.id);
+        clearTimeout(call.timer);
+        if (message.type === 'response') {
+          call.resolve(message.result);
+        } else {
+          call.reject(new Error(message.error));
+        }
+        break;
+      }
+    }
+  },
+
+  send(message) {
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      this.ws.send(JSON.stringify(message));
+    }
+  },
+
+  request(method, params = {}) {
+    if (!this.ready) {
+      return Promise.reject(new Error('WebSocket not connected'));
+    }
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`WebSocket ${method} timed out`));
+      }, WS_REQUEST_TIMEOUT);
+      this.pending.set(id, { resolve, reject, timer });
+      this.send({ type: 'request', id, method, params });
+    });
+  },
+
+  reset() {
+    this.ready = false;
+    this.dashboard = null;
+    clearInterval(this.pingTimer);
+    for (const call of this.pending.values()) {
+      clearTimeout(call.timer);
+      call.reject(new Error('WebSocket closed'));
+    }
+    this.pending.clear();
+  },
+
+  close() {
+    clearTimeout(this.reconnectTimer);
+    const ws = this.ws;
+    this.ws = null;
+    this.reset();
+    if (ws) ws.close();
+  }
+};
+
 // Initialize extension
 chrome.runtime.onInstalled.addListener(() => {
   console.log('FinSphere Extension Installed');
   initializeExtension();
 });
 
+// Reconnect the backend WebSocket when the browser (and service worker) starts
+chrome.runtime.onStartup.addListener(() => {
+  backendSocket.connect();
+});
+
 async function initializeExtension() {
   const stored = await chrome.storage.local.get(['userId', 'isActive', 'aiEnabled']);
   
@@ -250,6 +382,9 @@ async function initializeExtension() {
   // Check Ollama availability
   await checkOllamaAvailability();
   
+  // Live backend connection (only when signed in)
+  backendSocket.connect();
+  
   console.log('🚀 FinSphere Universal AI Extension initialized (No Auth Required):', {
     userId: extensionState.userId,
     aiEnabled: extensionState.aiEnabled,
@@ -378,6 +513,14 @@ async function evaluateIntervention(tab, pageData, isShoppingPage) {
  */
 async function logInterventionResponse(action, accepted) {
   try {
+    if (backendSocket.ready) {
+      await backendSocket.request('intervention.response', {
+        intervention_action: action,
+        accepted: accepted,
+        timestamp: new Date().toISOString()
+      });
+      return;
+    }
     await fetch(`${API_URL}/intervention/response`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
@@ -594,14 +737,25 @@ function getDefaultUserProfile(userId) {
  */
 async function fetchUserState(userId) {
   try {
-    // Fetch real-time dashboard data
-    const response = await fetch(`${API_URL}/realtime/dashboard/${userId}`, {
-      method: 'GET',
-      headers: { 'Content-Type': 'application/json' }
-    });
+    // Biometric/email summary (RealtimeDashboardSummary) over the WebSocket when
+    // connected, otherwise over HTTP. The pushed DashboardStats doesn't carry
+    // these fields; it only adds savings_runway.
+    let data = null;
+    if (backendSocket.ready) {
+      data = await backendSocket.request('realtime.dashboard').catch(() => null);
+    }
+    if (!data) {
+      const response = await fetch(`${API_URL}/realtime/dashboard/${userId}`, {
+        method: 'GET',
+        headers: { 'Content-Type': 'application/json' }
+      });
+      data = response.ok ? await response.json() : null;
+    }
+    if (data && backendSocket.dashboard) {
+      data = { ...data, savings_runway: backendSocket.dashboard.savings_runway };
+    }
     
-    if (response.ok) {
-      const data = await response.json();
+    if (data) {
       console.log('📊 User financial state fetched:', data);
       
       return {
@@ -1007,14 +1161,23 @@ async function fallbackRuleBasedAnalysis(data) {
   return analysis;
 }
 
+/**
+ * GET a backend URL as JSON (null on HTTP error)
+ */
+async function fetchJson(url) {
+  const response = await fetch(url);
+  return response.ok ? response.json() : null;
+}
+
 /**
  * Fetch recent biometric data for user
  */
 async function fetchRecentBiometrics(userId) {
   try {
-    const response = await fetch(`${API_URL}/historical/biometrics/${userId}?hours=24&count=20`);
-    if (response.ok) {
-      const data = await response.json();
+    const data = backendSocket.ready
+      ? await backendSocket.request('biometrics.history', { hours: 24, count: 20 })
+      : await fetchJson(`${API_URL}/historical/biometrics/${userId}?hours=24&count=20`);
+    if (data) {
       const biometrics = data.biometrics || [];
       
       if (biometrics.length > 0) {
@@ -1047,9 +1210,10 @@ async function fetchRecentBiometrics(userId) {
  */
 async function fetchMonthlyExpenses(userId) {
   try {
-    const response = await fetch(`${API_URL}/user/${userId}/recent-activity?limit=100`);
-    if (response.ok) {
-      const data = await response.json();
+    const data = backendSocket.ready
+      ? await backendSocket.request('activity.recent', { limit: 100 })
+      : await fetchJson(`${API_URL}/user/${userId}/recent-activity?limit=100`);
+    if (data) {
       const transactions = data.recent_transactions || [];
       
       const thisMonth = new Date();
@@ -1375,6 +1539,12 @@ async function logIntervention(url, reason, severity) {
     
     console.log('Logging intervention:', payload);
     
+    if (backendSocket.ready) {
+      const result = await backendSocket.request('intervention.log', payload);
+      console.log('Intervention logged successfully:', result);
+      return;
+    }
+    
     const response = await fetch(`${API_URL}/intervention/log`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
@@ -1540,13 +1710,14 @@ async function handleMessage(request, sender, sendResponse) {
         break;
 
       case 'getAuthToken':
-        // No auth required - return null
-        sendResponse({ token: null });
+        // Optional - null when not signed in
+        sendResponse({ token: await getAuthToken() });
         break;
 
       case 'setAuthToken':
-        // No auth required - no-op
-        sendResponse({ success: true });
+        // Stores the token and (re)connects the WebSocket; null signs out
+        await setAuthToken(request.token);
+        sendResponse({ success: true, connected: backendSocket.ws !== null });
         break;
         
       case 'updateTodayStats':
@@ -1599,6 +1770,12 @@ async function recordInterventionResponse(data) {
     
     console.log('Recording intervention response:', payload);
     
+    if (backendSocket.ready) {
+      await backendSocket.request('intervention.response', payload);
+      console.log('Intervention response recorded successfully');
+      return;
+    }
+    
     const response = await fetch(`${API_URL}/intervention/response`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
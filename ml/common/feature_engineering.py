@@ -1,9 +1,15 @@
 # ML - Common Feature Engineering
 
+import sys
+from pathlib import Path
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 import pickle
 
+# Share the stress heuristic with the backend
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "finsphere-backend"))
+from app.services.stress_scoring import stress_score, stress_scores
+
 class FeatureEngineering:
     def __init__(self):
         self.scaler = StandardScaler()
@@ -23,12 +29,14 @@ class FeatureEngineering:
     @staticmethod
     def calculate_stress_score(hr: int, hrv: float) -> float:
         """Calculate stress score from HR and HRV"""
-        # Simple formula: higher HR + lower HRV = more stress
-        hr_normalized = (hr - 60) / 40  # Assume 60-100 resting range
-        hrv_normalized = (100 - hrv) / 80  # Assume 20-100 HRV range
-        
-        stress = (hr_normalized * 0.4) + (hrv_normalized * 0.6)
-        return min(1.0, max(0.0, stress))
+        _, stress = stress_score(hr, hrv)
+        return stress
+    
+    @staticmethod
+    def calculate_stress_scores(hr, hrv) -> np.ndarray:
+        """Calculate stress scores for arrays of HR and HRV (training data)"""
+        _, stress = stress_scores(hr, hrv)
+        return stress
     
     def scale_features(self, X):
         """Standardize features"""
@@ -41,6 +49,9 @@ if __name__ == "__main__":
     stress = fe.calculate_stress_score(hr=95, hrv=25)
     print(f"Stress score: {stress:.2f}")
     
+    stresses = fe.calculate_stress_scores(hr=[95, 72, 60], hrv=[25, 45, 90])
+    print(f"Batch stress scores: {stresses.round(2)}")
+    
     # Test time features
     time_feat = fe.extract_time_features("2025-11-28T14:30:00")
     print(f"Time features: {time_feat}")
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 sys.path.insert(0, 'finsphere-backend')
 
-from app.core.database import SessionLocal, engine, Base
+from app.core.database import SessionLocal, create_tables
 from app.models.database import (
     User, BiometricReading, Transaction, Intervention, GigWork, UserPermissions
 )
@@ -15,8 +15,8 @@ from app.models.database import (
 def create_demo_data():
     """Create demo user with sample data"""
     
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create tables (and the monthly partitions inserts need)
+    create_tables()
     
     db = SessionLocal()
     
@@ -85,6 +85,7 @@ def create_demo_data():
         intervention = Intervention(
             user_id=demo_user.id,
             url="https://www.amazon.in/s?k=laptop",
+            website_category="ecommerce",
             reason="Impulse purchase detected during elevated stress",
             severity="medium",
             user_action="snooze",
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+FinSphere Budget Rollover Test
+Checks the carry-over of rollover budgets: a month follows a backdated
+transaction recorded for the previous month after it was opened, and a
+budget with no row for the previous month carries its full limit, and the
+month summary reports the same without writing anything.
+Needs PostgreSQL (DATABASE_URL); everything runs in one transaction that is
+rolled back, so no data is left behind.
+"""
+
+import asyncio
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the backend directory to the path
+backend_path = Path(__file__).parent / "finsphere-backend"
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.database import BudgetCategory, BudgetMonthlySpend, User
+from app.services.budget_service import budget_service, month_start, previous_month
+
+NOW = datetime.now(timezone.utc)
+CURRENT = month_start(NOW)
+LAST = previous_month(CURRENT)
+
+
+def _in_month(month) -> datetime:
+    return datetime(month.year, month.month, 15, 12, tzinfo=timezone.utc)
+
+
+async def _with_budgets(check):
+    """Run check(db, budgets) against a throwaway user, then roll everything back."""
+    if AsyncSessionLocal is None:
+        print("   PostgreSQL not available, skipping")
+        return
+    async with AsyncSessionLocal() as db:
+        try:
+            user = User(email=f"rollover-{uuid.uuid4().hex}@test.local", hashed_password="x", full_name="Rollover Test")
+            db.add(user)
+            await db.flush()
+            budgets = {
+                # Existed last month (and the month before), no rows yet
+                "old": BudgetCategory(user_id=user.id, category_name="Dining", monthly_limit=100.0,
+                                      rollover_enabled=True, created_at=NOW - timedelta(days=70)),
+                # Created this month: nothing to carry
+                "new": BudgetCategory(user_id=user.id, category_name="Travel", monthly_limit=100.0,
+                                      rollover_enabled=True, created_at=NOW),
+            }
+            db.add_all(budgets.values())
+            await db.flush()
+            await check(db, budgets)
+        finally:
+            await db.rollback()
+    await async_engine.dispose()  # Pooled connections belong to this event loop
+
+
+async def _carried(db, budget, month) -> float:
+    return await db.scalar(
+        select(BudgetMonthlySpend.carried_over)
+        .where(BudgetMonthlySpend.budget_id == budget.id, BudgetMonthlySpend.month == month)
+    )
+
+
+async def _missing_previous_row(db, budgets):
+    await budget_service.record_spend(db, budgets["old"].user_id, [
+        (budgets["old"], _in_month(CURRENT), 10.0),
+        (budgets["new"], _in_month(CURRENT), 10.0),
+    ])
+    assert await _carried(db, budgets["old"], CURRENT) == 100.0  # Last month unused in full
+    assert await _carried(db, budgets["new"], CURRENT) == 0.0
+
+
+async def _backdated_spend(db, budgets):
+    budget = budgets["old"]
+    await budget_service.record_spend(db, budget.user_id, [(budget, _in_month(CURRENT), 10.0)])
+    assert await _carried(db, budget, CURRENT) == 100.0
+
+    # A transaction from last month arrives after this month was opened
+    await budget_service.record_spend(db, budget.user_id, [(budget, _in_month(LAST), 30.0)])
+    last = await _carried(db, budget, LAST)
+    assert last == 100.0  # Two months ago had no row either
+    assert await _carried(db, budget, CURRENT) == 100.0 + last - 30.0
+
+
+async def _summary_is_read_only(db, budgets):
+    summary = {row["category_name"]: row for row in await budget_service.get_month_summary(db, budgets["old"].user_id)}
+    assert summary["Dining"]["carried_over"] == 100.0
+    assert summary["Dining"]["actual_spending"] == 0.0
+    assert summary["Travel"]["carried_over"] == 0.0
+    opened = await db.scalar(
+        select(BudgetMonthlySpend.budget_id).where(BudgetMonthlySpend.budget_id.in_([b.id for b in budgets.values()]))
+    )
+    assert opened is None
+
+
+def test_missing_previous_month_carries_full_limit():
+    asyncio.run(_with_budgets(_missing_previous_row))
+
+
+def test_backdated_spend_updates_later_carry_over():
+    asyncio.run(_with_budgets(_backdated_spend))
+
+
+def test_month_summary_does_not_open_the_month():
+    asyncio.run(_with_budgets(_summary_is_read_only))
+
+
+if __name__ == "__main__":
+    test_missing_previous_month_carries_full_limit()
+    test_backdated_spend_updates_later_carry_over()
+    test_month_summary_does_not_open_the_month()
+    print("✅ Budget rollover tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+FinSphere OpenAPI Test
+Checks that every $ref in /openapi.json resolves, in particular the ingest
+request bodies documented by wire_format (JSON, NDJSON and MessagePack).
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the path
+backend_path = Path(__file__).parent / "finsphere-backend"
+sys.path.insert(0, str(backend_path))
+
+from main import app
+
+
+def _refs(node):
+    if isinstance(node, dict):
+        if isinstance(node.get("$ref"), str):
+            yield node["$ref"]
+        for value in node.values():
+            yield from _refs(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _refs(value)
+
+
+def _resolves(schema: dict, ref: str) -> bool:
+    node = schema
+    for part in ref.removeprefix("#/").split("/"):
+        if not isinstance(node, dict) or part not in node:
+            return False
+        node = node[part]
+    return True
+
+
+def test_openapi_refs_resolve():
+    schema = app.openapi()
+    dangling = sorted({ref for ref in _refs(schema) if not _resolves(schema, ref)})
+    assert not dangling, f"Unresolved $refs: {dangling}"
+
+
+def test_ingest_bodies_documented():
+    paths = app.openapi()["paths"]
+    for path in ("/api/v1/ingest/biometrics", "/api/v1/ingest/transaction", "/api/v1/ingest/message"):
+        content = paths[path]["post"]["requestBody"]["content"]
+        assert {"application/json", "application/msgpack"} <= set(content), path
+    for path in ("/api/v1/ingest/biometrics/batch", "/api/v1/ingest/transactions/batch",
+                 "/api/v1/ingest/messages/batch"):
+        content = paths[path]["post"]["requestBody"]["content"]
+        assert {"application/json", "application/x-ndjson", "application/msgpack"} <= set(content), path
+
+
+if __name__ == "__main__":
+    test_openapi_refs_resolve()
+    test_ingest_bodies_documented()
+    print("✅ OpenAPI tests passed")